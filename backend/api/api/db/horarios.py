@@ -0,0 +1,24 @@
+from database import Base
+from sqlalchemy import Column, Date, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+class HorariosDiarios(Base):
+    """Horarios diarios SQLAlchemy model
+
+    The /today document of an user for a day, as a student (perfil "aluno")
+    or as a teacher (perfil "docente"). A null documento was invalidated,
+    versao is bumped on each invalidation.
+    """
+
+    __tablename__ = "horarios_diarios"
+
+    id_utilizador = Column(
+        Integer,
+        ForeignKey("utilizadores.id_utilizador", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    perfil = Column(String, primary_key=True)
+    data = Column(Date, primary_key=True, index=True)
+    versao = Column(Integer, nullable=False, default=0)
+    documento = Column(JSONB)
@@ -87,12 +87,18 @@ class UC(Base):
     id_curso = Column(Integer, ForeignKey("cursos.id_curso"), nullable=False)
     nome_uc = Column(String, nullable=False)
     descricao = Column(String)
+    # attendance mode, "rsa" signed QRCodes or "totp" rotating tokens
+    modo_presenca = Column(String, nullable=False, server_default="rsa")
 
     aulas = relationship("Aulas", back_populates="uc")
     curso = relationship("Cursos", back_populates="ucs")
-    docentes = relationship("UCDocentes", back_populates="uc")
+    docentes = relationship(
+        "UCDocentes", back_populates="uc", order_by="UCDocentes.id_docente"
+    )
     periodos = relationship("Periodos", back_populates="uc")
-    inscricoes = relationship("InscricoesUC", back_populates="uc")
+    inscricoes = relationship(
+        "InscricoesUC", back_populates="uc", order_by="InscricoesUC.id_aluno"
+    )
 
     semestres = relationship("SemestresUC", back_populates="uc")
 
@@ -8,20 +8,24 @@ This module represents the SQLAlchemy schema for the user tables
 """
 from database import Base
 from sqlalchemy import Column, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 
 class User(Base):
-    """User SQLAlchemy model"""
+    """User SQLAlchemy model
+
+    The password hash and the key pair are deferred, they are only loaded by
+    the queries asking for them
+    """
 
     __tablename__ = "utilizadores"
 
     id_utilizador = Column(Integer, primary_key=True, index=True, autoincrement=True)
     nome_utilizador = Column(String, unique=True, index=True, nullable=False)
-    password = Column(String, nullable=False)
+    password = deferred(Column(String, nullable=False))
     email = Column(String, unique=True, index=True, nullable=False)
-    private_key = Column(String, nullable=False)
-    public_key = Column(String, nullable=False)
+    private_key = deferred(Column(String, nullable=False))
+    public_key = deferred(Column(String, nullable=False))
 
     docente = relationship("Docentes", back_populates="utilizador")
     nao_docente = relationship("NaoDocentes", back_populates="utilizador")
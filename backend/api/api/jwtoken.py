@@ -1,16 +1,23 @@
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 from dotenv import load_dotenv
 from fastapi.exceptions import HTTPException
 from jose import JWTError, jwt
+from schemas.token_schema import Principal
+from tools.cache import LRUCache
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+
+# verified tokens, see get_principal
+verified_tokens = LRUCache(maxsize=TOKEN_CACHE_SIZE)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -26,21 +33,50 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 
 def verify_token(token: str, credentials_exception: HTTPException):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+    get_principal(token, credentials_exception)
 
 
 def get_user_id(token: str, credentials_exception: HTTPException):
+    return get_principal(token, credentials_exception).id
+
+
+def get_principal(token: str, credentials_exception: HTTPException) -> Principal:
+    """Get the user of a token, verifying it only once
+
+    Verified tokens are kept until they expire, so the polling calls of a
+    client skip the signature check. A cached token is only used between its
+    not before and expiration times.
+
+    Args:
+        token (str): access token
+        credentials_exception (HTTPException): raised if the token is invalid
+
+    Returns:
+        Principal: token user
+    """
+    principal = verified_tokens.get(token)
+    if principal and (principal.nbf or 0) <= time.time() < principal.exp:
+        return principal
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        id: int = payload.get("id")
-        if id is None:
+        if payload.get("sub") is None or payload.get("id") is None:
             raise credentials_exception
-        return id
     except JWTError:
+        verified_tokens.pop(token)
         raise credentials_exception
+
+    principal = Principal(
+        id=payload["id"],
+        email=payload["sub"],
+        username=payload.get("username"),
+        is_teacher=payload.get("isTeacher", False),
+        is_student=payload.get("isStudent", False),
+        is_super=payload.get("isSuper", False),
+        id_docente=payload.get("id_docente"),
+        id_aluno=payload.get("id_aluno"),
+        exp=payload["exp"],
+        nbf=payload.get("nbf"),
+    )
+    verified_tokens.put(token, principal)
+    return principal
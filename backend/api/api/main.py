@@ -1,20 +1,78 @@
 from database import engine
 from db import alunos as Alunos
 from db import docentes as Docentes
+from db import horarios as Horarios
 from db import ucs as UCs
 from db import user as User
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from models import pagination, timetable
 from routers import auth, classes, course, helpers, student, teacher, uc, user
+from sqlalchemy import text
+from tools import crypt, keypool, presence_buffer, query_budget
 
 User.Base.metadata.create_all(bind=engine)
 Alunos.Base.metadata.create_all(bind=engine)
 Docentes.Base.metadata.create_all(bind=engine)
 UCs.Base.metadata.create_all(bind=engine)
+Horarios.Base.metadata.create_all(bind=engine)
+
+# create_all does not alter existing tables, add the columns added since
+with engine.begin() as connection:
+    connection.execute(
+        text(
+            "ALTER TABLE uc ADD COLUMN IF NOT EXISTS"
+            " modo_presenca VARCHAR NOT NULL DEFAULT 'rsa'"
+        )
+    )
 
 
 app = FastAPI(title="SIRPA API")
 
+query_budget.install(engine)
+
+
+@app.on_event("startup")
+def start_presence_buffer():
+    if presence_buffer.buffer:
+        presence_buffer.buffer.start()
+
+
+@app.on_event("shutdown")
+def stop_presence_buffer():
+    if presence_buffer.buffer:
+        presence_buffer.buffer.stop()
+
+
+@app.on_event("shutdown")
+def stop_crypt_pools():
+    crypt.bcrypt_pool.shutdown()
+    crypt.verifier.shutdown()
+
+
+@app.on_event("startup")
+def start_key_pool():
+    if keypool.pool:
+        keypool.pool.start()
+
+
+@app.on_event("shutdown")
+def stop_key_pool():
+    if keypool.pool:
+        keypool.pool.stop()
+
+
+@app.on_event("startup")
+def start_nightly_timetables():
+    if timetable.nightly:
+        timetable.nightly.start()
+
+
+@app.on_event("shutdown")
+def stop_nightly_timetables():
+    if timetable.nightly:
+        timetable.nightly.stop()
+
 
 origins = [
     "http://localhost:3000",
@@ -23,12 +81,19 @@ origins = [
     "https://127.0.0.1:3000",
 ]
 
+app.add_middleware(query_budget.QueryBudgetMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE", "PUT", "OPTIONS"],
     allow_headers=["Content-Type", "Set-Cookie", "Authorization"],
+    expose_headers=[
+        pagination.NEXT_CURSOR_HEADER,
+        pagination.TOTAL_ESTIMATE_HEADER,
+        query_budget.QUERY_COUNT_HEADER,
+    ],
 )
 
 app.include_router(auth.router)
@@ -8,15 +8,21 @@ This module define the model operations for the Classes
 """
 
 import base64
+import hashlib
+import hmac
 import json
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List, Optional
 
+from db.alunos import Alunos
 from db.aulas import Aulas, Presencas
+from db.docentes import Docentes
+from db.ucs import UC, InscricoesUC, Periodos
+from db.user import User
 from fastapi import HTTPException, status
-from models import user
-from models.student import get_student_id_by_user_id, get_student_user_id
-from models.teacher import get_teacher_nr_by_user_id
+from jwtoken import SECRET_KEY
+from models import roster, timetable, user
+from models.student import get_student_id_by_user_id
 from models.uc import (
     check_if_student_in_uc,
     check_if_teacher_in_uc,
@@ -24,14 +30,18 @@ from models.uc import (
     schedule_in_uc,
 )
 from schemas.class_schema import (
+    CheckinBatch,
     CreateClass,
     CreateQRCodeClass,
+    CreateSecretClass,
     ReadQRCodeClass,
     ShowClass,
 )
 from sqlalchemy import and_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from tools import crypt
+from tools import broker, crypt, presence_buffer, totp
+from tools.cache import LRUCache
 from utils import Utils
 
 
@@ -98,6 +108,7 @@ def create_class(db: Session, request: CreateClass, /) -> ShowClass:
 
     try:
         db.add(new_class)
+        timetable.invalidate_uc(db, uc_id, day=date)
         db.commit()
         db.refresh(new_class)
         return new_class
@@ -137,8 +148,10 @@ def remove_class(db: Session, /, *, class_id: int) -> ShowClass:
             ),
         )
     try:
+        timetable.invalidate_uc(db, data.id_uc, day=data.data)
         db.delete(data)
         db.commit()
+        roster.invalidate_class(class_id)
         return data
     except Exception as e:
         db.rollback()
@@ -152,20 +165,405 @@ def remove_class(db: Session, /, *, class_id: int) -> ShowClass:
         )
 
 
-def read_QRCode(db: Session, request: ReadQRCodeClass, /, *, user_id: int):
+def _checkin_context(db: Session, /, *, class_id: int, student_id: int, user_id: int):
+    """Fetch everything a check-in needs in a single round trip
+
+    Args:
+        db (Session): database session
+        class_id (int): class id
+        student_id (int): student id
+        user_id (int): user id of the teacher scanning the QRCode
+
+    Returns:
+        Row: class uc, uc attendance mode and teacher, the scanning teacher id
+        (None if the teacher is not from the class), the student user id and
+        public key (None if the student is not in the UC) and the id of an
+        already confirmed presence, or None if the class doesn't exists
+    """
+    return (
+        db.query(
+            Aulas.id_uc,
+            UC.modo_presenca,
+            Aulas.id_docente,
+            Docentes.id_docente.label("id_docente_leitor"),
+            Alunos.id_utilizador.label("id_utilizador_aluno"),
+            User.public_key,
+            Presencas.id_aluno.label("id_aluno_presente"),
+        )
+        .select_from(Aulas)
+        .join(UC, UC.id_uc == Aulas.id_uc)
+        .outerjoin(
+            Docentes,
+            and_(
+                Docentes.id_docente == Aulas.id_docente,
+                Docentes.id_utilizador == user_id,
+            ),
+        )
+        .outerjoin(
+            InscricoesUC,
+            and_(
+                InscricoesUC.id_uc == Aulas.id_uc,
+                InscricoesUC.id_aluno == student_id,
+            ),
+        )
+        .outerjoin(Alunos, Alunos.id_aluno == InscricoesUC.id_aluno)
+        .outerjoin(User, User.id_utilizador == Alunos.id_utilizador)
+        .outerjoin(
+            Presencas,
+            and_(
+                Presencas.id_aula == Aulas.id_aula,
+                Presencas.id_aluno == student_id,
+            ),
+        )
+        .filter(Aulas.id_aula == class_id)
+        .first()
+    )
+
+
+def _validate_checkin(db: Session, /, *, class_id: int, student_id: int, user_id: int):
+    """Validate a check-in against the class roster
+
+    The roster of a class being checked in is kept in memory, outside of
+    the class schedule it is fetched with a single query.
+
+    Args:
+        db (Session): database session
+        class_id (int): class id
+        student_id (int): student id
+        user_id (int): user id of the teacher scanning the QRCode
+
+    Raises:
+        HTTPException: Class not found
+        HTTPException: Presence already confirmed
+        HTTPException: Teacher is not from this class
+        HTTPException: Student is not in UC
+        HTTPException: Invalid public key
+
+    Returns:
+        tuple: student public key, the class roster (None if not in memory)
+        and the uc attendance mode
+    """
+    session = roster.open_session(db, class_id)
+    if session:
+        found = True
+        modo_presenca = session.modo_presenca
+        confirmed = student_id in session.confirmed
+        from_class = session.teacher_user_id == user_id
+        ku = session.keys.get(student_id)
+    else:
+        context = _checkin_context(
+            db, class_id=class_id, student_id=student_id, user_id=user_id
+        )
+        found = context is not None
+        modo_presenca = found and context.modo_presenca
+        confirmed = found and context.id_aluno_presente
+        from_class = found and context.id_docente_leitor
+        ku = (
+            user.load_ku(context.id_utilizador_aluno, context.public_key)
+            if found and context.public_key
+            else None
+        )
+
+    if not found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND,
+                f"Class with id: {class_id} not found!",
+            ),
+        )
+
+    if confirmed:
+        raise HTTPException(
+            status_code=status.HTTP_302_FOUND,
+            detail=Utils.error_msg(
+                status.HTTP_302_FOUND,
+                "Presence already confirmed!",
+            ),
+        )
+
+    if not from_class:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND,
+                "Teacher is not from this class",
+            ),
+        )
+
+    if not ku:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND,
+                "Student is not in UC",
+            ),
+        )
+
+    if isinstance(ku, dict):
+        # the stored key could not be parsed, see crypt.load_pub_key
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=Utils.error_msg(
+                status.HTTP_409_CONFLICT,
+                "Invalid public key",
+                error=ku["error"],
+            ),
+        )
+
+    return ku, session, modo_presenca
+
+
+def _check_token(
+    modo_presenca: str,
+    /,
+    *,
+    class_id: int,
+    student_id: int,
+    token: str,
+    scanned_at: Optional[datetime] = None,
+) -> bool:
+    """Check a rotating check-in token, only accepted in the totp mode
+
+    Args:
+        modo_presenca (str): uc attendance mode
+        class_id (int): class id
+        student_id (int): student id
+        token (str): token shown by the student
+        scanned_at (Optional[datetime], optional): capture time of a queued
+        scan. Defaults to now.
+
+    Returns:
+        bool: token is valid
+    """
+    at = totp.scan_time(scanned_at)
+    return (
+        modo_presenca == "totp"
+        and at is not None
+        and totp.verify(totp.class_secret(class_id, student_id), token, at=at)
+    )
+
+
+def _insert_presence(db: Session, /, *, class_id: int, student_id: int):
+    """Insert a presence, ignoring it if it was already confirmed
+
+    The commit is left to the caller.
+
+    Args:
+        db (Session): database session
+        class_id (int): class id
+        student_id (int): student id
+
+    Returns:
+        Row: inserted presence, None if the presence already existed
+    """
+    stmt = (
+        insert(Presencas)
+        .values(id_aula=class_id, id_aluno=student_id, confirmacao=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=[Presencas.id_aula, Presencas.id_aluno])
+        .returning(Presencas.id_aula, Presencas.id_aluno, Presencas.confirmacao)
+    )
+    return db.execute(stmt).first()
+
+
+def _publish_presences(class_id: int, presencas: List[Dict], /):
+    """Push the recorded presences to the teachers watching the class"""
+    for presenca in presencas:
+        broker.presences.publish(
+            class_id,
+            {"id_aluno": presenca["id_aluno"], "confirmacao": presenca["confirmacao"]},
+        )
+
+
+def _record_presence(db: Session, /, *, class_id: int, student_id: int) -> Dict:
+    """Record a validated presence, through the write-behind buffer if enabled
+
+    Args:
+        db (Session): database session
+        class_id (int): class id
+        student_id (int): student id
+
+    Returns:
+        Dict: recorded presence, None if the presence was already confirmed
+    """
+    if presence_buffer.buffer:
+        confirmacao = datetime.utcnow()
+        if not presence_buffer.buffer.append(
+            class_id=class_id, student_id=student_id, confirmacao=confirmacao
+        ):
+            return None
+        presenca = {
+            "id_aula": class_id,
+            "id_aluno": student_id,
+            "confirmacao": confirmacao,
+        }
+    else:
+        presenca = _insert_presence(db, class_id=class_id, student_id=student_id)
+        db.commit()
+        if not presenca:
+            return None
+        presenca = dict(presenca._mapping)
+
+    _publish_presences(class_id, [presenca])
+    return presenca
+
+
+def _record_presences(
+    db: Session, /, *, class_id: int, student_ids: List[int]
+) -> Dict[int, Dict]:
+    """Record validated presences with a single insert, through the
+    write-behind buffer if enabled
+
+    Args:
+        db (Session): database session
+        class_id (int): class id
+        student_ids (List[int]): students ids
+
+    Returns:
+        Dict[int, Dict]: recorded presences by student id, the presences
+        already confirmed are left out
+    """
+    if not student_ids:
+        return {}
+    confirmacao = datetime.utcnow()
+    if presence_buffer.buffer:
+        presencas = {
+            student_id: {
+                "id_aula": class_id,
+                "id_aluno": student_id,
+                "confirmacao": confirmacao,
+            }
+            for student_id in student_ids
+            if presence_buffer.buffer.append(
+                class_id=class_id, student_id=student_id, confirmacao=confirmacao
+            )
+        }
+        _publish_presences(class_id, list(presencas.values()))
+        return presencas
+
+    stmt = (
+        insert(Presencas)
+        .values(
+            [
+                {
+                    "id_aula": class_id,
+                    "id_aluno": student_id,
+                    "confirmacao": confirmacao,
+                }
+                for student_id in student_ids
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[Presencas.id_aula, Presencas.id_aluno])
+        .returning(Presencas.id_aula, Presencas.id_aluno, Presencas.confirmacao)
+    )
+    presencas = db.execute(stmt).all()
+    db.commit()
+    presencas = {presenca.id_aluno: dict(presenca._mapping) for presenca in presencas}
+    _publish_presences(class_id, list(presencas.values()))
+    return presencas
+
+
+def get_presences_snapshot(
+    db: Session, /, *, class_id: int, teacher_id: Optional[int]
+) -> List[int]:
+    """Get the students already checked in a class, for a teacher starting
+    to watch its presences
+
+    Args:
+        db (Session): database session
+        class_id (int): class id
+        teacher_id (Optional[int]): teacher id of the user
+
+    Raises:
+        HTTPException: Class not found
+        HTTPException: Teacher is not from this class
+
+    Returns:
+        List[int]: ids of the students present, including the buffered ones
+    """
+    aula = db.query(Aulas.id_docente).filter(Aulas.id_aula == class_id).first()
+    if not aula:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND,
+                "Class not found",
+            ),
+        )
+    if aula.id_docente != teacher_id:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=Utils.error_msg(
+                status.HTTP_409_CONFLICT,
+                "Teacher is not from this class",
+            ),
+        )
+
+    students = {
+        row.id_aluno
+        for row in db.query(Presencas.id_aluno).filter(Presencas.id_aula == class_id)
+    }
+    if presence_buffer.buffer:
+        students.update(presence_buffer.buffer.pending_students(class_id))
+    return sorted(students)
+
+
+def read_QRCode(db: Session, request: ReadQRCodeClass, /, *, user_id: int) -> Dict:
+    """Check in a student from the QRCode data read by the teacher
+
+    Args:
+        db (Session): database session
+        request (ReadQRCodeClass): QRCode data
+        user_id (int): user id of the teacher
+
+    Raises:
+        HTTPException: Error checking in student
+
+    Returns:
+        Dict: confirmed presence
+    """
     try:
         student_id = request.msg.id_aluno
         class_id = request.msg.id_aula
         signature = request.signature
         msg = {"id_aluno": student_id, "id_aula": class_id}
-        presenca = (
-            db.query(Presencas)
-            .filter(
-                and_(Presencas.id_aluno == student_id, Presencas.id_aula == class_id)
-            )
-            .first()
+
+        ku, session, modo_presenca = _validate_checkin(
+            db, class_id=class_id, student_id=student_id, user_id=user_id
         )
-        if presenca:
+        if request.token is not None:
+            if not _check_token(
+                modo_presenca,
+                class_id=class_id,
+                student_id=student_id,
+                token=request.token,
+                scanned_at=request.scanned_at,
+            ):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=Utils.error_msg(
+                        status.HTTP_409_CONFLICT,
+                        "Invalid token",
+                    ),
+                )
+        else:
+            decoded_sig = base64.decodebytes(bytes(signature or "", "utf-8"))
+            check = crypt.verifier.submit(
+                [(ku, bytes(json.dumps(msg), "utf-8"), decoded_sig)]
+            )
+            if not check.result()[0]:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=Utils.error_msg(
+                        status.HTTP_409_CONFLICT,
+                        "Invalid signature",
+                    ),
+                )
+
+        presenca = _record_presence(db, class_id=class_id, student_id=student_id)
+        if session:
+            session.confirmed.add(student_id)
+        if not presenca:
             raise HTTPException(
                 status_code=status.HTTP_302_FOUND,
                 detail=Utils.error_msg(
@@ -174,62 +572,168 @@ def read_QRCode(db: Session, request: ReadQRCodeClass, /, *, user_id: int):
                 ),
             )
 
-        student_user_id = get_student_user_id(db, student_id=student_id)
-        class_data = db.query(Aulas).get(class_id)
-        teacher_id = get_teacher_nr_by_user_id(db, user_id=user_id)
-        if teacher_id != class_data.id_docente:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=Utils.error_msg(
-                    status.HTTP_404_NOT_FOUND,
-                    "Teacher is not from this class",
-                ),
-            )
+        return presenca
 
-        if not check_if_student_in_uc(
-            db, student_id=student_id, uc_id=class_data.id_uc
-        ):
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=Utils.error_msg(
-                    status.HTTP_404_NOT_FOUND,
-                    "Student is not in UC",
-                ),
-            )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=Utils.error_msg(
+                status.HTTP_409_CONFLICT,
+                "Error checking in student",
+                error=repr(e),
+            ),
+        )
+
+
+def read_QRCodes(db: Session, request: CheckinBatch, /, *, user_id: int) -> List[Dict]:
+    """Check in a batch of students scanned by the teacher for one class
+
+    The QRCodes are validated together, the signatures verified as a batch
+    and the presences inserted in a single transaction. Repeated scans of
+    a student are checked in once.
 
-        pub_key = user.get_ku(db, student_user_id)
-        ku = crypt.load_pub_key(pub_key)
-        decoded_sig = base64.decodebytes(bytes(signature, "utf-8"))
-        check = crypt.verify(ku, bytes(json.dumps(msg), "utf-8"), decoded_sig)
-        if check["data"] == "data validated":
-            presenca: Presencas = Presencas(
-                id_aluno=student_id, id_aula=class_id, confirmacao=datetime.utcnow()
+    Args:
+        db (Session): database session
+        request (CheckinBatch): class id and QRCodes data
+        user_id (int): user id of the teacher
+
+    Raises:
+        HTTPException: Error checking in students, the batch can be sent again
+
+    Returns:
+        List[Dict]: result of each student, in the order of the first scan
+    """
+    class_id = request.id_aula
+    results: Dict[int, Dict] = {}
+    jobs = []
+    valid = []
+    try:
+        for checkin in request.checkins:
+            student_id = checkin.msg.id_aluno
+            if student_id in results:
+                continue
+            result = results[student_id] = {"id_aluno": student_id}
+            if checkin.msg.id_aula != class_id:
+                result.update(
+                    code=status.HTTP_409_CONFLICT, msg="QRCode from another class"
+                )
+                continue
+            try:
+                ku, session, modo_presenca = _validate_checkin(
+                    db, class_id=class_id, student_id=student_id, user_id=user_id
+                )
+                if checkin.token is not None:
+                    if _check_token(
+                        modo_presenca,
+                        class_id=class_id,
+                        student_id=student_id,
+                        token=checkin.token,
+                        scanned_at=checkin.scanned_at,
+                    ):
+                        valid.append(student_id)
+                    else:
+                        result.update(
+                            code=status.HTTP_409_CONFLICT, msg="Invalid token"
+                        )
+                    continue
+                msg = {"id_aluno": student_id, "id_aula": class_id}
+                decoded_sig = base64.decodebytes(
+                    bytes(checkin.signature or "", "utf-8")
+                )
+            except HTTPException as e:
+                result.update(code=e.status_code, msg=e.detail["error"]["msg"])
+                continue
+            except ValueError:
+                result.update(code=status.HTTP_409_CONFLICT, msg="Invalid signature")
+                continue
+            jobs.append(
+                (student_id, (ku, bytes(json.dumps(msg), "utf-8"), decoded_sig))
             )
-            db.add(presenca)
-            db.commit()
-            db.refresh(presenca)
 
-            return presenca
+        checks = crypt.verifier.submit([job for _, job in jobs]).result()
+        for (student_id, _), check in zip(jobs, checks):
+            if check:
+                valid.append(student_id)
+            else:
+                results[student_id].update(
+                    code=status.HTTP_409_CONFLICT, msg="Invalid signature"
+                )
+
+        presencas = _record_presences(db, class_id=class_id, student_ids=valid)
+        session = roster.open_session(db, class_id) if valid else None
+        for student_id in valid:
+            if session:
+                session.confirmed.add(student_id)
+            if student_id in presencas:
+                results[student_id].update(
+                    code=status.HTTP_200_OK,
+                    msg="Presence confirmed",
+                    confirmacao=presencas[student_id]["confirmacao"],
+                )
+            else:
+                results[student_id].update(
+                    code=status.HTTP_302_FOUND, msg="Presence already confirmed!"
+                )
+        return list(results.values())
 
     except Exception as e:
+        # the problems of a student are in its result, anything else fails
+        # the batch and the scans are sent again, the presences recorded
+        # before the error come back as already confirmed
         db.rollback()
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=Utils.error_msg(
-                status.HTTP_409_CONFLICT,
-                "Error checking in student",
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                "Error checking in students",
                 error=repr(e),
             ),
         )
 
 
-def create_QRCode(db: Session, request: CreateQRCodeClass, /, *, user_id: int) -> Dict:
+# signed QRCode payloads by student, class and password digest, kept until the
+# class ends, see create_QRCode
+qrcodes = LRUCache(maxsize=4096)
+
+
+def _password_digest(user_id: int, password: str, /) -> bytes:
+    """Digest of the password a QRCode was signed with, so a wrong password
+    never matches a cached QRCode
+
+    Args:
+        user_id (int): user id
+        password (str): password used to decrypt the private key
+
+    Returns:
+        bytes: HMAC of the user id and password with the api secret
+    """
+    return hmac.new(
+        bytes(SECRET_KEY, "utf-8"),
+        bytes(f"{user_id}:{password}", "utf-8"),
+        hashlib.sha256,
+    ).digest()
+
+
+def create_QRCode(
+    db: Session,
+    request: CreateQRCodeClass,
+    /,
+    *,
+    user_id: int,
+    student_id: Optional[int] = None,
+) -> Dict:
     """Create QRCode data to show to teacher
 
+    The QRCode is cached until the class ends, so opening it again skips the
+    private key decryption and the signature, the enrollment is still checked.
+
     Args:
         db (Session): database session
         request (CreateQRCodeClass) data
         user_id (int): user id
+        student_id (int, optional): student id from the token claims, looked
+        up by user id if missing. Defaults to None.
 
     Raises:
         HTTPException: Student not found
@@ -239,8 +743,20 @@ def create_QRCode(db: Session, request: CreateQRCodeClass, /, *, user_id: int) -
         Dict: QRCode data
     """
     class_id = request.id_aula
-    student_id = get_student_id_by_user_id(db, user_id=user_id)
+    if student_id is None:
+        student_id = get_student_id_by_user_id(db, user_id=user_id)
     password = request.password
+    cache_key = (student_id, class_id, _password_digest(user_id, password))
+    cached = qrcodes.get(cache_key)
+    if cached:
+        expires_at, uc_id, qrcode = cached
+        # the student may have left the uc since it was signed
+        if datetime.now() < expires_at and check_if_student_in_uc(
+            db, student_id=student_id, uc_id=uc_id
+        ):
+            return qrcode
+        qrcodes.pop(cache_key)
+
     aula = db.query(Aulas).get(class_id)
     uc_id = aula.id_uc
 
@@ -267,5 +783,94 @@ def create_QRCode(db: Session, request: CreateQRCodeClass, /, *, user_id: int) -
     kr = crypt.load_priv_key(encrypted_kr, password)
     sign_msg = crypt.sign(kr, bytes(json.dumps(msg), "utf-8"))
     sign_msg_b64 = base64.encodebytes(sign_msg)
+    qrcode = {"signature": sign_msg_b64, "msg": msg}
+
+    schedule = db.query(Periodos).get(aula.id_periodo)
+    expires_at = datetime.combine(aula.data, schedule.hora_fim)
+    qrcodes.put(cache_key, (expires_at, uc_id, qrcode))
+    return qrcode
+
+
+def create_checkin_secret(
+    db: Session,
+    request: CreateSecretClass,
+    /,
+    *,
+    user_id: int,
+    student_id: Optional[int] = None,
+) -> Dict:
+    """Issue the check-in token secret of a student for a class
+
+    The device keeps the secret and shows the rotating token to the teacher,
+    only for the UCs in the totp attendance mode.
+
+    Args:
+        db (Session): database session
+        request (CreateSecretClass): class id
+        user_id (int): user id
+        student_id (int, optional): student id from the token claims, looked
+        up by user id if missing. Defaults to None.
+
+    Raises:
+        HTTPException: Class not found
+        HTTPException: Student not found
+        HTTPException: UC doesn't use check-in tokens
+        HTTPException: Student not in uc
+
+    Returns:
+        Dict: secret, token step in seconds and token digits
+    """
+    class_id = request.id_aula
+    if student_id is None:
+        student_id = get_student_id_by_user_id(db, user_id=user_id)
+    aula = (
+        db.query(Aulas.id_uc, UC.modo_presenca)
+        .join(UC, UC.id_uc == Aulas.id_uc)
+        .filter(Aulas.id_aula == class_id)
+        .first()
+    )
+
+    if not aula:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND,
+                f"Class with id: {class_id} not found!",
+            ),
+        )
+
+    if not student_id:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND,
+                "Student not found",
+            ),
+        )
+
+    if aula.modo_presenca != "totp":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=Utils.error_msg(
+                status.HTTP_409_CONFLICT,
+                "UC doesn't use check-in tokens",
+            ),
+        )
+
+    if not check_if_student_in_uc(db, student_id=student_id, uc_id=aula.id_uc):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND,
+                "Student is not in UC",
+            ),
+        )
 
-    return {"signature": sign_msg_b64, "msg": msg}
+    secret = totp.class_secret(class_id, student_id)
+    return {
+        "id_aula": class_id,
+        "id_aluno": student_id,
+        "secret": base64.b64encode(secret).decode("utf-8"),
+        "step": totp.STEP,
+        "digits": totp.DIGITS,
+    }
@@ -7,17 +7,34 @@ This module define the model operations for the courses
 @Email: j.b.galinha@gmail.com
 """
 
-from typing import List
+from typing import Optional
 
 from db.ucs import Cursos, InscricoesCursos
 from fastapi import HTTPException, status
+from models import timetable
+from models.fieldsets import Fields, Fieldset
 from models.helpers import year_exists_by_id
+from models.pagination import Page, paginate
 from models.student import check_student_by_id
 from schemas import courses_schema, nm_schema
 from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload, selectinload
 from utils import Utils
 
+# loader options of the ShowCourse responses, only columns, a nested field
+# added to the schema fails instead of being loaded course by course
+SHOW_COURSE = (raiseload("*"),)
+
+COURSE_FIELDS = Fields(Cursos, courses_schema.ShowCourse, {})
+
+# loader options of the ShowCourseWithUcs responses
+COURSE_WITH_UCS_RELATIONSHIPS = {"ucs": selectinload(Cursos.ucs)}
+SHOW_COURSE_WITH_UCS = tuple(COURSE_WITH_UCS_RELATIONSHIPS.values())
+
+COURSE_WITH_UCS_FIELDS = Fields(
+    Cursos, courses_schema.ShowCourseWithUcs, COURSE_WITH_UCS_RELATIONSHIPS
+)
+
 
 def check_course_exists_by_id(db: Session, /, *, id_course: int) -> bool:
     """Check if a course already exists in database by id
@@ -78,19 +95,41 @@ def check_course_exists(db: Session, /, *, name: str) -> bool:
 
 
 def list_courses(
-    db: Session, /, *, skip: int = 0, limit: int = 100
-) -> List[courses_schema.ShowCourse]:
+    db: Session,
+    /,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fieldset: Optional[Fieldset] = None,
+) -> Page:
     """Get list of courses
 
     Args:
         db (Session): database session
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 0.
+        cursor (Optional[str], optional): cursor of the previous page.
+        Defaults to None.
+        estimate (bool, optional): estimate the total of rows.
+        Defaults to False.
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
-        List[courses_schema.ShowCourse]: List of Courses
+        Page: courses ordered by id and cursor of the next page
     """
-    return db.query(Cursos).offset(skip).limit(limit).all()
+    options = fieldset.options() if fieldset else SHOW_COURSE
+    return paginate(
+        db,
+        db.query(Cursos).options(*options),
+        Cursos.id_curso,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+    )
 
 
 def create_course(
@@ -129,18 +168,21 @@ def create_course(
 
 
 def get_course_by_id(
-    db: Session, /, *, course_id: int
+    db: Session, /, *, course_id: int, fieldset: Optional[Fieldset] = None
 ) -> courses_schema.ShowCourseWithUcs:
     """Get course by id
 
     Args:
         db (Session): database session
         course_id (int): course id
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
         courses_schema.ShowCourse: Course details
     """
-    return db.query(Cursos).get(course_id)
+    options = fieldset.options() if fieldset else SHOW_COURSE_WITH_UCS
+    return db.query(Cursos).options(*options).get(course_id)
 
 
 def delete_course_by_id(db: Session, /, *, course_id: int) -> courses_schema.ShowCourse:
@@ -167,6 +209,7 @@ def delete_course_by_id(db: Session, /, *, course_id: int) -> courses_schema.Sho
             ),
         )
     try:
+        timetable.invalidate_course(db, course_id)
         db.delete(course)
         db.commit()
         return course
@@ -215,6 +258,7 @@ def update_course_by_id(
                 Cursos.descricao_curso: course_data.descricao_curso,
             }
         )
+        timetable.invalidate_course(db, course_id)
         db.commit()
         return db.query(Cursos).get(course_id)
     except Exception as e:
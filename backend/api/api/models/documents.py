@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""Documents model file
+
+This module define a fast path for the busiest read endpoints: the response
+documents are rendered by Postgres, with to_json over row subqueries and
+array_agg, and sent as they come, without building ORM objects or running
+the response models. The documents keep the key order, types and formats of
+the response models byte for byte, tests/test_documents.py checks them.
+
+to_json renders compact json, json_build_object and json_agg are not used,
+they add spaces around the separators.
+
+Enable it with JSON_FAST_PATH=1.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import os
+from datetime import date
+from typing import List, Optional, Union
+
+from db.ucs import Cursos
+from dotenv import load_dotenv
+from fastapi import HTTPException, Response, status
+from models.pagination import Page, paginate
+from sqlalchemy import literal_column, text
+from sqlalchemy.orm import Session
+from utils import Utils
+
+load_dotenv()
+
+ENABLED = os.getenv("JSON_FAST_PATH", "0") == "1"
+
+
+def _object(**fields: str) -> str:
+    """SQL of a json object of SQL expressions, with the keys in order"""
+    columns = ", ".join(f'{sql} AS "{name}"' for name, sql in fields.items())
+    return f"(SELECT to_json(r) FROM (SELECT {columns}) r)"
+
+
+def _array(
+    element: str, source: str, order: str, /, *, empty: Optional[str] = "[]"
+) -> str:
+    """SQL of a json array of an element per row of a source
+
+    Args:
+        element (str): SQL of an element
+        source (str): FROM and WHERE of the rows
+        order (str): order of the elements
+        empty (Optional[str], optional): json of no rows, None for null.
+        Defaults to "[]".
+    """
+    array = f"array_to_json(array_agg({element} ORDER BY {order}))"
+    if empty is not None:
+        array = f"coalesce({array}, '{empty}')"
+    return f"(SELECT {array} FROM {source})"
+
+
+def _isoformat(column: str, pattern: str, /) -> str:
+    """SQL of isoformat() of a time or timestamp column, to_json trims the
+    trailing zeros of the microseconds
+    """
+    return (
+        f"to_char({column}, '{pattern}') || CASE"
+        f" WHEN extract(microseconds FROM {column})::bigint % 1000000 = 0"
+        f" THEN '' ELSE to_char({column}, '.US') END"
+    )
+
+
+def _time(column: str, /) -> str:
+    return _isoformat(f"{column}::interval", "HH24:MI:SS")
+
+
+def _timestamp(column: str, /) -> str:
+    return _isoformat(column, 'YYYY-MM-DD"T"HH24:MI:SS')
+
+
+# ShowUC
+UC_SQL = text(
+    f"""
+    SELECT {_object(
+        nome_uc="uc.nome_uc",
+        descricao="uc.descricao",
+        modo_presenca="uc.modo_presenca",
+        id_uc="uc.id_uc",
+        curso=_object(
+            nome_curso="c.nome_curso",
+            descricao_curso="c.descricao_curso",
+            id_curso="c.id_curso",
+        ),
+        inscricoes=_array(
+            _object(
+                id_aluno="i.id_aluno",
+                data_inscricao="i.data_inscricao",
+                aluno=_object(nome="a.nome", nr_aluno="a.nr_aluno"),
+            ),
+            "inscricoes_uc i JOIN alunos a ON a.id_aluno = i.id_aluno"
+            " WHERE i.id_uc = uc.id_uc",
+            "i.id_aluno",
+        ),
+        docentes=_array(
+            _object(
+                id_docente="ud.id_docente",
+                docente=_object(nome="d.nome", nr_docente="d.nr_docente"),
+            ),
+            "uc_docentes ud JOIN docentes d ON d.id_docente = ud.id_docente"
+            " WHERE ud.id_uc = uc.id_uc",
+            "ud.id_docente",
+        ),
+    )}::text
+    FROM uc JOIN cursos c ON c.id_curso = uc.id_curso
+    WHERE uc.id_uc = :uc_id
+    """
+)
+
+# ShowCourse, a document per row of the page
+COURSE_SQL = literal_column(
+    _object(
+        nome_curso="cursos.nome_curso",
+        descricao_curso="cursos.descricao_curso",
+        id_curso="cursos.id_curso",
+    )
+    + "::text"
+)
+
+# TodayStudent, the enrollments, schedules and classes of the day, ordered by
+# their first class as student.today does
+STUDENT_DAY_SQL = text(
+    f"""
+    WITH dia AS (
+        SELECT i.id_uc, pe.id_periodo,
+            row_number() OVER (ORDER BY pe.hora_inicio, a.id_aula) AS ordem
+        FROM alunos al
+        JOIN inscricoes_uc i ON i.id_aluno = al.id_aluno
+        JOIN periodos pe ON pe.id_uc = i.id_uc
+        JOIN aulas a ON a.id_periodo = pe.id_periodo AND a.data = :day
+        WHERE al.id_utilizador = :user_id
+    )
+    SELECT {_object(
+        nome="al.nome",
+        nr_aluno="al.nr_aluno",
+        id_aluno="al.id_aluno",
+        inscricoes_ucs=_array(
+            _object(
+                id_uc="i.id_uc",
+                data_inscricao="i.data_inscricao",
+                uc=_object(
+                    nome_uc="uc.nome_uc",
+                    modo_presenca="uc.modo_presenca",
+                    periodos=_array(
+                        _object(
+                            id_periodo="pe.id_periodo",
+                            dia_semana="pe.dia_semana",
+                            hora_inicio=_time("pe.hora_inicio"),
+                            hora_fim=_time("pe.hora_fim"),
+                            aulas=_array(
+                                _object(
+                                    id_aula="a.id_aula",
+                                    id_docente="a.id_docente",
+                                    data="a.data",
+                                    resumo="a.resumo",
+                                    sala="a.sala",
+                                ),
+                                "aulas a WHERE a.id_periodo = pe.id_periodo"
+                                " AND a.data = :day",
+                                "a.id_aula",
+                            ),
+                        ),
+                        "periodos pe WHERE pe.id_uc = uc.id_uc"
+                        " AND pe.id_periodo IN (SELECT id_periodo FROM dia)",
+                        "(SELECT min(ordem) FROM dia"
+                        " WHERE dia.id_periodo = pe.id_periodo)",
+                    ),
+                ),
+            ),
+            "inscricoes_uc i JOIN uc ON uc.id_uc = i.id_uc"
+            " WHERE i.id_aluno = al.id_aluno"
+            " AND i.id_uc IN (SELECT id_uc FROM dia)",
+            "(SELECT min(ordem) FROM dia WHERE dia.id_uc = i.id_uc)",
+            empty=None,
+        ),
+    )}::text
+    FROM alunos al
+    WHERE al.id_utilizador = :user_id
+    """
+)
+
+# TodayTeacher, the classes of the day with their current presences
+TEACHER_DAY_SQL = text(
+    f"""
+    SELECT {_object(
+        nome="d.nome",
+        nr_docente="d.nr_docente",
+        id_docente="d.id_docente",
+        aulas=_array(
+            _object(
+                id_aula="a.id_aula",
+                data="a.data",
+                resumo="a.resumo",
+                sumario="a.sumario",
+                sala="a.sala",
+                presencas=_array(
+                    _object(
+                        id_aluno="p.id_aluno",
+                        confirmacao=_timestamp("p.confirmacao"),
+                        aluno=_object(nome="al.nome", nr_aluno="al.nr_aluno::text"),
+                    ),
+                    "presencas p JOIN alunos al ON al.id_aluno = p.id_aluno"
+                    " WHERE p.id_aula = a.id_aula",
+                    "p.confirmacao, p.id_aluno",
+                ),
+                uc=_object(
+                    id_uc="uc.id_uc",
+                    nome_uc="uc.nome_uc",
+                    curso=_object(id_curso="c.id_curso", nome_curso="c.nome_curso"),
+                ),
+                periodo=_object(
+                    id_periodo="pe.id_periodo",
+                    dia_semana="pe.dia_semana",
+                    hora_inicio=_time("pe.hora_inicio"),
+                    hora_fim=_time("pe.hora_fim"),
+                ),
+            ),
+            "aulas a JOIN uc ON uc.id_uc = a.id_uc"
+            " JOIN cursos c ON c.id_curso = uc.id_curso"
+            " JOIN periodos pe ON pe.id_periodo = a.id_periodo"
+            " WHERE a.id_docente = d.id_docente AND a.data = :day",
+            "a.id_aula",
+        ),
+    )}::text
+    FROM docentes d
+    WHERE d.id_utilizador = :user_id
+    """
+)
+
+
+def _not_found(msg: str, /) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=Utils.error_msg(status.HTTP_404_NOT_FOUND, msg),
+    )
+
+
+def get_uc(db: Session, /, *, uc_id: int) -> str:
+    """ShowUC document of an uc
+
+    Args:
+        db (Session): database session
+        uc_id (int): uc id
+
+    Raises:
+        HTTPException: uc not found
+
+    Returns:
+        str: json document
+    """
+    document = db.execute(UC_SQL, {"uc_id": uc_id}).scalar()
+    if document is None:
+        raise _not_found(f"uc with id: {uc_id} not found")
+    return document
+
+
+def list_courses(
+    db: Session,
+    /,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+) -> Page:
+    """ShowCourse documents of a page of courses
+
+    Args:
+        db (Session): database session
+        skip (int, optional): rows to skip. Defaults to 0.
+        limit (int, optional): limit of rows. Defaults to 100.
+        cursor (Optional[str], optional): cursor of the previous page.
+        Defaults to None.
+        estimate (bool, optional): estimate the total of rows.
+        Defaults to False.
+
+    Returns:
+        Page: json documents of the courses and cursor of the next page
+    """
+    page = paginate(
+        db,
+        db.query(Cursos.id_curso, COURSE_SQL.label("documento")),
+        Cursos.id_curso,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+    )
+    return page._replace(items=[row.documento for row in page.items])
+
+
+def student_day(db: Session, /, *, user_id: int, day: Optional[date] = None) -> str:
+    """TodayStudent document of a student
+
+    Args:
+        db (Session): database session
+        user_id (int): user id
+        day (Optional[date], optional): day. Defaults to today.
+
+    Raises:
+        HTTPException: Student not found
+
+    Returns:
+        str: json document
+    """
+    document = db.execute(
+        STUDENT_DAY_SQL, {"user_id": user_id, "day": day or date.today()}
+    ).scalar()
+    if document is None:
+        raise _not_found(f"Student with user id: {user_id} not found!")
+    return document
+
+
+def teacher_day(db: Session, /, *, user_id: int, day: Optional[date] = None) -> str:
+    """TodayTeacher document of a teacher
+
+    Args:
+        db (Session): database session
+        user_id (int): user id
+        day (Optional[date], optional): day. Defaults to today.
+
+    Raises:
+        HTTPException: Teacher not found
+
+    Returns:
+        str: json document
+    """
+    document = db.execute(
+        TEACHER_DAY_SQL, {"user_id": user_id, "day": day or date.today()}
+    ).scalar()
+    if document is None:
+        raise _not_found(f"Teacher with user id: {user_id} not found!")
+    return document
+
+
+def respond(response: Response, document: Union[str, List[str]], /) -> Response:
+    """Response of a json document, or of a list of documents
+
+    Args:
+        response (Response): route response, its headers are kept
+        document (Union[str, List[str]]): json document or documents
+
+    Returns:
+        Response: json response
+    """
+    if isinstance(document, list):
+        document = f"[{','.join(document)}]"
+    return Response(
+        content=document,
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""Fieldsets model file
+
+This module define the sparse fieldsets of the read endpoints. fields= lists
+the columns of the response and expand= the relationships, serialized with
+their usual schemas. Only the requested columns and relationships are
+loaded, the others raise instead of being loaded by accident. Without
+fields or expand the endpoints keep their full responses.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+from typing import Any, Dict, List, Optional, Type
+
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import load_only, raiseload
+from sqlalchemy.orm.interfaces import LoaderOption
+from utils import Utils
+
+
+def _split(value: Optional[str], /) -> List[str]:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+class Fieldset:
+    """Columns and relationships of a sparse response
+
+    Args:
+        model: SQLAlchemy model
+        schema (Type[BaseModel]): full response schema
+        columns (List[str]): requested columns
+        relationships (Dict[str, LoaderOption]): loader options of the
+        requested relationships
+    """
+
+    def __init__(
+        self,
+        model,
+        schema: Type[BaseModel],
+        columns: List[str],
+        relationships: Dict[str, LoaderOption],
+        /,
+    ):
+        self.model = model
+        self.schema = schema
+        self.columns = columns
+        self.relationships = relationships
+
+    def options(self) -> List[LoaderOption]:
+        """Loader options of the requested data, the rest is not loaded"""
+        return [
+            load_only(*(getattr(self.model, column) for column in self.columns)),
+            *self.relationships.values(),
+            raiseload("*"),
+        ]
+
+    def project(self, row: Any, /) -> Optional[Dict[str, Any]]:
+        """Requested fields of a row, validated by the response schema"""
+        if row is None:
+            return None
+        content, errors = {}, []
+        for name in (*self.columns, *self.relationships):
+            value, error = self.schema.__fields__[name].validate(
+                getattr(row, name), content, loc=name
+            )
+            if error:
+                errors.append(error)
+            content[name] = value
+        if errors:
+            raise ValidationError(errors, self.schema)
+        return content
+
+
+class Fields:
+    """Fields of the responses of a model
+
+    Args:
+        model: SQLAlchemy model
+        schema (Type[BaseModel]): full response schema
+        relationships (Dict[str, LoaderOption]): loader options of the
+        relationships of the schema
+    """
+
+    def __init__(
+        self, model, schema: Type[BaseModel], relationships: Dict[str, LoaderOption]
+    ):
+        self.model = model
+        self.schema = schema
+        self.relationships = relationships
+        self.columns = [name for name in schema.__fields__ if name not in relationships]
+
+    def select(
+        self, fields: Optional[str] = None, expand: Optional[str] = None
+    ) -> Optional[Fieldset]:
+        """Fieldset of the fields= and expand= query parameters
+
+        Args:
+            fields (Optional[str], optional): comma separated columns.
+            Defaults to every column.
+            expand (Optional[str], optional): comma separated relationships.
+            Defaults to none.
+
+        Raises:
+            HTTPException: Unknown field
+
+        Returns:
+            Optional[Fieldset]: fieldset, None for the full response
+        """
+        if not fields and not expand:
+            return None
+        columns, relationships = _split(fields) or self.columns, _split(expand)
+        unknown = [name for name in columns if name not in self.columns] + [
+            name for name in relationships if name not in self.relationships
+        ]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=Utils.error_msg(
+                    status.HTTP_400_BAD_REQUEST,
+                    f"Unknown fields: {', '.join(unknown)}",
+                ),
+            )
+        return Fieldset(
+            self.model,
+            self.schema,
+            list(dict.fromkeys(columns)),
+            {name: self.relationships[name] for name in relationships},
+        )
+
+
+def respond(response: Response, content: Any, fieldset: Optional[Fieldset], /) -> Any:
+    """Project the content of a route on a fieldset
+
+    Args:
+        response (Response): route response, its headers are kept
+        content (Any): row or rows of the route
+        fieldset (Optional[Fieldset]): fieldset, None for the full response
+
+    Returns:
+        Any: content, or a JSONResponse of the requested fields
+    """
+    if fieldset is None:
+        return content
+    if isinstance(content, list):
+        projection = [fieldset.project(row) for row in content]
+    else:
+        projection = fieldset.project(content)
+    return JSONResponse(jsonable_encoder(projection), headers=dict(response.headers))
@@ -7,11 +7,16 @@ This module define the model operations for the helpes
 @Email: j.b.galinha@gmail.com
 """
 
+from typing import Dict
+
 from db.ucs import AnoCurricular, Semestres
 from fastapi import HTTPException, status
+from jwtoken import verified_tokens
+from models import classes, user
 from schemas.semester_schema import CreateSemester, ShowSemester
 from schemas.year_schema import CreateYear, ShowYear
 from sqlalchemy.orm import Session
+from tools import crypt, keypool, presence_buffer
 from utils import Utils
 
 
@@ -263,3 +268,22 @@ def remove_semester(db: Session, /, *, semester_id: int) -> ShowSemester:
                 error=repr(e),
             ),
         )
+
+
+def get_metrics() -> Dict[str, Dict[str, int]]:
+    """Get the counters of the in memory caches and worker pools of the api
+
+    Returns:
+        Dict[str, Dict[str, int]]: counters by cache or pool
+    """
+    return {
+        "pub_keys": user.pub_keys.stats(),
+        "tokens": verified_tokens.stats(),
+        "qrcodes": classes.qrcodes.stats(),
+        "bcrypt_pool": crypt.bcrypt_pool.stats(),
+        "verify_pool": crypt.verifier.pool.stats(),
+        "key_pool": keypool.pool.stats() if keypool.pool else None,
+        "presence_buffer": (
+            presence_buffer.buffer.stats() if presence_buffer.buffer else None
+        ),
+    }
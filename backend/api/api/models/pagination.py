@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Pagination model file
+
+This module define the keyset pagination of the list endpoints. Rows are
+ordered by primary key and a page ends with an opaque cursor of its last
+key, the next page starts after it instead of skipping the previous rows.
+The list bodies are unchanged, the cursor and the estimated total are sent
+in the X-Next-Cursor and X-Total-Estimate headers. skip is still applied,
+for the clients paginating with skip/limit.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import base64
+import json
+from typing import Any, List, NamedTuple, Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+from utils import Utils
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_ESTIMATE_HEADER = "X-Total-Estimate"
+
+
+class Page(NamedTuple):
+    """Page of a list
+
+    Attributes:
+        items (List[Any]): rows of the page
+        next_cursor (Optional[str]): cursor of the next page, None on the last
+        total_estimate (Optional[int]): estimated number of rows, if asked
+    """
+
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None
+
+
+def encode_cursor(key: int, /) -> str:
+    """Encode the key of the last row of a page"""
+    data = json.dumps({"k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, /) -> int:
+    """Decode a page cursor
+
+    Raises:
+        HTTPException: Invalid cursor
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(data)["k"]
+        if not isinstance(key, int):
+            raise ValueError(key)
+        return key
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=Utils.error_msg(
+                status.HTTP_400_BAD_REQUEST, "Invalid cursor", error=repr(e)
+            ),
+        )
+
+
+def estimate_count(db: Session, table: str, /) -> Optional[int]:
+    """Estimated number of rows of a table, from the planner statistics
+
+    Args:
+        db (Session): database session
+        table (str): table name
+
+    Returns:
+        Optional[int]: estimated rows, None if the table was never analyzed
+    """
+    reltuples = db.execute(
+        text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+        {"table": table},
+    ).scalar()
+    return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+
+
+def paginate(
+    db: Session,
+    query: Query,
+    key,
+    /,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+) -> Page:
+    """Get a page of a query ordered by a key column
+
+    Args:
+        db (Session): database session
+        query (Query): rows query
+        key: primary key column
+        skip (int, optional): rows to skip. Defaults to 0.
+        limit (int, optional): limit of rows. Defaults to 100.
+        cursor (Optional[str], optional): cursor of the previous page.
+        Defaults to None.
+        estimate (bool, optional): estimate the total of rows.
+        Defaults to False.
+
+    Returns:
+        Page: rows of the page and cursor of the next one
+    """
+    limit = max(limit, 0)
+    if cursor:
+        query = query.filter(key > decode_cursor(cursor))
+    rows = query.order_by(key).offset(skip).limit(limit + 1).all() if limit else []
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], key.key))
+    return Page(
+        items=rows,
+        next_cursor=next_cursor,
+        total_estimate=estimate_count(db, key.table.name) if estimate else None,
+    )
+
+
+def respond(response: Response, page: Page, /) -> List[Any]:
+    """Set the pagination headers of a list response
+
+    Args:
+        response (Response): route response
+        page (Page): page
+
+    Returns:
+        List[Any]: rows of the page, the response body
+    """
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.total_estimate is not None:
+        response.headers[TOTAL_ESTIMATE_HEADER] = str(page.total_estimate)
+    return page.items
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""Live roster model file
+
+This module keeps in memory the roster of the classes being checked in, so
+the scans of an open class are validated without querying the database.
+A roster is loaded on the first scan of the class, from
+ROSTER_OPEN_BEFORE minutes before the class starts, and evicted when the
+class schedule ends. Changes to the UC enrollments invalidate it. The
+schedule of the classes scanned outside of it is kept, so their scans
+don't query it again.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+from db.alunos import Alunos
+from db.aulas import Aulas, Presencas
+from db.docentes import Docentes
+from db.ucs import UC, InscricoesUC, Periodos
+from db.user import User
+from dotenv import load_dotenv
+from models import user
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from tools.cache import LRUCache
+
+load_dotenv()
+
+OPEN_BEFORE = timedelta(minutes=int(os.getenv("ROSTER_OPEN_BEFORE", "15")))
+
+
+@dataclass
+class ClassSession:
+    """Roster of an open class
+
+    Attributes:
+        id_aula (int): class id
+        id_uc (int): uc id
+        teacher_user_id (int): user id of the class teacher
+        opens_at (datetime): OPEN_BEFORE the start of the class schedule
+        ends_at (datetime): end of the class schedule
+        modo_presenca (str): attendance mode of the uc
+        keys (Dict[int, object]): public keys of the enrolled students by id
+        confirmed (Set[int]): ids of the students already checked in
+    """
+
+    id_aula: int
+    id_uc: int
+    teacher_user_id: int
+    opens_at: datetime
+    ends_at: datetime
+    modo_presenca: str
+    keys: Dict[int, object] = field(default_factory=dict)
+    confirmed: Set[int] = field(default_factory=set)
+
+    @property
+    def expired(self) -> bool:
+        return datetime.now() >= self.ends_at
+
+    @property
+    def open(self) -> bool:
+        return self.opens_at <= datetime.now() < self.ends_at
+
+
+_sessions: Dict[int, ClassSession] = {}
+_lock = threading.Lock()
+
+# rosters, without students, of the classes scanned before or after their
+# schedule, by class id
+_closed = LRUCache(maxsize=4096)
+
+
+def _load_session(db: Session, class_id: int, /) -> Optional[ClassSession]:
+    """Load the roster of a class
+
+    Args:
+        db (Session): database session
+        class_id (int): class id
+
+    Returns:
+        ClassSession: class roster, None if the class doesn't exists
+    """
+    aula = (
+        db.query(
+            Aulas.id_uc,
+            Aulas.data,
+            Periodos.hora_inicio,
+            Periodos.hora_fim,
+            Docentes.id_utilizador,
+            UC.modo_presenca,
+        )
+        .join(Periodos, Periodos.id_periodo == Aulas.id_periodo)
+        .join(UC, UC.id_uc == Aulas.id_uc)
+        .join(Docentes, Docentes.id_docente == Aulas.id_docente)
+        .filter(Aulas.id_aula == class_id)
+        .first()
+    )
+    if not aula:
+        return None
+
+    session = ClassSession(
+        id_aula=class_id,
+        id_uc=aula.id_uc,
+        teacher_user_id=aula.id_utilizador,
+        opens_at=datetime.combine(aula.data, aula.hora_inicio) - OPEN_BEFORE,
+        ends_at=datetime.combine(aula.data, aula.hora_fim),
+        modo_presenca=aula.modo_presenca,
+    )
+    if not session.open:
+        return session
+
+    students = (
+        db.query(
+            InscricoesUC.id_aluno,
+            Alunos.id_utilizador,
+            User.public_key,
+            Presencas.id_aluno.label("id_aluno_presente"),
+        )
+        .join(Alunos, Alunos.id_aluno == InscricoesUC.id_aluno)
+        .join(User, User.id_utilizador == Alunos.id_utilizador)
+        .outerjoin(
+            Presencas,
+            and_(
+                Presencas.id_aula == class_id,
+                Presencas.id_aluno == InscricoesUC.id_aluno,
+            ),
+        )
+        .filter(InscricoesUC.id_uc == aula.id_uc)
+        .all()
+    )
+    for student in students:
+        session.keys[student.id_aluno] = user.load_ku(
+            student.id_utilizador, student.public_key
+        )
+        if student.id_aluno_presente:
+            session.confirmed.add(student.id_aluno)
+    return session
+
+
+def open_session(db: Session, class_id: int, /) -> Optional[ClassSession]:
+    """Get the roster of a class that is being checked in, loading it once
+
+    Args:
+        db (Session): database session
+        class_id (int): class id
+
+    Returns:
+        ClassSession: class roster, None if the class doesn't exists or
+        its schedule is not open
+    """
+    with _lock:
+        for expired in [id for id, s in _sessions.items() if s.expired]:
+            del _sessions[expired]
+        session = _sessions.get(class_id)
+    if session:
+        return session
+
+    closed = _closed.get(class_id)
+    if closed and not closed.open:
+        return None
+
+    session = _load_session(db, class_id)
+    if not session:
+        return None
+    if not session.open:
+        _closed.put(class_id, session)
+        return None
+    _closed.pop(class_id)
+    with _lock:
+        return _sessions.setdefault(class_id, session)
+
+
+def invalidate_class(class_id: int, /):
+    """Drop the roster of a class
+
+    Args:
+        class_id (int): class id
+    """
+    with _lock:
+        _sessions.pop(class_id, None)
+    _closed.pop(class_id)
+
+
+def invalidate_uc(uc_id: int, /):
+    """Drop the rosters of the classes of an UC, after enrollment changes
+
+    Args:
+        uc_id (int): uc id
+    """
+    with _lock:
+        for class_id in [id for id, s in _sessions.items() if s.id_uc == uc_id]:
+            del _sessions[class_id]
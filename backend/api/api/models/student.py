@@ -8,16 +8,44 @@ This module define the model operations for the students
 """
 
 
-from typing import List
+from datetime import date
+from typing import Dict, Optional
 
 from db.alunos import Alunos
+from db.aulas import Aulas
+from db.ucs import UC, InscricoesUC, Periodos
 from fastapi import HTTPException, status
+from models import timetable
 from models import user as User
+from models.fieldsets import Fields, Fieldset
+from models.pagination import Page, paginate
 from schemas import student_schema
 from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, join, joinedload, selectinload
 from utils import Utils
 
+# loader options of the ShowStudent responses
+STUDENT_RELATIONSHIPS = {
+    "utilizador": joinedload(Alunos.utilizador).options(*User.SHOW_USER)
+}
+SHOW_STUDENT = tuple(STUDENT_RELATIONSHIPS.values())
+
+STUDENT_FIELDS = Fields(Alunos, student_schema.ShowStudent, STUDENT_RELATIONSHIPS)
+
+# loader options of the student list, TodayStudent responses with every
+# enrollment, schedule and class, a query per level whatever the rows
+TODAY_STUDENT_RELATIONSHIPS = {
+    "inscricoes_ucs": selectinload(Alunos.inscricoes_ucs)
+    .joinedload(InscricoesUC.uc)
+    .selectinload(UC.periodos)
+    .selectinload(Periodos.aulas),
+}
+TODAY_STUDENTS = tuple(TODAY_STUDENT_RELATIONSHIPS.values())
+
+TODAY_STUDENT_FIELDS = Fields(
+    Alunos, student_schema.TodayStudent, TODAY_STUDENT_RELATIONSHIPS
+)
+
 
 def _check_student_exists(db: Session, /, *, nr_aluno: int) -> bool:
     """Check if a student nr already exists in database
@@ -199,6 +227,7 @@ def update_student(
         db.query(Alunos).filter(Alunos.id_aluno == student_id).update(
             {"nome": request.nome, "nr_aluno": request.nr_aluno}
         )
+        timetable.invalidate_student(db, student_id)
         db.commit()
         return student
     except Exception as e:
@@ -214,47 +243,79 @@ def update_student(
 
 
 def get_student_by_number(
-    db: Session, /, *, student_nr: int
+    db: Session, /, *, student_nr: int, fieldset: Optional[Fieldset] = None
 ) -> student_schema.ShowStudent:
     """Get student by number
 
     Args:
         db (Session): database session
         student_nr (int): student number
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
         student_schema.ShowStudent: Student details
     """
-    return db.query(Alunos).filter(Alunos.nr_aluno == student_nr).first()
+    options = fieldset.options() if fieldset else SHOW_STUDENT
+    return (
+        db.query(Alunos).options(*options).filter(Alunos.nr_aluno == student_nr).first()
+    )
 
 
-def get_student(db: Session, /, *, id_student: int) -> student_schema.ShowStudent:
+def get_student(
+    db: Session, /, *, id_student: int, fieldset: Optional[Fieldset] = None
+) -> student_schema.ShowStudent:
     """Query student by id
 
     Args:
         db (Session): database session
         id_student (int): student id
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
         student_schema.ShowStudent: Student Detail
     """
-    return db.query(Alunos).get(id_student)
+    options = fieldset.options() if fieldset else SHOW_STUDENT
+    return db.query(Alunos).options(*options).get(id_student)
 
 
 def get_students(
-    db: Session, /, *, skip: int = 0, limit: int = 100
-) -> List[student_schema.ShowStudent]:
+    db: Session,
+    /,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fieldset: Optional[Fieldset] = None,
+) -> Page:
     """Get list of students
 
     Args:
         db (Session): database session
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 0.
+        cursor (Optional[str], optional): cursor of the previous page.
+        Defaults to None.
+        estimate (bool, optional): estimate the total of rows.
+        Defaults to False.
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
-        List[student_schema.ShowStudent]: List of students
+        Page: students ordered by id and cursor of the next page
     """
-    return db.query(Alunos).offset(skip).limit(limit).all()
+    options = fieldset.options() if fieldset else TODAY_STUDENTS
+    return paginate(
+        db,
+        db.query(Alunos).options(*options),
+        Alunos.id_aluno,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+    )
 
 
 def delete_student(db: Session, /, *, id_student: int) -> student_schema.ShowStudent:
@@ -271,7 +332,7 @@ def delete_student(db: Session, /, *, id_student: int) -> student_schema.ShowStu
     Returns:
         student_schema.ShowStudent: deleted student details
     """
-    student = db.query(Alunos).get(id_student)
+    student = db.query(Alunos).options(*SHOW_STUDENT).get(id_student)
     if not student:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -284,6 +345,7 @@ def delete_student(db: Session, /, *, id_student: int) -> student_schema.ShowStu
         db.delete(student)  # delete student record
         db.delete(student.utilizador)  # delete student user
         db.commit()
+        User.invalidate_ku(student.id_utilizador)
         return student
     except Exception as e:
         db.rollback()
@@ -352,18 +414,66 @@ def create_student(
         )
 
 
-def today(db: Session, /, *, user_id: int) -> student_schema.TodayStudent:
-    student_id = db.query(Alunos).filter(Alunos.id_utilizador == user_id).first()
-    if not student_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=Utils.error_msg(
-                status.HTTP_404_NOT_FOUND, f"Student with user id: {user_id} not found!"
+def today(db: Session, /, *, user_id: int, day: Optional[date] = None) -> Dict:
+    """Get the classes of the day of a student
+
+    The enrollments, ucs, schedules and classes of the day are fetched with a
+    single query, filtered by date in the database, and nested in the shape
+    of TodayStudent.
+
+    Args:
+        db (Session): database session
+        user_id (int): user id
+        day (Optional[date], optional): day. Defaults to today.
+
+    Raises:
+        HTTPException: Student not found
+        HTTPException: Error getting student day
+
+    Returns:
+        Dict: student with the classes of the day
+    """
+    try:
+        classes = join(InscricoesUC, UC, UC.id_uc == InscricoesUC.id_uc)
+        classes = classes.join(Periodos, Periodos.id_uc == UC.id_uc)
+        classes = classes.join(
+            Aulas,
+            and_(
+                Aulas.id_periodo == Periodos.id_periodo,
+                Aulas.data == (day or date.today()),
             ),
         )
-    try:
-        today = db.query(Alunos).filter(Alunos.id_aluno == student_id.id_aluno).first()
-        return today
+        rows = (
+            db.query(
+                Alunos.id_aluno,
+                Alunos.nome,
+                Alunos.nr_aluno,
+                InscricoesUC.id_uc,
+                InscricoesUC.data_inscricao,
+                UC.nome_uc,
+                UC.modo_presenca,
+                Periodos.id_periodo,
+                Periodos.dia_semana,
+                Periodos.hora_inicio,
+                Periodos.hora_fim,
+                Aulas.id_aula,
+                Aulas.id_docente,
+                Aulas.data,
+                Aulas.resumo,
+                Aulas.sala,
+            )
+            .select_from(
+                join(
+                    Alunos,
+                    classes,
+                    InscricoesUC.id_aluno == Alunos.id_aluno,
+                    isouter=True,
+                )
+            )
+            .filter(Alunos.id_utilizador == user_id)
+            .order_by(Periodos.hora_inicio, Aulas.id_aula)
+            .all()
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -373,3 +483,55 @@ def today(db: Session, /, *, user_id: int) -> student_schema.TodayStudent:
                 error=repr(e),
             ),
         )
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND, f"Student with user id: {user_id} not found!"
+            ),
+        )
+
+    inscricoes = {}
+    for row in rows:
+        if row.id_aula is None:
+            continue
+        inscricao = inscricoes.setdefault(
+            row.id_uc,
+            {
+                "id_uc": row.id_uc,
+                "data_inscricao": row.data_inscricao,
+                "uc": {
+                    "nome_uc": row.nome_uc,
+                    "modo_presenca": row.modo_presenca,
+                    "periodos": {},
+                },
+            },
+        )
+        periodo = inscricao["uc"]["periodos"].setdefault(
+            row.id_periodo,
+            {
+                "id_periodo": row.id_periodo,
+                "dia_semana": row.dia_semana,
+                "hora_inicio": row.hora_inicio,
+                "hora_fim": row.hora_fim,
+                "aulas": [],
+            },
+        )
+        periodo["aulas"].append(
+            {
+                "id_aula": row.id_aula,
+                "id_docente": row.id_docente,
+                "data": row.data,
+                "resumo": row.resumo,
+                "sala": row.sala,
+            }
+        )
+    for inscricao in inscricoes.values():
+        inscricao["uc"]["periodos"] = list(inscricao["uc"]["periodos"].values())
+
+    return {
+        "id_aluno": rows[0].id_aluno,
+        "nome": rows[0].nome,
+        "nr_aluno": rows[0].nr_aluno,
+        "inscricoes_ucs": list(inscricoes.values()),
+    }
@@ -8,15 +8,29 @@ This module define the model operations for the teachers
 """
 
 
-from typing import List
+from datetime import date
+from typing import Dict, Optional
 
+from db.aulas import Aulas, Presencas
 from db.docentes import Docentes
+from db.ucs import UC
 from fastapi import HTTPException, status
+from models import timetable
 from models import user as User
+from models.fieldsets import Fields, Fieldset
+from models.pagination import Page, paginate
 from schemas import teacher_schema
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from utils import Utils
 
+# loader options of the ShowTeacher responses
+TEACHER_RELATIONSHIPS = {
+    "utilizador": joinedload(Docentes.utilizador).options(*User.SHOW_USER)
+}
+SHOW_TEACHER = tuple(TEACHER_RELATIONSHIPS.values())
+
+TEACHER_FIELDS = Fields(Docentes, teacher_schema.ShowTeacher, TEACHER_RELATIONSHIPS)
+
 
 def check_teacher_exists(db: Session, /, *, teacher_nr: int) -> bool:
     """Check if a teacher nr already exists in database
@@ -166,6 +180,7 @@ def update_teacher(
         db.query(Docentes).filter(Docentes.id_docente == teacher_id).update(
             {"nome": request.nome, "nr_docente": request.nr_docente}
         )
+        timetable.invalidate_teacher(db, teacher_id)
         db.commit()
         return teacher
     except Exception as e:
@@ -181,47 +196,82 @@ def update_teacher(
 
 
 def get_teacher_by_number(
-    db: Session, /, *, teacher_nr: int
+    db: Session, /, *, teacher_nr: int, fieldset: Optional[Fieldset] = None
 ) -> teacher_schema.ShowTeacher:
     """Get teacher by number
 
     Args:
         db (Session): database session
         teacher_nr (int): teacher number
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
         teacher_schema.ShowTeacher: teacher details
     """
-    return db.query(Docentes).filter(Docentes.nr_docente == teacher_nr).first()
+    options = fieldset.options() if fieldset else SHOW_TEACHER
+    return (
+        db.query(Docentes)
+        .options(*options)
+        .filter(Docentes.nr_docente == teacher_nr)
+        .first()
+    )
 
 
-def get_teacher(db: Session, /, *, id_teacher: int) -> teacher_schema.ShowTeacher:
+def get_teacher(
+    db: Session, /, *, id_teacher: int, fieldset: Optional[Fieldset] = None
+) -> teacher_schema.ShowTeacher:
     """Query teacher by id
 
     Args:
         db (Session): database session
         id_teacher (int): teacher id
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
         teacher_schema.ShowTeacher: teacher Detail
     """
-    return db.query(Docentes).get(id_teacher)
+    options = fieldset.options() if fieldset else SHOW_TEACHER
+    return db.query(Docentes).options(*options).get(id_teacher)
 
 
 def get_teachers(
-    db: Session, /, *, skip: int = 0, limit: int = 100
-) -> List[teacher_schema.ShowTeacher]:
+    db: Session,
+    /,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fieldset: Optional[Fieldset] = None,
+) -> Page:
     """Get list of teachers
 
     Args:
         db (Session): database session
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 0.
+        cursor (Optional[str], optional): cursor of the previous page.
+        Defaults to None.
+        estimate (bool, optional): estimate the total of rows.
+        Defaults to False.
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
-        List[teacher_schema.ShowTeacher]: List of teachers
+        Page: teachers ordered by id and cursor of the next page
     """
-    return db.query(Docentes).offset(skip).limit(limit).all()
+    options = fieldset.options() if fieldset else SHOW_TEACHER
+    return paginate(
+        db,
+        db.query(Docentes).options(*options),
+        Docentes.id_docente,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+    )
 
 
 def delete_teacher(db: Session, /, *, id_teacher: int) -> teacher_schema.ShowTeacher:
@@ -238,7 +288,7 @@ def delete_teacher(db: Session, /, *, id_teacher: int) -> teacher_schema.ShowTea
     Returns:
         teacher_schema.ShowTeacher: deleted teacher details
     """
-    teacher = db.query(Docentes).get(id_teacher)
+    teacher = db.query(Docentes).options(*SHOW_TEACHER).get(id_teacher)
     if not teacher:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -251,6 +301,7 @@ def delete_teacher(db: Session, /, *, id_teacher: int) -> teacher_schema.ShowTea
         db.delete(teacher)  # delete teacher record
         db.delete(teacher.utilizador)  # delete teacher user
         db.commit()
+        User.invalidate_ku(teacher.id_utilizador)
         return teacher
     except Exception as e:
         db.rollback()
@@ -319,18 +370,49 @@ def create_teacher(
         )
 
 
-def today(db: Session, /, *, user_id: int) -> teacher_schema.TodayTeacher:
+def today(db: Session, /, *, user_id: int, day: Optional[date] = None) -> Dict:
+    """Get the classes of the day of a teacher
+
+    Only the classes of the day are fetched, with their uc, course and
+    schedule joined and the presences and students loaded in one batch, so
+    the request runs a fixed number of queries whatever the teacher history.
+
+    Args:
+        db (Session): database session
+        user_id (int): user id
+        day (Optional[date], optional): day. Defaults to today.
+
+    Raises:
+        HTTPException: Teacher not found
+        HTTPException: Error getting teacher day
+
+    Returns:
+        Dict: teacher with the classes of the day
+    """
+    teacher = db.query(Docentes).filter(Docentes.id_utilizador == user_id).first()
+    if not teacher:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=Utils.error_msg(
+                status.HTTP_404_NOT_FOUND,
+                f"Teacher with user id: {user_id} not found!",
+            ),
+        )
     try:
-        teacher = db.query(Docentes).filter(Docentes.id_utilizador == user_id).first()
-        if not teacher:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=Utils.error_msg(
-                    status.HTTP_404_NOT_FOUND,
-                    f"Teacher with user id: {user_id} not found!",
-                ),
+        aulas = (
+            db.query(Aulas)
+            .options(
+                joinedload(Aulas.uc).joinedload(UC.curso),
+                joinedload(Aulas.periodo),
+                selectinload(Aulas.presencas).joinedload(Presencas.aluno),
             )
-        return teacher
+            .filter(
+                Aulas.id_docente == teacher.id_docente,
+                Aulas.data == (day or date.today()),
+            )
+            .order_by(Aulas.id_aula)
+            .all()
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -340,3 +422,9 @@ def today(db: Session, /, *, user_id: int) -> teacher_schema.TodayTeacher:
                 error=repr(e),
             ),
         )
+    return {
+        "id_docente": teacher.id_docente,
+        "nome": teacher.nome,
+        "nr_docente": teacher.nr_docente,
+        "aulas": aulas,
+    }
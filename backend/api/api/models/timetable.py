@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""Timetable model file
+
+This module keeps the /today document of each user for the day in the
+horarios_diarios table, so /today is a key lookup instead of rebuilding the
+schedule from the ucs, schedules, classes and enrollments. Documents are
+built on the first request of the day, or ahead by the nightly job, and
+invalidated in the same transaction as the changes to those rows.
+
+Each invalidation bumps the row version, a document built from data read
+before an invalidation is not stored over it. The presences of a teacher
+day change all the time, they are not part of the document and are merged
+on each request.
+
+Disable the nightly job with TIMETABLE_NIGHTLY=0. It starts in every api
+process, a Postgres advisory lock lets a single one build the documents.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import logging
+import os
+from datetime import date, datetime, time
+from typing import Callable, Dict, List, Optional, Union
+
+from database import SessionLocal, engine
+from db.alunos import Alunos
+from db.aulas import Aulas, Presencas
+from db.docentes import Docentes
+from db.horarios import HorariosDiarios
+from db.ucs import UC, InscricoesUC, UCDocentes
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+from models import student, teacher
+from schemas import teacher_schema
+from sqlalchemy import func, literal, null, select, tuple_, union, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from tools.scheduler import DailyJob
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+NIGHTLY = os.getenv("TIMETABLE_NIGHTLY", "1") == "1"
+BUILD_AT = time.fromisoformat(os.getenv("TIMETABLE_BUILD_AT", "00:05"))
+
+STUDENT = "aluno"
+TEACHER = "docente"
+
+# advisory lock of the nightly build, held by the process building the day
+NIGHTLY_LOCK = 0x53495250
+
+
+def _get_day(
+    db: Session,
+    /,
+    *,
+    user_id: int,
+    perfil: str,
+    build: Callable[[date], Dict],
+    day: Optional[date] = None,
+) -> Dict:
+    """Get the document of an user day, building and storing it if missing
+
+    Args:
+        db (Session): database session
+        user_id (int): user id
+        perfil (str): STUDENT or TEACHER
+        build (Callable[[date], Dict]): builds the document of a day
+        day (Optional[date], optional): day. Defaults to today.
+
+    Returns:
+        Dict: document of the day
+    """
+    day = day or date.today()
+    key = (
+        HorariosDiarios.id_utilizador == user_id,
+        HorariosDiarios.perfil == perfil,
+        HorariosDiarios.data == day,
+    )
+    row = (
+        db.query(HorariosDiarios.versao, HorariosDiarios.documento).filter(*key).first()
+    )
+    if row and row.documento is not None:
+        return row.documento
+
+    documento = jsonable_encoder(build(day))
+    if row:
+        stmt = (
+            update(HorariosDiarios)
+            .where(*key, HorariosDiarios.versao == row.versao)
+            .values(documento=documento)
+        )
+    else:
+        stmt = (
+            insert(HorariosDiarios)
+            .values(
+                id_utilizador=user_id,
+                perfil=perfil,
+                data=day,
+                versao=0,
+                documento=documento,
+            )
+            .on_conflict_do_nothing()
+        )
+    db.execute(stmt)
+    db.commit()
+    return documento
+
+
+def _teacher_document(db: Session, user_id: int, day: date, /) -> Dict:
+    today = teacher_schema.TodayTeacher.parse_obj(
+        teacher.today(db, user_id=user_id, day=day)
+    )
+    return today.dict(exclude={"aulas": {"__all__": {"presencas"}}})
+
+
+def student_day(db: Session, /, *, user_id: int) -> Dict:
+    """Get the classes of the day of a student
+
+    Args:
+        db (Session): database session
+        user_id (int): user id
+
+    Returns:
+        Dict: student with the classes of the day
+    """
+    return _get_day(
+        db,
+        user_id=user_id,
+        perfil=STUDENT,
+        build=lambda day: student.today(db, user_id=user_id, day=day),
+    )
+
+
+def teacher_day(db: Session, /, *, user_id: int) -> Dict:
+    """Get the classes of the day of a teacher, with their current presences
+
+    Args:
+        db (Session): database session
+        user_id (int): user id
+
+    Returns:
+        Dict: teacher with the classes of the day
+    """
+    documento = _get_day(
+        db,
+        user_id=user_id,
+        perfil=TEACHER,
+        build=lambda day: _teacher_document(db, user_id, day),
+    )
+    presencas: Dict[int, List[Dict]] = {
+        aula["id_aula"]: [] for aula in documento["aulas"]
+    }
+    if presencas:
+        rows = (
+            db.query(
+                Presencas.id_aula,
+                Presencas.id_aluno,
+                Presencas.confirmacao,
+                Alunos.nome,
+                Alunos.nr_aluno,
+            )
+            .join(Alunos, Alunos.id_aluno == Presencas.id_aluno)
+            .filter(Presencas.id_aula.in_(presencas))
+            .order_by(Presencas.confirmacao, Presencas.id_aluno)
+            .all()
+        )
+        for row in rows:
+            presencas[row.id_aula].append(
+                {
+                    "id_aluno": row.id_aluno,
+                    "confirmacao": row.confirmacao,
+                    "aluno": {"nome": row.nome, "nr_aluno": row.nr_aluno},
+                }
+            )
+    return {
+        **documento,
+        "aulas": [
+            {**aula, "presencas": presencas[aula["id_aula"]]}
+            for aula in documento["aulas"]
+        ],
+    }
+
+
+def invalidate(db: Session, users: Select, /, *, day: Optional[date] = None):
+    """Invalidate the documents of some users, in the caller transaction
+
+    Args:
+        db (Session): database session
+        users (Select): select of the user ids and perfis
+        day (Optional[date], optional): day changed. Defaults to every day.
+    """
+    users = users.subquery()
+    changed = day or date.today()
+    # a single upsert, a document being built from the data before the
+    # change is either bumped or not stored over the new version
+    stmt = insert(HorariosDiarios).from_select(
+        ["id_utilizador", "perfil", "data", "versao", "documento"],
+        select(
+            users.c.id_utilizador, users.c.perfil, literal(changed), literal(1), null()
+        ),
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[
+                HorariosDiarios.id_utilizador,
+                HorariosDiarios.perfil,
+                HorariosDiarios.data,
+            ],
+            set_={"versao": HorariosDiarios.versao + 1, "documento": None},
+        )
+    )
+    if day is None:
+        db.execute(
+            update(HorariosDiarios)
+            .where(
+                tuple_(HorariosDiarios.id_utilizador, HorariosDiarios.perfil).in_(
+                    select(users.c.id_utilizador, users.c.perfil)
+                ),
+                HorariosDiarios.data != changed,
+            )
+            .values(versao=HorariosDiarios.versao + 1, documento=None),
+            execution_options={"synchronize_session": False},
+        )
+
+
+def _uc_users(ucs: Union[List[int], Select], /, *, day: Optional[date] = None):
+    """Students and teachers of some ucs and teachers of their classes
+
+    Args:
+        ucs (Union[List[int], Select]): uc ids
+        day (Optional[date], optional): day of the classes. Defaults to every
+        day.
+
+    Returns:
+        Select: user ids and perfis
+    """
+    classes = select(Docentes.id_utilizador, literal(TEACHER).label("perfil")).join(
+        Aulas, Aulas.id_docente == Docentes.id_docente
+    )
+    classes = classes.where(Aulas.id_uc.in_(ucs))
+    if day:
+        classes = classes.where(Aulas.data == day)
+    users = union(
+        select(Alunos.id_utilizador, literal(STUDENT).label("perfil"))
+        .join(InscricoesUC, InscricoesUC.id_aluno == Alunos.id_aluno)
+        .where(InscricoesUC.id_uc.in_(ucs)),
+        select(Docentes.id_utilizador, literal(TEACHER).label("perfil"))
+        .join(UCDocentes, UCDocentes.id_docente == Docentes.id_docente)
+        .where(UCDocentes.id_uc.in_(ucs)),
+        classes,
+    )
+    return select(users.subquery())
+
+
+def invalidate_uc(db: Session, uc_id: int, /, *, day: Optional[date] = None):
+    """Invalidate the documents of the students and teachers of an uc
+
+    Args:
+        db (Session): database session
+        uc_id (int): uc id
+        day (Optional[date], optional): day changed. Defaults to every day.
+    """
+    invalidate(db, _uc_users([uc_id], day=day), day=day)
+
+
+def invalidate_course(db: Session, course_id: int, /):
+    """Invalidate the documents of the students and teachers of the ucs of a
+    course, the course name is in the classes of the teachers
+
+    Args:
+        db (Session): database session
+        course_id (int): course id
+    """
+    invalidate(db, _uc_users(select(UC.id_uc).where(UC.id_curso == course_id)))
+
+
+def invalidate_student(db: Session, student_id: int, /):
+    """Invalidate the documents of a student
+
+    Args:
+        db (Session): database session
+        student_id (int): student id
+    """
+    invalidate(
+        db,
+        select(Alunos.id_utilizador, literal(STUDENT).label("perfil")).where(
+            Alunos.id_aluno == student_id
+        ),
+    )
+
+
+def invalidate_teacher(db: Session, teacher_id: int, /):
+    """Invalidate the documents of a teacher
+
+    Args:
+        db (Session): database session
+        teacher_id (int): teacher id
+    """
+    invalidate(
+        db,
+        select(Docentes.id_utilizador, literal(TEACHER).label("perfil")).where(
+            Docentes.id_docente == teacher_id
+        ),
+    )
+
+
+def build_days(db: Session, /, *, day: Optional[date] = None) -> int:
+    """Build the missing documents of the users with classes on a day and
+    drop the documents of the previous days
+
+    Args:
+        db (Session): database session
+        day (Optional[date], optional): day. Defaults to today.
+
+    Returns:
+        int: number of users with classes on the day
+    """
+    day = day or date.today()
+    db.query(HorariosDiarios).filter(HorariosDiarios.data < date.today()).delete(
+        synchronize_session=False
+    )
+    db.commit()
+
+    students = (
+        db.query(Alunos.id_utilizador)
+        .join(InscricoesUC, InscricoesUC.id_aluno == Alunos.id_aluno)
+        .join(Aulas, Aulas.id_uc == InscricoesUC.id_uc)
+        .filter(Aulas.data == day)
+        .distinct()
+        .all()
+    )
+    teachers = (
+        db.query(Docentes.id_utilizador)
+        .join(Aulas, Aulas.id_docente == Docentes.id_docente)
+        .filter(Aulas.data == day)
+        .distinct()
+        .all()
+    )
+    for (user_id,) in students:
+        _get_day(
+            db,
+            user_id=user_id,
+            perfil=STUDENT,
+            build=lambda day: student.today(db, user_id=user_id, day=day),
+            day=day,
+        )
+    for (user_id,) in teachers:
+        _get_day(
+            db,
+            user_id=user_id,
+            perfil=TEACHER,
+            build=lambda day: _teacher_document(db, user_id, day),
+            day=day,
+        )
+    return len(students) + len(teachers)
+
+
+def _nightly_build():
+    # the lock is taken on a connection of its own, the session commits
+    # while building and may change connection
+    with engine.connect() as lock:
+        if not lock.execute(select(func.pg_try_advisory_lock(NIGHTLY_LOCK))).scalar():
+            logger.info("timetables being built by another process")
+            return
+        db = SessionLocal()
+        try:
+            started = datetime.now()
+            users = build_days(db)
+            logger.info("built %d timetables in %s", users, datetime.now() - started)
+        finally:
+            db.close()
+            lock.execute(select(func.pg_advisory_unlock(NIGHTLY_LOCK)))
+
+
+nightly: Optional[DailyJob] = (
+    DailyJob(BUILD_AT, _nightly_build, name="timetables") if NIGHTLY else None
+)
@@ -8,20 +8,34 @@ This module define the model operations for the UCs
 """
 
 
-from typing import List
+from typing import Optional
 
 from db.ucs import UC, InscricoesUC, Periodos, SemestresUC, UCDocentes
 from fastapi import HTTPException, status
+from models import roster, timetable
 from models.course import check_course_exists_by_id
+from models.fieldsets import Fields, Fieldset
 from models.helpers import semester_exists_by_id
+from models.pagination import Page, paginate
 from models.student import check_student_by_id
 from models.teacher import check_teacher_by_id
 from schemas import nm_schema, uc_schema
 from schemas.schedules_schema import CreateSchedule, ShowSchedule
 from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
 from utils import Utils
 
+# loader options of the ShowUC responses, a query per relationship whatever
+# the number of ucs, enrollments and teachers
+UC_RELATIONSHIPS = {
+    "curso": joinedload(UC.curso),
+    "inscricoes": selectinload(UC.inscricoes).joinedload(InscricoesUC.aluno),
+    "docentes": selectinload(UC.docentes).joinedload(UCDocentes.docente),
+}
+SHOW_UC = tuple(UC_RELATIONSHIPS.values())
+
+UC_FIELDS = Fields(UC, uc_schema.ShowUC, UC_RELATIONSHIPS)
+
 
 def check_if_teacher_in_uc(db: Session, /, *, teacher_id: int, uc_id: int) -> bool:
     """Check if an teacher is in an UC
@@ -241,13 +255,14 @@ def update_uc(
                 f"uc with id: {uc_id} not found",
             ),
         )
-    uc.nome_uc = request.nome_uc
-    uc.descricao = request.descricao
+    values = {UC.nome_uc: request.nome_uc, UC.descricao: request.descricao}
+    if request.modo_presenca is not None:
+        values[UC.modo_presenca] = request.modo_presenca
     try:
-        db.query(UC).filter(UC.id_uc == uc_id).update(
-            {UC.nome_uc: request.nome_uc, UC.descricao: request.descricao}
-        )
+        db.query(UC).filter(UC.id_uc == uc_id).update(values)
+        timetable.invalidate_uc(db, uc_id)
         db.commit()
+        roster.invalidate_uc(uc_id)
         return uc
     except Exception as e:
         db.rollback()
@@ -261,46 +276,78 @@ def update_uc(
         )
 
 
-def get_uc_by_number(db: Session, /, *, uc_nr: int) -> uc_schema.ShowUC:
+def get_uc_by_number(
+    db: Session, /, *, uc_nr: int, fieldset: Optional[Fieldset] = None
+) -> uc_schema.ShowUC:
     """Get uc by number
 
     Args:
         db (Session): database session
         uc_nr (int): uc number
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
         uc_schema.ShowUC: uc details
     """
-    return db.query(UC).filter(UC.id_uc == uc_nr).first()
+    options = fieldset.options() if fieldset else SHOW_UC
+    return db.query(UC).options(*options).filter(UC.id_uc == uc_nr).first()
 
 
-def get_uc(db: Session, /, *, id_uc: int) -> uc_schema.ShowUC:
+def get_uc(
+    db: Session, /, *, id_uc: int, fieldset: Optional[Fieldset] = None
+) -> uc_schema.ShowUC:
     """Query uc by id
 
     Args:
         db (Session): database session
         id_uc (int): uc id
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
         uc_schema.ShowUC: uc Detail
     """
-    return db.query(UC).get(id_uc)
+    options = fieldset.options() if fieldset else SHOW_UC
+    return db.query(UC).options(*options).get(id_uc)
 
 
 def get_ucs(
-    db: Session, /, *, skip: int = 0, limit: int = 100
-) -> List[uc_schema.ShowUC]:
+    db: Session,
+    /,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fieldset: Optional[Fieldset] = None,
+) -> Page:
     """Get list of ucs
 
     Args:
         db (Session): database session
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 0.
+        cursor (Optional[str], optional): cursor of the previous page.
+        Defaults to None.
+        estimate (bool, optional): estimate the total of rows.
+        Defaults to False.
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
-        List[uc_schema.ShowUC]: List of ucs
+        Page: ucs ordered by id and cursor of the next page
     """
-    return db.query(UC).offset(skip).limit(limit).all()
+    options = fieldset.options() if fieldset else SHOW_UC
+    return paginate(
+        db,
+        db.query(UC).options(*options),
+        UC.id_uc,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+    )
 
 
 def delete_uc(db: Session, /, *, id_uc: int) -> uc_schema.ShowUC:
@@ -327,6 +374,7 @@ def delete_uc(db: Session, /, *, id_uc: int) -> uc_schema.ShowUC:
             ),
         )
     try:
+        timetable.invalidate_uc(db, id_uc)
         db.delete(uc)  # delete uc record
         db.commit()
         return uc
@@ -377,6 +425,7 @@ def create_uc(db: Session, request: uc_schema.CreateUC, /) -> uc_schema.ShowUC:
         new_uc: UC = UC(
             nome_uc=request.nome_uc,
             descricao=request.descricao,
+            modo_presenca=request.modo_presenca,
             id_curso=request.id_curso,
         )
         db.add(new_uc)
@@ -422,8 +471,10 @@ def subscribe_uc(
             id_aluno=id_student, id_uc=id_uc, data_inscricao=request.data_inscricao
         )
         db.add(new_uc_subscription)
+        timetable.invalidate_student(db, id_student)
         db.commit()
         db.refresh(new_uc_subscription)
+        roster.invalidate_uc(id_uc)
         return new_uc_subscription
     except Exception as e:
         db.rollback()
@@ -471,7 +522,9 @@ def unsubscribeUC(
         )
     try:
         db.delete(subscrition)
+        timetable.invalidate_student(db, student_id)
         db.commit()
+        roster.invalidate_uc(uc_id)
         return subscrition
     except Exception as e:
         db.rollback()
@@ -731,6 +784,7 @@ def add_schedule(db: Session, request: CreateSchedule, /) -> ShowSchedule:
     )
     try:
         db.add(new_schedule)
+        timetable.invalidate_uc(db, uc_id)
         db.commit()
         db.refresh(new_schedule)
         return new_schedule
@@ -771,6 +825,7 @@ def remove_schedule(db: Session, /, *, schedule_id: int) -> ShowSchedule:
         )
 
     try:
+        timetable.invalidate_uc(db, schedule.id_uc)
         db.delete(schedule)
         db.commit()
         return schedule
@@ -6,16 +6,27 @@ This module define the model operations for the users
 @Author: José Galinha
 @Email: j.b.galinha@gmail.com
 """
-from typing import List
+from typing import Optional
 
 import schemas.user_schema as user_schema
+from db.alunos import Alunos
+from db.docentes import Docentes
 from db.user import User
 from fastapi import HTTPException, status
+from models.fieldsets import Fields, Fieldset
+from models.pagination import Page, paginate
 from sqlalchemy import or_
-from sqlalchemy.orm import Session
-from tools import crypt
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, undefer
+from tools import crypt, keypool
+from tools.cache import LRUCache
 from utils import Utils
 
+# loader options of the ShowUser responses, the public key is deferred
+SHOW_USER = (undefer(User.public_key),)
+
+USER_FIELDS = Fields(User, user_schema.ShowUser, {})
+
 
 def check_user_exists(db: Session, /, *, nome_utilizador: str, email: str) -> bool:
     """Check a given username and email exists in db
@@ -48,6 +59,40 @@ def check_user_exists(db: Session, /, *, nome_utilizador: str, email: str) -> bo
         )
 
 
+def get_login_user(db: Session, /, *, email: str) -> Row:
+    """Get an user by email together with its teacher and student ids
+
+    Args:
+        db (Session): database session
+        email (str): user email
+
+    Raises:
+        HTTPException: Error getting user
+
+    Returns:
+        Row: user, id_docente and id_aluno (None if the user doesn't have the
+        role), None if the user doesn't exists
+    """
+    try:
+        return (
+            db.query(User, Docentes.id_docente, Alunos.id_aluno)
+            .options(undefer(User.password))
+            .outerjoin(Docentes, Docentes.id_utilizador == User.id_utilizador)
+            .outerjoin(Alunos, Alunos.id_utilizador == User.id_utilizador)
+            .filter(User.email == email)
+            .first()
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=Utils.error_msg(
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "Error getting user",
+                error=repr(e),
+            ),
+        )
+
+
 def get_kr(db: Session, user_id: int) -> str:
     """Get user private key
 
@@ -62,8 +107,7 @@ def get_kr(db: Session, user_id: int) -> str:
         str: private key
     """
     try:
-        user = db.query(User).get(user_id)
-        kr = user.private_key
+        kr = db.query(User.private_key).filter(User.id_utilizador == user_id).scalar()
         if kr:
             return kr
         raise Exception
@@ -92,8 +136,7 @@ def get_ku(db: Session, user_id: int) -> str:
         str: public key
     """
     try:
-        user = db.query(User).get(user_id)
-        ku = user.public_key
+        ku = db.query(User.public_key).filter(User.id_utilizador == user_id).scalar()
         if ku:
             return ku
         raise Exception
@@ -108,20 +151,79 @@ def get_ku(db: Session, user_id: int) -> str:
         )
 
 
+# encoded and parsed public keys by user id, see load_ku
+pub_keys = LRUCache(maxsize=4096)
+
+
+def load_ku(user_id: int, public_key: str, /):
+    """Get the parsed public key of an user, parsing it only on cache misses
+
+    The cached key is only used while it matches the stored one, a key
+    changed by another process or in the database is parsed again.
+
+    Args:
+        user_id (int): user id
+        public_key (str): OpenSSH encoded public key of the user
+
+    Returns:
+        RSAPublicKey: the user public key
+    """
+    cached = pub_keys.get(user_id)
+    if cached is not None and cached[0] == public_key:
+        return cached[1]
+    ku = crypt.load_pub_key(public_key)
+    if isinstance(ku, dict):
+        return ku
+    pub_keys.put(user_id, (public_key, ku))
+    return ku
+
+
+def invalidate_ku(user_id: int, /):
+    """Drop the cached public key of an user, when it is deleted or its key
+    pair changes
+
+    Args:
+        user_id (int): user id
+    """
+    pub_keys.pop(user_id)
+
+
 def get_users(
-    db: Session, /, *, skip: int = 0, limit: int = 100
-) -> List[user_schema.ShowUser]:
+    db: Session,
+    /,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fieldset: Optional[Fieldset] = None,
+) -> Page:
     """Get users
 
     Args:
         db (Session): database session
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 100.
+        cursor (Optional[str], optional): cursor of the previous page.
+        Defaults to None.
+        estimate (bool, optional): estimate the total of rows.
+        Defaults to False.
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
-        List[user_schema.ShowUser]: List of users
+        Page: users ordered by id and cursor of the next page
     """
-    return db.query(User).offset(skip).limit(limit).all()
+    options = fieldset.options() if fieldset else SHOW_USER
+    return paginate(
+        db,
+        db.query(User).options(*options),
+        User.id_utilizador,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+    )
 
 
 def delete_user(db: Session, /, *, id_utilizador: int):
@@ -138,7 +240,7 @@ def delete_user(db: Session, /, *, id_utilizador: int):
     Returns:
         User: Deleted user details
     """
-    user = db.query(User).get(id_utilizador)
+    user = db.query(User).options(*SHOW_USER).get(id_utilizador)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -150,6 +252,7 @@ def delete_user(db: Session, /, *, id_utilizador: int):
     try:
         db.delete(user)
         db.commit()
+        invalidate_ku(id_utilizador)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -163,17 +266,27 @@ def delete_user(db: Session, /, *, id_utilizador: int):
     return user
 
 
-def get_user(db: Session, /, *, id_utilizador: int) -> user_schema.ShowUser:
+def get_user(
+    db: Session, /, *, id_utilizador: int, fieldset: Optional[Fieldset] = None
+) -> user_schema.ShowUser:
     """Query user by id
 
     Args:
         db (Session): database
         id_utilizador (int): username
+        fieldset (Optional[Fieldset], optional): requested fields.
+        Defaults to the full response.
 
     Returns:
         User: User details
     """
-    return db.query(User).filter(User.id_utilizador == id_utilizador).first()
+    options = fieldset.options() if fieldset else SHOW_USER
+    return (
+        db.query(User)
+        .options(*options)
+        .filter(User.id_utilizador == id_utilizador)
+        .first()
+    )
 
 
 # def get_user_pub_key(db: Session, id_utilizador: int, password: str):
@@ -206,7 +319,11 @@ def create_user(db: Session, request: user_schema.UserCreate, /) -> User:
         if not check_user_exists(
             db, nome_utilizador=request.nome_utilizador, email=request.email
         ):
-            key_pair = crypt.generate_key_pair(request.password)
+            key_pair = crypt.generate_key_pair(
+                request.password,
+                keypool.take() if request.key_type == "rsa" else None,
+                request.key_type,
+            )
             new_user = User(
                 nome_utilizador=request.nome_utilizador,
                 email=request.email,
@@ -1,42 +1,57 @@
+from typing import Optional
+
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.security.utils import get_authorization_scheme_param
-from jwtoken import get_user_id, verify_token
+from jwtoken import get_principal as get_token_principal
+from schemas.token_schema import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
 
-def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
-    authorization: str = request.cookies.get("access_token")
-    scheme, param = get_authorization_scheme_param(authorization)
-
-    credentials_exception = HTTPException(
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _request_token(request: Request, token: Optional[str]) -> Optional[str]:
+    authorization: str = request.cookies.get("access_token")
+    scheme, param = get_authorization_scheme_param(authorization)
+
     if authorization:
         if not authorization or scheme.lower() != "bearer":
-            raise credentials_exception
-        token = param
+            return None
+        return param
+    return token
 
-    return verify_token(token, credentials_exception)
 
+def get_principal(request: Request, token: str = Depends(oauth2_scheme)) -> Principal:
+    """Get the user of the request token, decoded once per request"""
+    token = _request_token(request, token)
+    if not token:
+        raise credentials_exception()
+    return get_token_principal(token, credentials_exception())
 
-def get_active_user(request: Request, token: str = Depends(oauth2_scheme)):
-    authorization: str = request.cookies.get("access_token")
-    scheme, param = get_authorization_scheme_param(authorization)
 
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def get_stream_principal(
+    request: Request, token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> Principal:
+    """Get the user of a streaming request, EventSource can't send headers so
+    browsers authenticate with the access_token cookie, the token is never
+    taken from the query string, it would end up in the access logs"""
+    token = _request_token(request, token)
+    if not token:
+        raise credentials_exception()
+    return get_token_principal(token, credentials_exception())
+
+
+def get_current_user(principal: Principal = Depends(get_principal)) -> Principal:
+    return principal
 
-    if authorization:
-        if not authorization or scheme.lower() != "bearer":
-            raise credentials_exception
-        token = param
 
-    return get_user_id(token, credentials_exception)
+def get_active_user(principal: Principal = Depends(get_principal)) -> int:
+    return principal.id
@@ -1,24 +1,28 @@
 from database import get_db
-from db.user import User
 from fastapi import APIRouter, HTTPException, Response, status
 from fastapi.params import Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from jwtoken import create_access_token
-from models import student, teacher
+from models import user
 from sqlalchemy.orm.session import Session
+from starlette.concurrency import run_in_threadpool
 from tools import crypt
 
 router = APIRouter(tags=["Autenticação"], prefix="/auth")
 
 
+# async so the bcrypt check waits on the process pool instead of holding one of
+# the threadpool slots, database calls still run in the threadpool
 @router.post("/login", status_code=status.HTTP_200_OK)
-def login(
+async def login(
     response: Response,
     request: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.email == request.username).first()
-    if not user:
+    login_user = await run_in_threadpool(
+        user.get_login_user, db, email=request.username
+    )
+    if not login_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -26,7 +30,9 @@ def login(
             },
         )
 
-    if not crypt.verify_password(request.password, user.password):
+    if not await crypt.verify_password_async(
+        request.password, login_user.User.password
+    ):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
@@ -34,18 +40,20 @@ def login(
             },
         )
 
-    is_teacher = teacher.check_teacher_by_user_id(db, user_id=user.id_utilizador)
-    is_student = student.check_student_by_user_id(db, user_id=user.id_utilizador)
+    is_teacher = login_user.id_docente is not None
+    is_student = login_user.id_aluno is not None
     is_super = True if not is_teacher and not is_student else False
 
     access_token = create_access_token(
         data={
-            "sub": user.email,
-            "id": user.id_utilizador,
-            "username": user.nome_utilizador,
+            "sub": login_user.User.email,
+            "id": login_user.User.id_utilizador,
+            "username": login_user.User.nome_utilizador,
             "isTeacher": is_teacher,
             "isStudent": is_student,
             "isSuper": is_super,
+            "id_docente": login_user.id_docente,
+            "id_aluno": login_user.id_aluno,
         }
     )
     response.set_cookie(
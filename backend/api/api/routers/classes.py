@@ -7,42 +7,104 @@ This module set the routes for the classes path of the api
 @Email: j.b.galinha@gmail.com
 """
 
-from typing import Any
+import asyncio
+import json
+from typing import Any, Dict, List
 
 from database import get_db
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from models import classes
-from oauth2 import get_active_user, get_current_user
+from oauth2 import get_current_user, get_principal, get_stream_principal
 from schemas.class_schema import (
+    CheckinBatch,
+    CheckinResult,
     CreateClass,
     CreateQRCodeClass,
+    CreateSecretClass,
     ReadQRCodeClass,
     ShowClass,
+    ShowSecretClass,
 )
+from schemas.token_schema import Principal
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from tools import broker
 
 router = APIRouter(tags=["Aulas"], prefix="/class")
 
 dependencies = [Depends(get_current_user)]
 
+# seconds between the keep-alive comments of an idle presences stream
+KEEPALIVE = 15
+
 
 @router.post("/checkin", status_code=status.HTTP_200_OK, dependencies=dependencies)
 def read_qrcode(
     request: ReadQRCodeClass,
     db: Session = Depends(get_db),
-    user_id: int = Depends(get_active_user),
+    principal: Principal = Depends(get_principal),
 ) -> Any:
     print("any")
-    return classes.read_QRCode(db, request, user_id=user_id)
+    return classes.read_QRCode(db, request, user_id=principal.id)
+
+
+@router.post(
+    "/checkin/batch",
+    response_model=List[CheckinResult],
+    status_code=status.HTTP_200_OK,
+    dependencies=dependencies,
+)
+def read_qrcodes(
+    request: CheckinBatch,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_principal),
+) -> Any:
+    """Check in a batch of scanned QRCodes of one class
+
+    Args:
+        request (CheckinBatch): class id and QRCodes data
+        db (Session, optional): database session. Defaults to Depends(get_db).
+        principal (Principal, optional): token user.
+        Defaults to Depends(get_principal).
+    """
+    return classes.read_QRCodes(db, request, user_id=principal.id)
 
 
 @router.post("/qrcode", status_code=status.HTTP_200_OK, dependencies=dependencies)
 def create_qrcode(
     request: CreateQRCodeClass,
     db: Session = Depends(get_db),
-    user_id: int = Depends(get_active_user),
+    principal: Principal = Depends(get_principal),
 ) -> Any:
-    return classes.create_QRCode(db, request, user_id=user_id)
+    return classes.create_QRCode(
+        db, request, user_id=principal.id, student_id=principal.id_aluno
+    )
+
+
+@router.post(
+    "/secret",
+    response_model=ShowSecretClass,
+    status_code=status.HTTP_200_OK,
+    dependencies=dependencies,
+)
+def create_secret(
+    request: CreateSecretClass,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_principal),
+) -> Any:
+    """Issue the check-in token secret of the student for a class
+
+    Args:
+        request (CreateSecretClass): class id
+        db (Session, optional): database session. Defaults to Depends(get_db).
+        principal (Principal, optional): token user.
+        Defaults to Depends(get_principal).
+    """
+    return classes.create_checkin_secret(
+        db, request, user_id=principal.id, student_id=principal.id_aluno
+    )
 
 
 @router.post(
@@ -75,3 +137,63 @@ def remove_class(id: int, db: Session = Depends(get_db)) -> Any:
         db (Session, optional): database session. Defaults to Depends(get_db).
     """
     return classes.remove_class(db, class_id=id)
+
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+@router.get("/{id}/presences/stream", status_code=status.HTTP_200_OK)
+async def stream_presences(
+    id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_stream_principal),
+) -> Any:
+    """Stream the check-ins of a class as server-sent events
+
+    A snapshot event with the students already present is sent on connect,
+    then a presence event for each check-in recorded.
+
+    Args:
+        id (int): class id
+        request (Request): request, to detect the client disconnect
+        db (Session, optional): database session. Defaults to Depends(get_db).
+        principal (Principal, optional): token user.
+        Defaults to Depends(get_stream_principal).
+    """
+    # subscribe before the snapshot so no check-in falls in between, the
+    # client dedups by student id
+    queue = broker.presences.subscribe(id)
+    try:
+        students = await run_in_threadpool(
+            classes.get_presences_snapshot,
+            db,
+            class_id=id,
+            teacher_id=principal.id_docente,
+        )
+    except Exception:
+        broker.presences.unsubscribe(id, queue)
+        raise
+    finally:
+        # don't hold a database connection while streaming
+        db.close()
+
+    async def events():
+        try:
+            yield _sse("snapshot", {"count": len(students), "alunos": students})
+            while not await request.is_disconnected():
+                try:
+                    presenca = await asyncio.wait_for(queue.get(), KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse("presence", presenca)
+        finally:
+            broker.presences.unsubscribe(id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -7,14 +7,15 @@ This module set the routes for the courses path of the api
 @Email: j.b.galinha@gmail.com
 """
 
-from typing import Any, List
+from typing import Any, List, Optional
 
 from database import get_db
-from fastapi import APIRouter, Depends, status
-from models import course
+from fastapi import APIRouter, Depends, Response, status
+from models import course, documents, fieldsets, pagination
 from oauth2 import get_current_user
 from schemas import courses_schema, nm_schema
 from sqlalchemy.orm import Session
+from tools import query_budget
 
 router = APIRouter(tags=["Cursos"], prefix="/courses")
 
@@ -25,17 +26,48 @@ dependencies = [Depends(get_current_user)]
     "/list",
     response_model=List[courses_schema.ShowCourse],
     status_code=status.HTTP_200_OK,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(2))],
 )
-def list_courses(db: Session = Depends(get_db), skip: int = 0, limit: int = 100) -> Any:
+def list_courses(
+    response: Response,
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get list of courses
 
     Args:
         db (Session, optional): database session. Defaults to Depends(getattr).
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 0.
+        cursor (Optional[str], optional): X-Next-Cursor of the previous page,
+        the rows after it. Defaults to None.
+        estimate (bool, optional): send the estimated total of rows in
+        X-Total-Estimate. Defaults to False.
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return course.list_courses(db, skip=skip, limit=limit)
+    fieldset = course.COURSE_FIELDS.select(fields, expand)
+    if documents.ENABLED and fieldset is None:
+        page = documents.list_courses(
+            db, skip=skip, limit=limit, cursor=cursor, estimate=estimate
+        )
+        return documents.respond(response, pagination.respond(response, page))
+    page = course.list_courses(
+        db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+        fieldset=fieldset,
+    )
+    return fieldsets.respond(response, pagination.respond(response, page), fieldset)
 
 
 @router.post(
@@ -97,16 +129,28 @@ def unsubscribe_course(
     "/{id}",
     response_model=courses_schema.ShowCourseWithUcs,
     status_code=status.HTTP_200_OK,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(2))],
 )
-def get_course_by_id(id: int, db: Session = Depends(get_db)) -> Any:
+def get_course_by_id(
+    id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get Course by id
 
     Args:
         id (int): course id
         db (Session, optional): database session. Defaults to Depends(get_db).
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return course.get_course_by_id(db, course_id=id)
+    fieldset = course.COURSE_WITH_UCS_FIELDS.select(fields, expand)
+    row = course.get_course_by_id(db, course_id=id, fieldset=fieldset)
+    return fieldsets.respond(response, row, fieldset)
 
 
 @router.put(
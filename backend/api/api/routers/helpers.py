@@ -7,11 +7,12 @@ This module set the routes for the ucs path of the api
 @Email: j.b.galinha@gmail.com
 """
 
-from typing import Any
+from datetime import date
+from typing import Any, Optional
 
 from database import get_db
 from fastapi import APIRouter, Depends, status
-from models import helpers
+from models import helpers, timetable
 from oauth2 import get_current_user
 from schemas.semester_schema import CreateSemester
 from schemas.year_schema import CreateYear, ShowYear
@@ -87,3 +88,30 @@ def remove_semester(id: int, db: Session = Depends(get_db)) -> Any:
         db (Session, optional): database session. Defaults to Depends(get_db).
     """
     return helpers.remove_semester(db, semester_id=id)
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    dependencies=dependencies,
+)
+def get_metrics() -> Any:
+    """Get the counters of the in memory caches and worker pools"""
+    return helpers.get_metrics()
+
+
+@router.post(
+    "/timetables",
+    status_code=status.HTTP_200_OK,
+    dependencies=dependencies,
+)
+def build_timetables(day: Optional[date] = None, db: Session = Depends(get_db)) -> Any:
+    """Build the timetables of the users with classes on a day, like the
+    nightly job
+
+    Args:
+        day (Optional[date], optional): day. Defaults to today.
+        db (Session, optional): database session. Defaults to Depends(get_db).
+    """
+    day = day or date.today()
+    return {"data": day, "utilizadores": timetable.build_days(db, day=day)}
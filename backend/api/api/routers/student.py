@@ -7,14 +7,15 @@ This module set the routes for the alunos path of the api
 @Email: j.b.galinha@gmail.com
 """
 
-from typing import Any, List
+from typing import Any, List, Optional
 
 from database import get_db
-from fastapi import APIRouter, Depends, status
-from models import student
+from fastapi import APIRouter, Depends, Response, status
+from models import documents, fieldsets, pagination, student, timetable
 from oauth2 import get_active_user, get_current_user
 from schemas import student_schema
 from sqlalchemy.orm import Session
+from tools import query_budget
 
 router = APIRouter(tags=["Alunos"], prefix="/student")
 
@@ -27,14 +28,26 @@ dependencies = [Depends(get_current_user)]
     status_code=status.HTTP_200_OK,
     dependencies=dependencies,
 )
-def get_student_by_number(number: int, db: Session = Depends(get_db)) -> Any:
+def get_student_by_number(
+    number: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get student by number
 
     Args:
         number (int): student number
         db (Session, optional): database session. Defaults to Depends(get_db).
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return student.get_student_by_number(db, student_nr=number)
+    fieldset = student.STUDENT_FIELDS.select(fields, expand)
+    row = student.get_student_by_number(db, student_nr=number, fieldset=fieldset)
+    return fieldsets.respond(response, row, fieldset)
 
 
 @router.post(
@@ -59,27 +72,55 @@ def create_student(
     "/list",
     response_model=List[student_schema.TodayStudent],
     status_code=status.HTTP_200_OK,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(5))],
 )
-def get_students(db: Session = Depends(get_db), skip: int = 0, limit: int = 100) -> Any:
+def get_students(
+    response: Response,
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get List of students
 
     Args:
         db (Session, optional): database session. Defaults to Depends(get_db).
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 100.
+        cursor (Optional[str], optional): X-Next-Cursor of the previous page,
+        the rows after it. Defaults to None.
+        estimate (bool, optional): send the estimated total of rows in
+        X-Total-Estimate. Defaults to False.
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return student.get_students(db, skip=skip, limit=limit)
+    fieldset = student.TODAY_STUDENT_FIELDS.select(fields, expand)
+    page = student.get_students(
+        db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+        fieldset=fieldset,
+    )
+    return fieldsets.respond(response, pagination.respond(response, page), fieldset)
 
 
 @router.get(
     "/today",
     response_model=student_schema.TodayStudent,
     status_code=status.HTTP_200_OK,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(3))],
 )
 def student_today(
-    user_id: int = Depends(get_active_user), db: Session = Depends(get_db)
+    response: Response,
+    user_id: int = Depends(get_active_user),
+    db: Session = Depends(get_db),
 ) -> Any:
     """Get classes of the day
 
@@ -87,8 +128,9 @@ def student_today(
         user_id (int): user id
         db (Session, optional): database session. Defaults to Depends(get_db).
     """
-    today = student.today(db, user_id=user_id)
-    return today
+    if documents.ENABLED:
+        return documents.respond(response, documents.student_day(db, user_id=user_id))
+    return timetable.student_day(db, user_id=user_id)
 
 
 @router.get(
@@ -97,14 +139,26 @@ def student_today(
     status_code=status.HTTP_200_OK,
     dependencies=dependencies,
 )
-def get_student_by_id(id: int, db: Session = Depends(get_db)) -> Any:
+def get_student_by_id(
+    id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get student by id
 
     Args:
         id (int): student id
         db (Session, optional): database session. Defaults to Depends(get_db).
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return student.get_student(db, id_student=id)
+    fieldset = student.STUDENT_FIELDS.select(fields, expand)
+    row = student.get_student(db, id_student=id, fieldset=fieldset)
+    return fieldsets.respond(response, row, fieldset)
 
 
 @router.delete(
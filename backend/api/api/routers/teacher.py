@@ -8,14 +8,15 @@ This module set the routes for the teachers path of the api
 """
 
 
-from typing import Any, List
+from typing import Any, List, Optional
 
 from database import get_db
-from fastapi import APIRouter, Depends, status
-from models import teacher
+from fastapi import APIRouter, Depends, Response, status
+from models import documents, fieldsets, pagination, teacher, timetable
 from oauth2 import get_active_user, get_current_user
 from schemas import teacher_schema
 from sqlalchemy.orm import Session
+from tools import query_budget
 
 router = APIRouter(tags=["Docentes"], prefix="/teacher")
 
@@ -26,12 +27,22 @@ dependencies = [Depends(get_current_user)]
     "/today",
     status_code=status.HTTP_200_OK,
     response_model=teacher_schema.TodayTeacher,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(6))],
 )
 def teacher_today(
-    user_id: int = Depends(get_active_user), db: Session = Depends(get_db)
+    response: Response,
+    user_id: int = Depends(get_active_user),
+    db: Session = Depends(get_db),
 ) -> Any:
-    return teacher.today(db, user_id=user_id)
+    """Get classes of the day
+
+    Args:
+        user_id (int): user id
+        db (Session, optional): database session. Defaults to Depends(get_db).
+    """
+    if documents.ENABLED:
+        return documents.respond(response, documents.teacher_day(db, user_id=user_id))
+    return timetable.teacher_day(db, user_id=user_id)
 
 
 @router.get(
@@ -40,14 +51,26 @@ def teacher_today(
     status_code=status.HTTP_200_OK,
     dependencies=dependencies,
 )
-def get_teacher_by_number(number: int, db: Session = Depends(get_db)) -> Any:
+def get_teacher_by_number(
+    number: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get teacher by number
 
     Args:
         number (int): teacher number
         db (Session, optional): database session. Defaults to Depends(get_db).
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return teacher.get_teacher_by_number(db, teacher_nr=number)
+    fieldset = teacher.TEACHER_FIELDS.select(fields, expand)
+    row = teacher.get_teacher_by_number(db, teacher_nr=number, fieldset=fieldset)
+    return fieldsets.respond(response, row, fieldset)
 
 
 @router.post(
@@ -72,17 +95,43 @@ def create_teacher(
     "/list",
     response_model=List[teacher_schema.ShowTeacher],
     status_code=status.HTTP_200_OK,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(2))],
 )
-def get_teachers(db: Session = Depends(get_db), skip: int = 0, limit: int = 100) -> Any:
+def get_teachers(
+    response: Response,
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get List of teachers
 
     Args:
         db (Session, optional): database session. Defaults to Depends(get_db).
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 100.
+        cursor (Optional[str], optional): X-Next-Cursor of the previous page,
+        the rows after it. Defaults to None.
+        estimate (bool, optional): send the estimated total of rows in
+        X-Total-Estimate. Defaults to False.
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return teacher.get_teachers(db, skip=skip, limit=limit)
+    fieldset = teacher.TEACHER_FIELDS.select(fields, expand)
+    page = teacher.get_teachers(
+        db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+        fieldset=fieldset,
+    )
+    return fieldsets.respond(response, pagination.respond(response, page), fieldset)
 
 
 @router.get(
@@ -91,14 +140,26 @@ def get_teachers(db: Session = Depends(get_db), skip: int = 0, limit: int = 100)
     status_code=status.HTTP_200_OK,
     dependencies=dependencies,
 )
-def get_teacher_by_id(id: int, db: Session = Depends(get_db)) -> Any:
+def get_teacher_by_id(
+    id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get teacher by id
 
     Args:
         id (int): teacher id
         db (Session, optional): database session. Defaults to Depends(get_db).
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return teacher.get_teacher(db, id_teacher=id)
+    fieldset = teacher.TEACHER_FIELDS.select(fields, expand)
+    row = teacher.get_teacher(db, id_teacher=id, fieldset=fieldset)
+    return fieldsets.respond(response, row, fieldset)
 
 
 @router.delete(
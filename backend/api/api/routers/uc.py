@@ -7,15 +7,16 @@ This module set the routes for the ucs path of the api
 @Email: j.b.galinha@gmail.com
 """
 
-from typing import Any, List
+from typing import Any, List, Optional
 
 from database import get_db
-from fastapi import APIRouter, Depends, status
-from models import uc
+from fastapi import APIRouter, Depends, Response, status
+from models import documents, fieldsets, pagination, uc
 from oauth2 import get_current_user
 from schemas import nm_schema, uc_schema
 from schemas.schedules_schema import CreateSchedule, ShowSchedule
 from sqlalchemy.orm import Session
+from tools import query_budget
 
 router = APIRouter(tags=["UC"], prefix="/uc")
 
@@ -28,14 +29,26 @@ dependencies = [Depends(get_current_user)]
     status_code=status.HTTP_200_OK,
     dependencies=dependencies,
 )
-def get_uc_by_number(number: int, db: Session = Depends(get_db)) -> Any:
+def get_uc_by_number(
+    number: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get uc by number
 
     Args:
         number (int): uc number
         db (Session, optional): database session. Defaults to Depends(get_db).
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return uc.get_uc_by_number(db, uc_nr=number)
+    fieldset = uc.UC_FIELDS.select(fields, expand)
+    row = uc.get_uc_by_number(db, uc_nr=number, fieldset=fieldset)
+    return fieldsets.respond(response, row, fieldset)
 
 
 @router.post(
@@ -198,33 +211,73 @@ def remove_schedule(id: int, db: Session = Depends(get_db)) -> Any:
     "/list",
     response_model=List[uc_schema.ShowUC],
     status_code=status.HTTP_200_OK,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(4))],
 )
-def get_ucs(db: Session = Depends(get_db), skip: int = 0, limit: int = 100) -> Any:
+def get_ucs(
+    response: Response,
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get List of ucs
 
     Args:
         db (Session, optional): database session. Defaults to Depends(get_db).
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 100.
+        cursor (Optional[str], optional): X-Next-Cursor of the previous page,
+        the rows after it. Defaults to None.
+        estimate (bool, optional): send the estimated total of rows in
+        X-Total-Estimate. Defaults to False.
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return uc.get_ucs(db, skip=skip, limit=limit)
+    fieldset = uc.UC_FIELDS.select(fields, expand)
+    page = uc.get_ucs(
+        db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+        fieldset=fieldset,
+    )
+    return fieldsets.respond(response, pagination.respond(response, page), fieldset)
 
 
 @router.get(
     "/{id}",
     response_model=uc_schema.ShowUC,
     status_code=status.HTTP_200_OK,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(3))],
 )
-def get_uc_by_id(id: int, db: Session = Depends(get_db)) -> Any:
+def get_uc_by_id(
+    id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get uc by id
 
     Args:
         id (int): uc id
         db (Session, optional): database session. Defaults to Depends(get_db).
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
     """
-    return uc.get_uc(db, id_uc=id)
+    fieldset = uc.UC_FIELDS.select(fields, expand)
+    if documents.ENABLED and fieldset is None:
+        return documents.respond(response, documents.get_uc(db, uc_id=id))
+    row = uc.get_uc(db, id_uc=id, fieldset=fieldset)
+    return fieldsets.respond(response, row, fieldset)
 
 
 @router.delete(
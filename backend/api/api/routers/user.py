@@ -6,14 +6,15 @@ This module set the routes for the user path of the api
 @Author: José Galinha
 @Email: j.b.galinha@gmail.com
 """
-from typing import Any, List
+from typing import Any, List, Optional
 
 import schemas.user_schema as user_schema
 from database import get_db
-from fastapi import APIRouter, Depends, status
-from models import user
+from fastapi import APIRouter, Depends, Response, status
+from models import fieldsets, pagination, user
 from oauth2 import get_current_user
 from sqlalchemy.orm import Session
+from tools import query_budget
 
 router = APIRouter(tags=["Utilizadores"], prefix="/user")
 
@@ -44,21 +45,46 @@ def create_user(request: user_schema.UserCreate, db: Session = Depends(get_db))
     "/list",
     response_model=List[user_schema.ShowUser],
     status_code=status.HTTP_200_OK,
-    dependencies=dependencies,
+    dependencies=[*dependencies, Depends(query_budget.limit(2))],
 )
-def get_users(db: Session = Depends(get_db), skip: int = 0, limit: int = 100) -> Any:
+def get_users(
+    response: Response,
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    estimate: bool = False,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get all users
 
     Args:
         db (Session, optional): database session. Defaults to Depends(get_db).
         skip (int, optional): rows to skip. Defaults to 0.
         limit (int, optional): limit of rows. Defaults to 100.
+        cursor (Optional[str], optional): X-Next-Cursor of the previous page,
+        the rows after it. Defaults to None.
+        estimate (bool, optional): send the estimated total of rows in
+        X-Total-Estimate. Defaults to False.
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
 
     Returns:
         List[user_schema.ShowUser]: list of Users
     """
-    users = user.get_users(db, skip=skip, limit=limit)
-    return users
+    fieldset = user.USER_FIELDS.select(fields, expand)
+    page = user.get_users(
+        db,
+        skip=skip,
+        limit=limit,
+        cursor=cursor,
+        estimate=estimate,
+        fieldset=fieldset,
+    )
+    return fieldsets.respond(response, pagination.respond(response, page), fieldset)
 
 
 # @router.get("/{id}/{password}/pubkey", status_code=status.HTTP_200_OK, response_model=user_schema.ShowUser)
@@ -72,17 +98,29 @@ def get_users(db: Session = Depends(get_db), skip: int = 0, limit: int = 100) ->
     response_model=user_schema.ShowUser,
     dependencies=dependencies,
 )
-def get_user(id: int, db: Session = Depends(get_db)) -> Any:
+def get_user(
+    id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+) -> Any:
     """Get user by id
 
     Args:
         id (int): user id
         db (Session, optional): database session. Defaults to Depends(get_db).
+        fields (Optional[str], optional): comma separated columns of the
+        response, only those are loaded. Defaults to the full response.
+        expand (Optional[str], optional): comma separated relationships of
+        the response. Defaults to the full response, none with fields.
 
     Returns:
         user_schema.ShowUser: user details
     """
-    return user.get_user(db, id_utilizador=id)
+    fieldset = user.USER_FIELDS.select(fields, expand)
+    row = user.get_user(db, id_utilizador=id, fieldset=fieldset)
+    return fieldsets.respond(response, row, fieldset)
 
 
 @router.delete(
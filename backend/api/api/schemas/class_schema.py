@@ -6,9 +6,13 @@ This module define the pydantic schema of classes data
 @Author: José Galinha
 @Email: j.b.galinha@gmail.com
 """
-from datetime import date
+from datetime import date, datetime
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, constr
+
+# time based check-in token, see tools/totp.py
+CheckinToken = constr(regex=r"^[0-9]{6,10}$")
 
 
 class ClassBase(BaseModel):
@@ -53,7 +57,34 @@ class QRCodeMsgClass(BaseModel):
 
 class ReadQRCodeClass(BaseModel):
     msg: QRCodeMsgClass
-    signature: str
+    signature: Optional[str] = None
+    token: Optional[CheckinToken] = None
+    # capture time of a scan queued by the teacher, the token is checked at it
+    scanned_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
+
+
+class CheckinBatch(BaseModel):
+    id_aula: int
+    checkins: List[ReadQRCodeClass]
+
+
+class CheckinResult(BaseModel):
+    id_aluno: int
+    code: int
+    msg: str
+    confirmacao: Optional[datetime] = None
+
+
+class CreateSecretClass(BaseModel):
+    id_aula: int
+
+
+class ShowSecretClass(BaseModel):
+    id_aula: int
+    id_aluno: int
+    secret: str
+    step: int
+    digits: int
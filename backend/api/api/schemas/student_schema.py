@@ -66,6 +66,7 @@ class TodaySchedules(BaseModel):
 
 class TodayUC(BaseModel):
     nome_uc: str
+    modo_presenca: str
 
     periodos: List[TodaySchedules]
 
@@ -1,9 +1,25 @@
 from typing import Optional
+
 from pydantic import BaseModel
 
+
 class Token(BaseModel):
     access_token: str
     token_type: str
-    
+
+
 class TokenData(BaseModel):
-    email: Optional[str] = None
\ No newline at end of file
+    email: Optional[str] = None
+
+
+class Principal(BaseModel):
+    id: int
+    email: str
+    username: Optional[str] = None
+    is_teacher: bool = False
+    is_student: bool = False
+    is_super: bool = False
+    id_docente: Optional[int] = None
+    id_aluno: Optional[int] = None
+    exp: int
+    nbf: Optional[int] = None
@@ -6,7 +6,7 @@ This module define the pydantic schema of ucs data
 @Author: José Galinha
 @Email: j.b.galinha@gmail.com
 """
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel
 from schemas import courses_schema, nm_schema, teacher_schema
@@ -15,6 +15,7 @@ from schemas import courses_schema, nm_schema, teacher_schema
 class UCBase(BaseModel):
     nome_uc: str
     descricao: str
+    modo_presenca: Literal["rsa", "totp"] = "rsa"
 
     class Config:
         orm_mode = True
@@ -39,5 +40,8 @@ class ShowUC(UCBase):
 
 
 class UpdateUC(UCBase):
+    # left out keeps the current attendance mode
+    modo_presenca: Optional[Literal["rsa", "totp"]] = None
+
     class Config:
         orm_mode = True
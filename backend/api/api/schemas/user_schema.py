@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel
 
 
@@ -8,6 +10,7 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     password: str
+    key_type: Literal["rsa", "ed25519"] = "rsa"
 
     class Config:
         orm_mode = True
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Presence events broker
+
+This module define an in-process publish/subscribe broker used to push the
+check-ins of a class to the teachers watching it. Check-ins are recorded in
+the request threadpool and the subscribers are asyncio streams, so events
+are handed to each subscriber loop thread-safely.
+
+The broker lives in the api process, run a single worker (or sticky
+sessions) for the teachers to see the check-ins of every scanner.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, Hashable, List, Tuple
+
+# max events waiting on a slow subscriber, older ones are dropped
+QUEUE_SIZE = 256
+
+
+class Broker:
+    """Topic based publish/subscribe of events"""
+
+    def __init__(self):
+        self._topics: Dict[Hashable, List[Tuple[asyncio.AbstractEventLoop, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: Hashable) -> asyncio.Queue:
+        """Subscribe a topic, must be called from the subscriber event loop
+
+        Args:
+            topic (Hashable): topic
+
+        Returns:
+            asyncio.Queue: queue receiving the topic events
+        """
+        queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        with self._lock:
+            self._topics.setdefault(topic, []).append(
+                (asyncio.get_running_loop(), queue)
+            )
+        return queue
+
+    def unsubscribe(self, topic: Hashable, queue: asyncio.Queue):
+        """Stop receiving the events of a topic
+
+        Args:
+            topic (Hashable): topic
+            queue (asyncio.Queue): subscribed queue
+        """
+        with self._lock:
+            subscribers = [s for s in self._topics.get(topic, []) if s[1] is not queue]
+            if subscribers:
+                self._topics[topic] = subscribers
+            else:
+                self._topics.pop(topic, None)
+
+    def publish(self, topic: Hashable, event: Any):
+        """Send an event to the subscribers of a topic, from any thread
+
+        Args:
+            topic (Hashable): topic
+            event (Any): event
+        """
+        with self._lock:
+            subscribers = list(self._topics.get(topic, []))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_put, queue, event)
+            except RuntimeError:
+                pass  # subscriber loop closed
+
+    def subscribers(self, topic: Hashable) -> int:
+        """Number of subscribers of a topic"""
+        with self._lock:
+            return len(self._topics.get(topic, []))
+
+
+def _put(queue: asyncio.Queue, event: Any):
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+presences = Broker()
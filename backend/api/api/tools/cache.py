@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Cache tools file
+
+This module define a small thread safe LRU cache used by the api to keep
+expensive to build objects in memory
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+class LRUCache:
+    """Bounded least recently used cache with hit and miss counters
+
+    Args:
+        maxsize (int): max number of entries
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, marking it as the most recently used
+
+        Args:
+            key (Hashable): entry key
+            default (Any, optional): value on miss. Defaults to None.
+
+        Returns:
+            Any: cached value
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full
+
+        Args:
+            key (Hashable): entry key
+            value (Any): value to cache
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an entry
+
+        Args:
+            key (Hashable): entry key
+            default (Any, optional): value if not cached. Defaults to None.
+
+        Returns:
+            Any: removed value
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters
+
+        Returns:
+            Dict[str, int]: size, max size, hits and misses
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -1,34 +1,80 @@
+import os
+import threading
+from concurrent.futures import Future
+
 from cryptography.exceptions import InvalidSignature, UnsupportedAlgorithm
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives import serialization as crypt_serialization
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding, rsa
+from dotenv import load_dotenv
 from passlib.context import CryptContext
+from tools.cache import LRUCache
+from tools.pool import ProcessPool
+
+load_dotenv()
 
 pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt runs in its own processes, at most BCRYPT_WORKERS hashes at a time
+bcrypt_pool = ProcessPool(int(os.getenv("BCRYPT_WORKERS", os.cpu_count() or 1)))
 
-def bcrypt(password: str):
+
+def _hash(password: str):
     return pwd_ctx.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str):
+def _verify(plain_password: str, hashed_password: str):
     return pwd_ctx.verify(plain_password, hashed_password)
 
 
+def bcrypt(password: str):
+    return bcrypt_pool.call(_hash, password)
+
+
+def verify_password(plain_password: str, hashed_password: str):
+    return bcrypt_pool.call(_verify, plain_password, hashed_password)
+
+
+async def bcrypt_async(password: str):
+    return await bcrypt_pool.run(_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str):
+    return await bcrypt_pool.run(_verify, plain_password, hashed_password)
+
+
 # https://www.programcreek.com/python/?CodeExample=generate+key+pair
 # https://dev.to/aaronktberry/generating-encrypted-key-pairs-in-python-69b
-def generate_key_pair(password):
+def generate_private_key(key_type="rsa"):
+    """generate a private key
+
+    Args:
+        key_type (str, optional): rsa or ed25519. Defaults to "rsa".
+
+    Returns:
+        RSAPrivateKey | Ed25519PrivateKey: the private key
+    """
+    if key_type == "ed25519":
+        return ed25519.Ed25519PrivateKey.generate()
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def generate_key_pair(password, key_pair=None, key_type="rsa"):
     """generate pair of keys
 
     Args:
         password (str): password to encrypt private key
+        key_pair (RSAPrivateKey, optional): pre-generated private key to use.
+        Defaults to None.
+        key_type (str, optional): rsa or ed25519, used if no key_pair is
+        given. Defaults to "rsa".
 
     Returns:
         tuple: public and private key
     """
-    # generate RSA key pair
+    # generate key pair
     try:
-        key_pair = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        key_pair = key_pair or generate_private_key(key_type)
         # generate encrypted private key
         private_key = key_pair.private_bytes(
             encoding=crypt_serialization.Encoding.PEM,
@@ -55,13 +101,13 @@ def generate_key_pair(password):
 
 
 def load_pub_key(public_key):
-    """load RSA Public Key
+    """load RSA or Ed25519 Public Key
 
     Args:
         public_key (bytes): The OpenSSH encoded key data
 
     Returns:
-        RSAPublicKey: the RSA public key
+        RSAPublicKey | Ed25519PublicKey: the public key
     """
     try:
         return crypt_serialization.load_ssh_public_key(is_bytes(public_key))
@@ -80,14 +126,14 @@ def load_pub_key(public_key):
 
 
 def load_priv_key(private_key, password):
-    """load the RSAPrivatekey
+    """load the RSA or Ed25519 private key
 
     Args:
         private_key (bytes): the PEM encoded data
         password (bytes): password
 
     Returns:
-        RSAPrivateKey: the RSA private key
+        RSAPrivateKey | Ed25519PrivateKey: the private key
     """
     try:
         kr = crypt_serialization.load_pem_private_key(
@@ -111,8 +157,10 @@ def load_priv_key(private_key, password):
 def sign(kr, data):
     """sign a data that can be verify by others with public key
 
+    RSA keys sign with PSS, Ed25519 keys with their own scheme.
+
     Args:
-        kr (RSAPrivateKey): private key
+        kr (RSAPrivateKey | Ed25519PrivateKey): private key
         data (bytes): data to sign
 
     Returns:
@@ -120,6 +168,8 @@ def sign(kr, data):
     """
     try:
         data = data if isinstance(data, bytes) else bytes(data)
+        if isinstance(kr, ed25519.Ed25519PrivateKey):
+            return kr.sign(data)
         signature = kr.sign(
             is_bytes(data),
             padding.PSS(
@@ -139,7 +189,7 @@ def verify(ku, data, signature):
     """Verify a sign data
 
     Args:
-        ku (str): public key
+        ku (RSAPublicKey | Ed25519PublicKey): public key
         data (bytes): data to verify
         signature (str): data signature
 
@@ -147,6 +197,9 @@ def verify(ku, data, signature):
         if data is valid return a data, else raise an error
     """
     try:
+        if isinstance(ku, ed25519.Ed25519PublicKey):
+            ku.verify(signature, is_bytes(data))
+            return {"data": "data validated"}
         ku.verify(
             signature,
             is_bytes(data),
@@ -163,6 +216,108 @@ def verify(ku, data, signature):
         return {"error": "error verifying the data", "msg": "{}".format(e)}
 
 
+# parsed public keys of the verifier worker processes
+_worker_keys = LRUCache(maxsize=1024)
+
+
+def _wire_key(ku):
+    """OpenSSH encoding of a public key, to send it to a worker process"""
+    if isinstance(ku, (str, bytes)):
+        return is_bytes(ku)
+    return ku.public_bytes(
+        crypt_serialization.Encoding.OpenSSH,
+        crypt_serialization.PublicFormat.OpenSSH,
+    )
+
+
+def _verify_batch(jobs):
+    """Verify a batch of signatures, in a worker process or inline
+
+    Args:
+        jobs (list): (public key, data, signature) tuples
+
+    Returns:
+        list: True for each valid signature
+    """
+    results = []
+    for ku, data, signature in jobs:
+        if isinstance(ku, bytes):
+            key = _worker_keys.get(ku)
+            if key is None:
+                key = load_pub_key(ku)
+                _worker_keys.put(ku, key)
+            ku = key
+        results.append("data" in verify(ku, data, signature))
+    return results
+
+
+class Verifier:
+    """Signature verifier that fans big batches out to a process pool
+
+    A single verify is cheaper than sending it to another process, so
+    batches smaller than inline_below are verified in the calling thread.
+
+    Args:
+        workers (int): number of worker processes
+        inline_below (int): batches smaller than this are verified inline
+    """
+
+    def __init__(self, workers: int, /, *, inline_below: int = 16):
+        self.inline_below = inline_below
+        self.pool = ProcessPool(workers)
+
+    def submit(self, jobs) -> Future:
+        """Verify a batch of signatures
+
+        Args:
+            jobs (list): (public key, data, signature) tuples, the public key
+            can be a loaded key or its OpenSSH encoding
+
+        Returns:
+            Future: list with True for each valid signature, in the jobs order
+        """
+        jobs = list(jobs)
+        if len(jobs) < max(1, self.inline_below):
+            future = Future()
+            future.set_result(_verify_batch(jobs))
+            return future
+
+        jobs = [(_wire_key(ku), data, signature) for ku, data, signature in jobs]
+        size = -(-len(jobs) // self.pool.workers)
+        chunks = [
+            self.pool.submit(_verify_batch, jobs[i : i + size])
+            for i in range(0, len(jobs), size)
+        ]
+        future = Future()
+        remaining = [len(chunks)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                future.set_result([ok for chunk in chunks for ok in chunk.result()])
+            except Exception as e:
+                future.set_exception(e)
+
+        for chunk in chunks:
+            chunk.add_done_callback(done)
+        return future
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        self.pool.shutdown()
+
+
+# verifies the check-in signatures, VERIFY_WORKERS processes for big batches
+verifier = Verifier(
+    int(os.getenv("VERIFY_WORKERS", os.cpu_count() or 1)),
+    inline_below=int(os.getenv("VERIFY_INLINE_BELOW", "16")),
+)
+
+
 def encrypt(key, data):
     """encrypt a data
 
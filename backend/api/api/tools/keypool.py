@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""RSA key pool
+
+This module keeps a pool of fresh RSA private keys, generated ahead of time
+by a process pool, so creating an user only does the cheap encryption of
+its private key with the user password. The pool is refilled up to the high
+watermark once it drops below the low watermark. When it runs dry the keys
+are generated inline, like before.
+
+Disable it with KEY_POOL=0.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from cryptography.hazmat.primitives import serialization as crypt_serialization
+from dotenv import load_dotenv
+from tools import crypt
+from tools.pool import ProcessPool
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("KEY_POOL", "1") == "1"
+LOW = int(os.getenv("KEY_POOL_LOW", "8"))
+HIGH = int(os.getenv("KEY_POOL_HIGH", "32"))
+WORKERS = int(os.getenv("KEY_POOL_WORKERS", "1"))
+
+
+def _generate() -> bytes:
+    """Generate a private key in a worker process, PEM encoded to cross back"""
+    return crypt.generate_private_key().private_bytes(
+        encoding=crypt_serialization.Encoding.PEM,
+        format=crypt_serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=crypt_serialization.NoEncryption(),
+    )
+
+
+class KeyPool:
+    """Pool of pre-generated RSA private keys
+
+    Args:
+        low (int): size that triggers a refill
+        high (int): size the pool is refilled to
+        workers (int): number of processes generating keys
+    """
+
+    def __init__(self, /, *, low: int = 8, high: int = 32, workers: int = 1):
+        self.low = low
+        self.high = max(low, high)
+        self.taken = 0
+        self.misses = 0
+        self.generated = 0
+        self._keys: Deque = deque()
+        self._lock = threading.Lock()
+        self._refill = threading.Event()
+        self._stopping = threading.Event()
+        self._pool = ProcessPool(workers)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the refill thread and fill the pool"""
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="key-pool", daemon=True)
+        self._thread.start()
+        self._refill.set()
+
+    def stop(self):
+        """Stop the refill thread and the worker processes"""
+        self._stopping.set()
+        self._refill.set()
+        if self._thread:
+            self._thread.join()
+        self._pool.shutdown()
+
+    def take(self):
+        """Take a key from the pool
+
+        Returns:
+            RSAPrivateKey: a fresh private key, None if the pool is empty
+        """
+        with self._lock:
+            key = self._keys.popleft() if self._keys else None
+            if key is None:
+                self.misses += 1
+            else:
+                self.taken += 1
+            if len(self._keys) < self.low:
+                self._refill.set()
+        return key
+
+    def stats(self) -> Dict[str, int]:
+        """Pool counters
+
+        Returns:
+            Dict[str, int]: size, watermarks, keys taken, takes that found
+            the pool empty and keys generated
+        """
+        return {
+            "size": len(self._keys),
+            "low": self.low,
+            "high": self.high,
+            "taken": self.taken,
+            "misses": self.misses,
+            "generated": self.generated,
+        }
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._refill.wait()
+            self._refill.clear()
+            while not self._stopping.is_set() and len(self._keys) < self.high:
+                batch = min(self.high - len(self._keys), self._pool.workers)
+                futures = [self._pool.submit(_generate) for _ in range(batch)]
+                for future in futures:
+                    try:
+                        key = crypt_serialization.load_pem_private_key(
+                            future.result(), password=None
+                        )
+                    except Exception:
+                        logger.exception("error generating pooled key")
+                        self._stopping.wait(1)
+                        continue
+                    with self._lock:
+                        self._keys.append(key)
+                        self.generated += 1
+
+
+pool: Optional[KeyPool] = (
+    KeyPool(low=LOW, high=HIGH, workers=WORKERS) if ENABLED else None
+)
+
+
+def take():
+    """Take a pre-generated key, None if the pool is disabled or empty"""
+    return pool.take() if pool else None
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Process pool tools file
+
+This module define a size limited process pool used to run CPU bound work
+(password hashing, key generation) out of the api worker, so it doesn't hold
+the GIL or the request threadpool while it runs.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class ProcessPool:
+    """Lazily started process pool with queue depth counters
+
+    Args:
+        workers (int): number of worker processes
+    """
+
+    def __init__(self, workers: int, /):
+        self.workers = max(1, workers)
+        self.submitted = 0
+        self.completed = 0
+        self.pending = 0
+        self.peak_pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, /, *args) -> Future:
+        """Submit a call to the pool, starting it on first use
+
+        Args:
+            fn (Callable): picklable function to run
+
+        Returns:
+            Future: call result
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self.submitted += 1
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+            future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def call(self, fn: Callable, /, *args) -> Any:
+        """Run a call in the pool, blocking the calling thread until done"""
+        return self.submit(fn, *args).result()
+
+    async def run(self, fn: Callable, /, *args) -> Any:
+        """Run a call in the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        """Stop the worker processes, waiting for the pending calls"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Pool counters
+
+        Returns:
+            Dict[str, int]: workers, calls in the pool (running or queued),
+            calls waiting for a free worker, peak of calls in the pool,
+            submitted and completed calls
+        """
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.workers),
+            "peak_pending": self.peak_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+        }
+
+    def _done(self, future: Future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""Presence write-behind buffer
+
+This module define an opt-in ingestion mode for the check-ins: validated
+presences are appended to a local journal (fsynced before the scanner gets
+its confirmation) and flushed to the presencas table in bulk, every few
+milliseconds or every N rows. The journal is replayed on start so a crash
+doesn't lose confirmed presences.
+
+When a bulk insert fails the rows are inserted one by one. The rows that can
+never be inserted, like a presence of a removed class, are moved to the
+dead letter file, PRESENCE_BUFFER_JOURNAL.failed, the others are kept for the
+next flush.
+
+Enable it with PRESENCE_BUFFER=1. Each api process needs its own journal,
+set PRESENCE_BUFFER_JOURNAL to a different path per worker.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from database import SessionLocal
+from db.aulas import Presencas
+from dotenv import load_dotenv
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("PRESENCE_BUFFER", "0") == "1"
+JOURNAL = os.getenv("PRESENCE_BUFFER_JOURNAL", "presencas.journal")
+FLUSH_MS = int(os.getenv("PRESENCE_BUFFER_FLUSH_MS", "50"))
+MAX_ROWS = int(os.getenv("PRESENCE_BUFFER_MAX_ROWS", "500"))
+
+
+class PresenceBuffer:
+    """Journaled write-behind buffer of presences
+
+    Args:
+        path (str): journal file path
+        flush_ms (int): max milliseconds between flushes
+        max_rows (int): pending rows that trigger an immediate flush
+    """
+
+    def __init__(self, path: str, /, *, flush_ms: int = 50, max_rows: int = 500):
+        self.path = path
+        self.flush_interval = flush_ms / 1000
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._pending: List[Dict] = []
+        self._pending_keys: Set[Tuple[int, int]] = set()
+        self._segments: List[str] = []
+        self._journal = None
+        self._lock_file = None
+        self._thread: Optional[threading.Thread] = None
+        self.failed = 0
+
+    def start(self):
+        """Lock the journal, replay what was left by a previous run and start
+        the flusher thread"""
+        self._lock_file = open(f"{self.path}.lock", "w")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        for segment in sorted(glob.glob(f"{self.path}.*.flushing")) + [self.path]:
+            if os.path.exists(segment):
+                self._replay(segment)
+        self._journal = open(self.path, "a")
+        if self._pending:
+            self._segments.append(self._rotate())
+            logger.info("replaying %d journaled presences", len(self._pending))
+
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="presence-buffer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and flush the pending presences"""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+        if self._journal:
+            self._journal.close()
+        if self._lock_file:
+            self._lock_file.close()
+
+    def append(
+        self, /, *, class_id: int, student_id: int, confirmacao: datetime
+    ) -> bool:
+        """Journal a presence to be inserted
+
+        Args:
+            class_id (int): class id
+            student_id (int): student id
+            confirmacao (datetime): confirmation timestamp
+
+        Returns:
+            bool: False if the presence is already waiting to be inserted
+        """
+        key = (class_id, student_id)
+        row = {"id_aula": class_id, "id_aluno": student_id, "confirmacao": confirmacao}
+        with self._lock:
+            if key in self._pending_keys:
+                return False
+            self._journal.write(_line(row))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._pending.append(row)
+            self._pending_keys.add(key)
+            if len(self._pending) >= self.max_rows:
+                self._wakeup.set()
+        return True
+
+    def is_pending(self, /, *, class_id: int, student_id: int) -> bool:
+        """Check if a presence is journaled but not yet inserted"""
+        with self._lock:
+            return (class_id, student_id) in self._pending_keys
+
+    def pending_students(self, class_id: int, /) -> List[int]:
+        """Ids of the students of a class journaled but not yet inserted"""
+        with self._lock:
+            return [student for aula, student in self._pending_keys if aula == class_id]
+
+    def stats(self) -> Dict[str, int]:
+        """Buffer counters
+
+        Returns:
+            Dict[str, int]: presences waiting to be inserted and presences
+            moved to the dead letter file since the start
+        """
+        with self._lock:
+            return {"pending": len(self._pending_keys), "failed": self.failed}
+
+    def flush(self) -> int:
+        """Insert the pending presences with a single multi-row insert, one by
+        one if it fails
+
+        Returns:
+            int: number of flushed presences
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            rows, self._pending = self._pending, []
+            segments, self._segments = self._segments + [self._rotate()], []
+
+        db = SessionLocal()
+        try:
+            _insert(db, rows)
+            done, failed, left = rows, [], []
+        except Exception:
+            db.rollback()
+            logger.exception(
+                "error flushing %d presences, inserting one by one", len(rows)
+            )
+            done, failed, left = _insert_each(db, rows)
+        finally:
+            db.close()
+
+        if left and not done and not failed:
+            with self._lock:
+                self._pending = rows + self._pending
+                self._segments = segments + self._segments
+            return 0
+
+        if failed:
+            self._dead_letter(failed)
+        if left:
+            # the rows left are journaled again, without the ones handled
+            segment = self._write_segment(left)
+        for segment_done in segments:
+            os.remove(segment_done)
+        with self._lock:
+            self._pending_keys.difference_update(
+                (row["id_aula"], row["id_aluno"])
+                for row in [*done, *(row for row, _ in failed)]
+            )
+            if left:
+                self._pending = left + self._pending
+                self._segments = [segment] + self._segments
+        return len(done)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _rotate(self) -> str:
+        """Move the active journal to a segment that is removed once flushed,
+        must be called with the lock held"""
+        segment = f"{self.path}.{time.time_ns()}.flushing"
+        self._journal.close()
+        os.rename(self.path, segment)
+        self._journal = open(self.path, "a")
+        return segment
+
+    def _write_segment(self, rows: List[Dict]) -> str:
+        """Journal rows in a segment of their own"""
+        segment = f"{self.path}.{time.time_ns()}.flushing"
+        with open(segment, "w") as journal:
+            journal.writelines(_line(row) for row in rows)
+            journal.flush()
+            os.fsync(journal.fileno())
+        return segment
+
+    def _dead_letter(self, failed: List[Tuple[Dict, str]]):
+        """Move the rows that can never be inserted to the dead letter file"""
+        with open(f"{self.path}.failed", "a") as dead_letter:
+            for row, error in failed:
+                dead_letter.write(_line({**row, "error": error}))
+            dead_letter.flush()
+            os.fsync(dead_letter.fileno())
+        with self._lock:
+            self.failed += len(failed)
+        logger.error(
+            "%d presences cannot be inserted, moved to %s.failed",
+            len(failed),
+            self.path,
+        )
+
+    def _replay(self, segment: str):
+        with open(segment) as journal:
+            for line in journal:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue  # torn write of the last line
+                key = (row["id_aula"], row["id_aluno"])
+                if key in self._pending_keys:
+                    continue
+                row["confirmacao"] = datetime.fromisoformat(row["confirmacao"])
+                self._pending.append(row)
+                self._pending_keys.add(key)
+        if segment != self.path:
+            self._segments.append(segment)
+
+
+def _line(row: Dict, /) -> str:
+    return json.dumps({**row, "confirmacao": row["confirmacao"].isoformat()}) + "\n"
+
+
+def _insert(db: Session, rows: List[Dict], /):
+    db.execute(insert(Presencas).values(rows).on_conflict_do_nothing())
+    db.commit()
+
+
+def _insert_each(
+    db: Session, rows: List[Dict], /
+) -> Tuple[List[Dict], List[Tuple[Dict, str]], List[Dict]]:
+    """Insert rows one by one, after a failed bulk insert
+
+    Args:
+        db (Session): database session
+        rows (List[Dict]): presences
+
+    Returns:
+        Tuple[List[Dict], List[Tuple[Dict, str]], List[Dict]]: inserted rows,
+        rows that can never be inserted with their error and rows left for
+        the next flush, after an error that is not from the row
+    """
+    done, failed = [], []
+    for i, row in enumerate(rows):
+        try:
+            _insert(db, [row])
+        except (IntegrityError, DataError) as e:
+            db.rollback()
+            failed.append((row, repr(e)))
+        except Exception:
+            db.rollback()
+            logger.exception("error flushing presences, will retry")
+            return done, failed, rows[i:]
+        else:
+            done.append(row)
+    return done, failed, []
+
+
+buffer: Optional[PresenceBuffer] = (
+    PresenceBuffer(JOURNAL, flush_ms=FLUSH_MS, max_rows=MAX_ROWS) if ENABLED else None
+)
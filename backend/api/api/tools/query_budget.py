@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""Query budgets
+
+This module records the statements issued while handling each request,
+through the engine events, and checks them against the query budget of the
+route. Statements are fingerprinted, without parameters, literals or list
+lengths, so a shape repeated more than QUERY_REPEAT_LIMIT times, the mark of
+a lazy relationship loaded row by row, is reported too.
+
+QUERY_BUDGET sets what to do with a request over its budget: off (default),
+log a warning, as in staging, or raise QueryBudgetExceeded, as in the tests.
+QUERY_DEBUG=1 sends the number of statements in the X-Query-Count header.
+Routes set their budget with dependencies=[Depends(query_budget.limit(n))],
+the others use QUERY_BUDGET_DEFAULT.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import logging
+import os
+import re
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+OFF = "off"
+LOG = "log"
+RAISE = "raise"
+
+MODE = os.getenv("QUERY_BUDGET", OFF)
+DEBUG = os.getenv("QUERY_DEBUG", "0") == "1"
+DEFAULT_BUDGET = int(os.getenv("QUERY_BUDGET_DEFAULT", "30"))
+REPEAT_LIMIT = int(os.getenv("QUERY_REPEAT_LIMIT", "5"))
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+_PARAMETERS = re.compile(r"%\(\w+\)s|%s|\b\d+(?:\.\d+)?\b|'(?:[^']|'')*'")
+_LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+_SPACES = re.compile(r"\s+")
+
+_current: ContextVar[Optional["QueryRecorder"]] = ContextVar(
+    "query_recorder", default=None
+)
+
+
+class QueryBudgetExceeded(Exception):
+    """Request over its query budget or repeating a statement shape"""
+
+
+def fingerprint(statement: str, /) -> str:
+    """Shape of a statement, without parameters, literals or list lengths"""
+    shape = _PARAMETERS.sub("?", statement)
+    shape = _LISTS.sub("?", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+
+class QueryRecorder:
+    """Statements issued while handling a request
+
+    Args:
+        budget (int): max statements of the request
+    """
+
+    def __init__(self, *, budget: int = DEFAULT_BUDGET):
+        self.budget = budget
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self) -> Dict[str, int]:
+        """Statement shapes issued more than REPEAT_LIMIT times"""
+        shapes = Counter(fingerprint(statement) for statement in self.statements)
+        return {shape: n for shape, n in shapes.items() if n > REPEAT_LIMIT}
+
+    def violations(self) -> List[str]:
+        """Problems of the recorded statements, empty if within budget"""
+        problems = []
+        if self.count > self.budget:
+            problems.append(f"{self.count} queries over a budget of {self.budget}")
+        for shape, n in self.repeated().items():
+            problems.append(f"{n} queries with the same shape: {shape}")
+        return problems
+
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.statements.append(statement)
+
+
+def install(engine: Engine, /):
+    """Record the statements of an engine in the request issuing them
+
+    Args:
+        engine (Engine): database engine
+    """
+    event.listen(engine, "before_cursor_execute", _record)
+
+
+def limit(budget: int, /) -> Callable:
+    """Route dependency setting the query budget of the route
+
+    Args:
+        budget (int): max statements of a request
+
+    Returns:
+        Callable: dependency
+    """
+
+    async def set_budget():
+        recorder = _current.get()
+        if recorder is not None:
+            recorder.budget = budget
+
+    return set_budget
+
+
+def _route(scope: Scope) -> str:
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return f"{scope['method']} {scope['path']}"
+    return (
+        f"{scope['method']} {scope['path']} ({endpoint.__module__}.{endpoint.__name__})"
+    )
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware checking the statements of each request against the
+    budget of its route, following QUERY_BUDGET and QUERY_DEBUG
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or (MODE == OFF and not DEBUG):
+            await self.app(scope, receive, send)
+            return
+
+        recorder = QueryRecorder()
+        debug = DEBUG
+
+        async def send_count(message: Message):
+            if debug and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append(QUERY_COUNT_HEADER, str(recorder.count))
+            await send(message)
+
+        token = _current.set(recorder)
+        try:
+            await self.app(scope, receive, send_count)
+        finally:
+            _current.reset(token)
+
+        problems = recorder.violations()
+        if not problems or MODE == OFF:
+            return
+        if MODE == RAISE:
+            raise QueryBudgetExceeded(f"{_route(scope)}: {'; '.join(problems)}")
+        for problem in problems:
+            logger.warning("%s: %s", _route(scope), problem)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Daily jobs
+
+This module define a background thread running a job once a day at a given
+time of the day, like the nightly build of the timetables.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import logging
+import threading
+from datetime import datetime, time, timedelta
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DailyJob:
+    """Job run every day at a given time
+
+    Args:
+        at (time): time of the day to run the job
+        job (Callable[[], Any]): job
+        name (str): thread name
+    """
+
+    def __init__(self, at: time, job: Callable[[], Any], /, *, name: str = "daily"):
+        self.at = at
+        self.job = job
+        self.name = name
+        self.runs = 0
+        self.last_run: Optional[datetime] = None
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def next_run(self, now: datetime, /) -> datetime:
+        """Next time the job runs after now"""
+        run = datetime.combine(now.date(), self.at)
+        return run if run > now else run + timedelta(days=1)
+
+    def start(self):
+        """Start the job thread"""
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the job thread, waiting for a running job to end"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join()
+
+    def run(self):
+        """Run the job now"""
+        try:
+            self.job()
+        except Exception:
+            logger.exception("daily job %s failed", self.name)
+        self.runs += 1
+        self.last_run = datetime.now()
+
+    def _run(self):
+        while True:
+            target = self.next_run(datetime.now())
+            while (now := datetime.now()) < target:
+                if self._stopping.wait((target - now).total_seconds()):
+                    return
+            self.run()
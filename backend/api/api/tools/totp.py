@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Check-in token tools
+
+This module define the rotating check-in tokens, a cheaper alternative to
+the signed QRCodes for the UCs in the "totp" attendance mode. Each student
+gets a secret per class, derived from the api secret so nothing has to be
+stored, and the device shows a short token that changes every step
+(RFC 6238 with HMAC-SHA256).
+
+Scans queued offline by the teacher carry the time they were captured, the
+token is checked at that time as long as it is at most CHECKIN_TOKEN_MAX_AGE
+seconds old.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import hashlib
+import hmac
+import os
+import struct
+import time
+from datetime import datetime
+from typing import Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SECRET = os.getenv("CHECKIN_SECRET") or os.getenv("SECRET_KEY") or ""
+STEP = int(os.getenv("CHECKIN_TOKEN_STEP", "30"))
+DIGITS = int(os.getenv("CHECKIN_TOKEN_DIGITS", "8"))
+# steps of clock drift accepted on each side
+WINDOW = 1
+# seconds a queued scan can wait to be sent
+MAX_AGE = int(os.getenv("CHECKIN_TOKEN_MAX_AGE", "14400"))
+
+
+def class_secret(class_id: int, student_id: int, /) -> bytes:
+    """Derive the secret of a student for a class
+
+    Args:
+        class_id (int): class id
+        student_id (int): student id
+
+    Returns:
+        bytes: 32 bytes secret
+    """
+    return hmac.new(
+        bytes(SECRET, "utf-8"),
+        bytes(f"checkin:{class_id}:{student_id}", "utf-8"),
+        hashlib.sha256,
+    ).digest()
+
+
+def _hotp(secret: bytes, counter: int, /) -> str:
+    digest = hmac.new(secret, struct.pack(">Q", counter), hashlib.sha256).digest()
+    offset = digest[-1] & 0x0F
+    code = struct.unpack(">I", digest[offset : offset + 4])[0] & 0x7FFFFFFF
+    return str(code % 10 ** DIGITS).zfill(DIGITS)
+
+
+def token(secret: bytes, /, *, at: Optional[float] = None) -> str:
+    """Token of a secret at a given time
+
+    Args:
+        secret (bytes): student class secret
+        at (float, optional): unix time. Defaults to now.
+
+    Returns:
+        str: token
+    """
+    return _hotp(secret, int((time.time() if at is None else at) // STEP))
+
+
+def scan_time(scanned_at: Optional[datetime], /) -> Optional[float]:
+    """Time to check the token of a scan at, the capture time of a queued scan
+
+    Args:
+        scanned_at (Optional[datetime]): capture time. Defaults to now.
+
+    Returns:
+        Optional[float]: unix time, None if the capture time is in the future
+        or older than MAX_AGE
+    """
+    now = time.time()
+    if scanned_at is None:
+        return now
+    at = scanned_at.timestamp()
+    if now - MAX_AGE <= at <= now + STEP * WINDOW:
+        return at
+    return None
+
+
+def verify(secret: bytes, candidate: str, /, *, at: Optional[float] = None) -> bool:
+    """Check a token against the current step and the steps next to it
+
+    Every step of the window is compared in constant time.
+
+    Args:
+        secret (bytes): student class secret
+        candidate (str): token shown by the student
+        at (float, optional): unix time. Defaults to now.
+
+    Returns:
+        bool: token is valid
+    """
+    counter = int((time.time() if at is None else at) // STEP)
+    valid = False
+    for step in range(counter - WINDOW, counter + WINDOW + 1):
+        valid |= hmac.compare_digest(_hotp(secret, step), candidate)
+    return valid
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Benchmark seed helpers
+
+This module seeds a class with a teacher and enrolled students inside an
+open transaction, so the benchmarks can roll everything back when done, or
+remove it after commiting it for an api running in another process.
+Run the benchmarks with the api folder in the PYTHONPATH, like the api itself.
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List
+
+from db.alunos import Alunos
+from db.aulas import Aulas, Presencas
+from db.docentes import Docentes
+from db.ucs import UC, Cursos, InscricoesUC, Periodos, UCDocentes
+from db.user import User
+from sqlalchemy.orm import Session
+from tools import crypt
+
+PASSWORD = "benchmark"
+
+
+@dataclass
+class SeededClass:
+    id_aula: int
+    id_uc: int
+    id_docente: int
+    teacher_user_id: int
+    students: Dict[int, int] = field(default_factory=dict)  # id_aluno: user id
+    private_keys: Dict[int, str] = field(default_factory=dict)  # id_aluno: kr
+
+    @property
+    def student_ids(self) -> List[int]:
+        return list(self.students)
+
+
+def _new_user(db: Session, tag: str) -> User:
+    public_key, private_key = crypt.generate_key_pair(PASSWORD)
+    user = User(
+        nome_utilizador=f"bench-{tag}",
+        email=f"bench-{tag}@sirpa.test",
+        password=crypt.bcrypt(PASSWORD),
+        private_key=private_key,
+        public_key=public_key,
+    )
+    db.add(user)
+    db.flush()
+    return user
+
+
+def seed_class(db: Session, /, *, students: int = 10) -> SeededClass:
+    """Seed a class happening now with enrolled students
+
+    Nothing is commited, call db.rollback() to clean up.
+
+    Args:
+        db (Session): database session
+        students (int, optional): number of enrolled students. Defaults to 10.
+
+    Returns:
+        SeededClass: ids of the seeded rows
+    """
+    run = uuid.uuid4().hex[:8]
+    nr = int(run, 16) % 1_000_000 * 1000
+
+    course = Cursos(nome_curso=f"bench-{run}", descricao_curso="benchmark")
+    db.add(course)
+    db.flush()
+    uc = UC(id_curso=course.id_curso, nome_uc=f"bench-{run}", descricao="benchmark")
+    db.add(uc)
+    db.flush()
+
+    teacher_user = _new_user(db, f"{run}-t")
+    teacher = Docentes(
+        id_utilizador=teacher_user.id_utilizador, nome="bench", nr_docente=nr
+    )
+    db.add(teacher)
+    db.flush()
+    db.add(UCDocentes(id_uc=uc.id_uc, id_docente=teacher.id_docente))
+
+    now = datetime.now()
+    start = (now - timedelta(minutes=5)).time()
+    end = min(now + timedelta(hours=2), datetime.combine(now.date(), time.max)).time()
+    schedule = Periodos(
+        id_uc=uc.id_uc, dia_semana=now.isoweekday(), hora_inicio=start, hora_fim=end
+    )
+    db.add(schedule)
+    db.flush()
+    aula = Aulas(
+        id_uc=uc.id_uc,
+        id_docente=teacher.id_docente,
+        id_periodo=schedule.id_periodo,
+        data=date.today(),
+        resumo="benchmark",
+        sumario="benchmark",
+        sala="0.0",
+    )
+    db.add(aula)
+    db.flush()
+
+    seeded = SeededClass(
+        id_aula=aula.id_aula,
+        id_uc=uc.id_uc,
+        id_docente=teacher.id_docente,
+        teacher_user_id=teacher_user.id_utilizador,
+    )
+    for i in range(students):
+        user = _new_user(db, f"{run}-s{i}")
+        student = Alunos(
+            id_utilizador=user.id_utilizador, nome="bench", nr_aluno=nr + i
+        )
+        db.add(student)
+        db.flush()
+        db.add(
+            InscricoesUC(
+                id_aluno=student.id_aluno, id_uc=uc.id_uc, data_inscricao=date.today()
+            )
+        )
+        seeded.students[student.id_aluno] = user.id_utilizador
+        seeded.private_keys[student.id_aluno] = user.private_key
+    db.flush()
+    return seeded
+
+
+def remove_seeded(db: Session, seeded: SeededClass, /):
+    """Delete a commited seeded class, with its presences and users
+
+    Args:
+        db (Session): database session
+        seeded (SeededClass): seeded class
+    """
+    students = seeded.student_ids
+    users = [seeded.teacher_user_id, *seeded.students.values()]
+    id_curso = db.query(UC.id_curso).filter(UC.id_uc == seeded.id_uc).scalar()
+    for query in (
+        db.query(Presencas).filter(Presencas.id_aula == seeded.id_aula),
+        db.query(Aulas).filter(Aulas.id_aula == seeded.id_aula),
+        db.query(Periodos).filter(Periodos.id_uc == seeded.id_uc),
+        db.query(InscricoesUC).filter(InscricoesUC.id_uc == seeded.id_uc),
+        db.query(UCDocentes).filter(UCDocentes.id_uc == seeded.id_uc),
+        db.query(Alunos).filter(Alunos.id_aluno.in_(students)),
+        db.query(Docentes).filter(Docentes.id_docente == seeded.id_docente),
+        db.query(User).filter(User.id_utilizador.in_(users)),
+        db.query(UC).filter(UC.id_uc == seeded.id_uc),
+        db.query(Cursos).filter(Cursos.id_curso == id_curso),
+    ):
+        query.delete(synchronize_session=False)
+    db.commit()
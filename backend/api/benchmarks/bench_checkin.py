@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Check-in latency benchmark
+
+Compares the per scan latency of the former check-in path (one query per
+validation step plus an ORM insert) with the single round trip path used
+by read_QRCode. The commit is left out of the measure, both paths do one.
+
+Usage:
+    PYTHONPATH=api python benchmarks/bench_checkin.py [--scans 500]
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime
+
+from _seed import PASSWORD, seed_class
+from database import SessionLocal
+from db.aulas import Aulas, Presencas
+from models import user
+from models.classes import _checkin_context, _insert_presence
+from models.student import get_student_user_id
+from models.teacher import get_teacher_nr_by_user_id
+from models.uc import check_if_student_in_uc
+from sqlalchemy import and_
+from tools import crypt
+
+
+def legacy_scan(db, *, class_id, student_id, user_id, msg, signature):
+    db.query(Presencas).filter(
+        and_(Presencas.id_aluno == student_id, Presencas.id_aula == class_id)
+    ).first()
+    student_user_id = get_student_user_id(db, student_id=student_id)
+    class_data = db.query(Aulas).get(class_id)
+    assert get_teacher_nr_by_user_id(db, user_id=user_id) == class_data.id_docente
+    assert check_if_student_in_uc(db, student_id=student_id, uc_id=class_data.id_uc)
+    ku = crypt.load_pub_key(user.get_ku(db, student_user_id))
+    assert "data" in crypt.verify(ku, msg, signature)
+    presenca = Presencas(
+        id_aluno=student_id, id_aula=class_id, confirmacao=datetime.utcnow()
+    )
+    db.add(presenca)
+    db.flush()
+    db.refresh(presenca)
+
+
+def single_round_trip_scan(db, *, class_id, student_id, user_id, msg, signature):
+    context = _checkin_context(
+        db, class_id=class_id, student_id=student_id, user_id=user_id
+    )
+    assert context.id_docente_leitor and context.public_key
+    ku = crypt.load_pub_key(context.public_key)
+    assert "data" in crypt.verify(ku, msg, signature)
+    assert _insert_presence(db, class_id=class_id, student_id=student_id)
+
+
+def run(db, scan, scans, seeded, payloads):
+    timings = []
+    students = seeded.student_ids
+    for i in range(scans):
+        student_id = students[i % len(students)]
+        msg, signature = payloads[student_id]
+        savepoint = db.begin_nested()
+        start = time.perf_counter()
+        scan(
+            db,
+            class_id=seeded.id_aula,
+            student_id=student_id,
+            user_id=seeded.teacher_user_id,
+            msg=msg,
+            signature=signature,
+        )
+        timings.append(time.perf_counter() - start)
+        savepoint.rollback()
+        db.expunge_all()
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    print(
+        f"{name:>18}: mean {statistics.mean(timings) * 1000:.3f} ms, "
+        f"p50 {timings[len(timings) // 2] * 1000:.3f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95)] * 1000:.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scans", type=int, default=500)
+    parser.add_argument("--students", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        seeded = seed_class(db, students=args.students)
+        payloads = {}
+        for student_id, kr in seeded.private_keys.items():
+            msg = bytes(
+                json.dumps({"id_aluno": student_id, "id_aula": seeded.id_aula}), "utf-8"
+            )
+            signature = crypt.sign(crypt.load_priv_key(kr, PASSWORD), msg)
+            payloads[student_id] = (msg, signature)
+        db.expunge_all()
+
+        print(f"{args.scans} scans, {args.students} students")
+        report("legacy", run(db, legacy_scan, args.scans, seeded, payloads))
+        report(
+            "single round trip",
+            run(db, single_round_trip_scan, args.scans, seeded, payloads),
+        )
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
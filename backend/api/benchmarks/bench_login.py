@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Login throughput benchmark
+
+Runs a burst of concurrent logins (the 08:00 rush) against the async login
+endpoint, once per bcrypt pool size, and reports logins per second. The
+throughput should grow with the pool size up to the number of cores.
+
+Usage:
+    PYTHONPATH=api python benchmarks/bench_login.py [--logins 64] [--workers 1 2 4]
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+
+from _seed import PASSWORD, _new_user
+from database import SessionLocal
+from fastapi import Response
+from fastapi.security import OAuth2PasswordRequestForm
+from routers.auth import login
+from tools import crypt
+from tools.pool import ProcessPool
+
+
+async def burst(email, logins):
+    form = OAuth2PasswordRequestForm(username=email, password=PASSWORD, scope="")
+
+    async def one():
+        db = SessionLocal()
+        try:
+            return await login(Response(), form, db)
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    assert all("access_token" in result for result in results)
+    return elapsed
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, cores}),
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    user = _new_user(db, uuid.uuid4().hex[:8])
+    db.commit()
+
+    print(f"{args.logins} concurrent logins, {cores} cores")
+    try:
+        for workers in args.workers:
+            crypt.bcrypt_pool = ProcessPool(workers)
+            crypt.bcrypt_pool.call(crypt._hash, PASSWORD)  # start the workers
+            elapsed = asyncio.run(burst(user.email, args.logins))
+            stats = crypt.bcrypt_pool.stats()
+            crypt.bcrypt_pool.shutdown()
+            print(
+                f"{workers:>3} workers: {args.logins / elapsed:7.1f} logins/s, "
+                f"peak queue {stats['peak_pending']}"
+            )
+    finally:
+        db.delete(user)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Signature micro-benchmark
+
+Compares RSA-2048 PSS and Ed25519 sign/verify throughput on the check-in
+message, and the size of the resulting QRCode payload.
+
+Usage:
+    PYTHONPATH=api python benchmarks/bench_signatures.py [--rounds 1000]
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import argparse
+import base64
+import json
+import time
+
+from tools import crypt
+
+
+def throughput(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=1000)
+    args = parser.parse_args()
+
+    msg = {"id_aluno": 12345, "id_aula": 67890}
+    data = bytes(json.dumps(msg), "utf-8")
+    print(f"{args.rounds} rounds")
+    for key_type in ("rsa", "ed25519"):
+        public_key, private_key = crypt.generate_key_pair("bench", key_type=key_type)
+        kr = crypt.load_priv_key(private_key, "bench")
+        ku = crypt.load_pub_key(public_key)
+        signature = crypt.sign(kr, data)
+        assert "data" in crypt.verify(ku, data, signature)
+
+        payload = json.dumps(
+            {"signature": base64.encodebytes(signature).decode("utf-8"), "msg": msg}
+        )
+        signs = throughput(lambda: crypt.sign(kr, data), args.rounds)
+        verifies = throughput(lambda: crypt.verify(ku, data, signature), args.rounds)
+        print(
+            f"{key_type:>8}: sign {signs:8.0f}/s, verify {verifies:8.0f}/s, "
+            f"signature {len(signature)} bytes, payload {len(payload)} chars"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+# -*- coding: utf-8 -*-
+"""Check-in storm load test
+
+Seeds classes with enrolled students holding real key pairs, then drives
+the api concurrently the way a classroom does when a class starts: every
+student logs in and asks for its signed QRCode while the teacher of each
+class posts the scans to /class/checkin as they arrive. Throughput and
+latency percentiles per endpoint are written to a JSON report, pass the
+report of a previous version with --baseline to compare them.
+
+Access tokens are only valid 5 s after the login, so all the logins run
+first and the QRCodes and check-ins once the tokens are valid.
+
+The load targets a running api, --in-process drives the ASGI app directly
+(no network, same process) when there is no server at hand. The seeded
+rows are commited for the api to see them and deleted at the end.
+
+Usage:
+    PYTHONPATH=api python benchmarks/bench_storm.py [--url URL]
+        [--classes 1] [--students 50] [--concurrency 50] [--scanners 1]
+        [--out storm.json] [--baseline previous.json] [--in-process]
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import subprocess
+import time
+import urllib.parse
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from _seed import PASSWORD, SeededClass, remove_seeded, seed_class
+from database import SessionLocal
+from db.user import User
+
+NBF = 5.1  # seconds until a new access token is valid
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    status: int
+    start: float
+    end: float
+
+
+class HTTPTransport:
+    """Keep-alive HTTP/1.1 connections to a running api"""
+
+    def __init__(self, url: str):
+        parts = urllib.parse.urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def request(
+        self, method: str, path: str, *, body: bytes, headers: Dict[str, str]
+    ) -> Tuple[int, bytes]:
+        reused = bool(self._idle)
+        conn = self._idle.pop() if reused else await self._connect()
+        try:
+            status, data, keep = await self._roundtrip(
+                conn, method, path, body, headers
+            )
+        except (OSError, asyncio.IncompleteReadError):
+            conn[1].close()
+            if not reused:
+                raise
+            # the server closed the idle connection, retry on a new one
+            conn = await self._connect()
+            status, data, keep = await self._roundtrip(
+                conn, method, path, body, headers
+            )
+        if keep:
+            self._idle.append(conn)
+        else:
+            conn[1].close()
+        return status, data
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop()[1].close()
+
+    async def _connect(self):
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def _roundtrip(self, conn, method, path, body, headers):
+        reader, writer = conn
+        head = [
+            f"{method} {self.prefix}{path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            f"Content-Length: {len(body)}",
+            *(f"{name}: {value}" for name, value in headers.items()),
+        ]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status = int((await reader.readuntil(b"\r\n")).split()[1])
+        response_headers = {}
+        while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            data = b""
+            while size := int((await reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                data += (await reader.readexactly(size + 2))[:size]
+            await reader.readuntil(b"\r\n")
+        else:
+            data = await reader.readexactly(
+                int(response_headers.get("content-length", 0))
+            )
+        return status, data, response_headers.get("connection") != "close"
+
+
+class ASGITransport:
+    """Requests handed directly to the api ASGI app"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(
+        self, method: str, path: str, *, body: bytes, headers: Dict[str, str]
+    ) -> Tuple[int, bytes]:
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+            "client": ("storm", 0),
+            "server": ("storm", 80),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        response = {"status": 0, "body": []}
+
+        async def receive():
+            return messages.pop() if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return response["status"], b"".join(response["body"])
+
+    async def close(self):
+        pass
+
+
+class Storm:
+    """Concurrency limited api client recording a sample per request"""
+
+    def __init__(self, transport, concurrency: int):
+        self.transport = transport
+        self.samples: List[Sample] = []
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def call(
+        self,
+        method: str,
+        path: str,
+        *,
+        json_body: Any = None,
+        form: Optional[Dict[str, str]] = None,
+        token: Optional[str] = None,
+        endpoint: Optional[str] = None,
+    ) -> Tuple[int, Any]:
+        headers = {"Accept": "application/json"}
+        body = b""
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif form is not None:
+            body = urllib.parse.urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        async with self._slots:
+            start = time.perf_counter()
+            try:
+                status, data = await self.transport.request(
+                    method, path, body=body, headers=headers
+                )
+            except (OSError, asyncio.IncompleteReadError):
+                status, data = 0, b""
+            self.samples.append(
+                Sample(endpoint or path, status, start, time.perf_counter())
+            )
+        try:
+            return status, json.loads(data)
+        except ValueError:
+            return status, None
+
+
+async def login(storm: Storm, email: str) -> Optional[str]:
+    status, data = await storm.call(
+        "POST", "/auth/login", form={"username": email, "password": PASSWORD}
+    )
+    return data["access_token"] if status == 200 else None
+
+
+async def checkin_class(
+    storm: Storm, seeded: SeededClass, tokens: Dict[int, str], scanners: int
+):
+    """Students ask for their QRCodes while the teacher scans them"""
+    scans: asyncio.Queue = asyncio.Queue()
+    teacher = tokens.get(seeded.teacher_user_id)
+
+    async def student(user_id):
+        status, qrcode = await storm.call(
+            "POST",
+            "/class/qrcode",
+            json_body={"id_aula": seeded.id_aula, "password": PASSWORD},
+            token=tokens.get(user_id),
+        )
+        if status == 200:
+            await scans.put(qrcode)
+
+    async def scanner():
+        while (qrcode := await scans.get()) is not None:
+            await storm.call("POST", "/class/checkin", json_body=qrcode, token=teacher)
+
+    workers = [asyncio.create_task(scanner()) for _ in range(scanners)]
+    await asyncio.gather(*(student(user_id) for user_id in seeded.students.values()))
+    for _ in workers:
+        await scans.put(None)
+    await asyncio.gather(*workers)
+
+
+async def drive(
+    transport,
+    classes: List[SeededClass],
+    emails: Dict[int, str],
+    *,
+    concurrency: int,
+    scanners: int,
+    app=None,
+) -> Tuple[Storm, Optional[Dict]]:
+    if app:
+        await app.router.startup()
+    storm = Storm(transport, concurrency)
+    try:
+        users = [
+            user_id
+            for seeded in classes
+            for user_id in (seeded.teacher_user_id, *seeded.students.values())
+        ]
+        tokens = await asyncio.gather(*(login(storm, emails[u]) for u in users))
+        tokens = dict(zip(users, tokens))
+        await asyncio.sleep(NBF)
+        await asyncio.gather(
+            *(checkin_class(storm, seeded, tokens, scanners) for seeded in classes)
+        )
+        status, metrics = await storm.call(
+            "GET",
+            "/tools/metrics",
+            token=tokens.get(classes[0].teacher_user_id),
+            endpoint="metrics",
+        )
+        storm.samples = [s for s in storm.samples if s.endpoint != "metrics"]
+        return storm, metrics if status == 200 else None
+    finally:
+        await transport.close()
+        if app:
+            await app.router.shutdown()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest rank percentile of sorted values"""
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+def summarize(samples: List[Sample]) -> Dict[str, Dict]:
+    endpoints = {}
+    for endpoint in sorted({sample.endpoint for sample in samples}):
+        group = [sample for sample in samples if sample.endpoint == endpoint]
+        latencies = sorted((sample.end - sample.start) * 1000 for sample in group)
+        window = max(s.end for s in group) - min(s.start for s in group)
+        endpoints[endpoint] = {
+            "requests": len(group),
+            "errors": sum(1 for sample in group if not 200 <= sample.status < 300),
+            "status": dict(Counter(str(sample.status) for sample in group)),
+            "throughput_rps": round(len(group) / window, 2) if window else None,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 3),
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "p99": round(percentile(latencies, 99), 3),
+                "max": round(latencies[-1], 3),
+            },
+        }
+    return endpoints
+
+
+def git_version() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: Dict, baseline: Optional[Dict]):
+    print(f"{report['version']} against {report['target']}")
+    print(
+        f"{'endpoint':>16}  {'reqs':>6}  {'errors':>6}  {'req/s':>8}  "
+        f"{'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}"
+    )
+    for endpoint, stats in report["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"{endpoint:>16}  {stats['requests']:6d}  {stats['errors']:6d}  "
+            f"{stats['throughput_rps'] or 0:8.1f}  {latency['p50']:8.2f}  "
+            f"{latency['p95']:8.2f}  {latency['p99']:8.2f}"
+        )
+        before = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if before and before["throughput_rps"]:
+            print(
+                f"{'vs ' + str(baseline['version']):>16}  {'':6}  {'':6}  "
+                f"{(stats['throughput_rps'] or 0) / before['throughput_rps'] - 1:+8.1%}  "
+                f"{latency['p50'] / before['latency_ms']['p50'] - 1:+8.1%}  "
+                f"{latency['p95'] / before['latency_ms']['p95'] - 1:+8.1%}  "
+                f"{latency['p99'] / before['latency_ms']['p99'] - 1:+8.1%}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true")
+    parser.add_argument("--classes", type=int, default=1)
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scanners", type=int, default=1)
+    parser.add_argument("--out", default="storm.json")
+    parser.add_argument("--baseline")
+    args = parser.parse_args()
+
+    app = None
+    if args.in_process:
+        from main import app
+
+    db = SessionLocal()
+    classes: List[SeededClass] = []
+    try:
+        for _ in range(args.classes):
+            classes.append(seed_class(db, students=args.students))
+            db.commit()
+        users = [
+            user_id
+            for seeded in classes
+            for user_id in (seeded.teacher_user_id, *seeded.students.values())
+        ]
+        emails = dict(
+            db.query(User.id_utilizador, User.email)
+            .filter(User.id_utilizador.in_(users))
+            .all()
+        )
+        db.commit()
+
+        started = datetime.now()
+        start = time.perf_counter()
+        storm, metrics = asyncio.run(
+            drive(
+                ASGITransport(app) if app else HTTPTransport(args.url),
+                classes,
+                emails,
+                concurrency=args.concurrency,
+                scanners=args.scanners,
+                app=app,
+            )
+        )
+        report = {
+            "version": git_version(),
+            "started": started.isoformat(timespec="seconds"),
+            "target": "in-process" if app else args.url,
+            "config": {
+                "classes": args.classes,
+                "students": args.students,
+                "concurrency": args.concurrency,
+                "scanners": args.scanners,
+            },
+            "duration_s": round(time.perf_counter() - start - NBF, 3),
+            "endpoints": summarize(storm.samples),
+            "metrics": metrics,
+        }
+    finally:
+        db.rollback()
+        for seeded in classes:
+            remove_seeded(db, seeded)
+        db.close()
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Check-in token benchmark
+
+Compares the cryptographic cost of a check-in with a signed QRCode (the
+private key decryption, crypt.sign and crypt.verify) and with a rotating
+token (secret derivation and totp.verify).
+
+Usage:
+    PYTHONPATH=api python benchmarks/bench_totp.py [--rounds 200]
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import argparse
+import json
+import time
+
+from tools import crypt, totp
+
+PASSWORD = "benchmark"
+
+
+def per_op(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    public_key, private_key = crypt.generate_key_pair(PASSWORD)
+    ku = crypt.load_pub_key(public_key)
+    data = bytes(json.dumps({"id_aluno": 1, "id_aula": 1}), "utf-8")
+    signature = crypt.sign(crypt.load_priv_key(private_key, PASSWORD), data)
+    secret = totp.class_secret(1, 1)
+    token = totp.token(secret)
+
+    rows = [
+        (
+            "rsa qrcode",
+            per_op(
+                lambda: crypt.sign(crypt.load_priv_key(private_key, PASSWORD), data),
+                max(1, args.rounds // 10),
+            ),
+            per_op(lambda: crypt.verify(ku, data, signature), args.rounds),
+        ),
+        (
+            "totp token",
+            per_op(lambda: totp.token(totp.class_secret(1, 1)), args.rounds),
+            per_op(lambda: totp.verify(totp.class_secret(1, 1), token), args.rounds),
+        ),
+    ]
+    print(f"{'':>10}  {'issue (us)':>12}  {'verify (us)':>12}")
+    for name, issue, verify in rows:
+        print(f"{name:>10}  {issue:12.1f}  {verify:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Check-in signature verification throughput benchmark
+
+Several teachers scanning at once, each sending batches of check-ins to the
+verifier. Reports verified check-ins per second verifying inline in the
+request threads and with 1, 2, 4 and 8 worker processes.
+
+Usage:
+    PYTHONPATH=api python benchmarks/bench_verify.py [--checkins 4000] [--batch 50]
+
+@Author: José Galinha
+@Email: j.b.galinha@gmail.com
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tools import crypt
+
+
+def make_jobs(checkins, students):
+    keys = [crypt.generate_private_key() for _ in range(students)]
+    jobs = []
+    for i in range(checkins):
+        kr = keys[i % students]
+        data = bytes(json.dumps({"id_aluno": i % students, "id_aula": 1}), "utf-8")
+        jobs.append((kr.public_key(), data, crypt.sign(kr, data)))
+    return jobs
+
+
+def run(verifier, jobs, batch, teachers):
+    batches = [jobs[i : i + batch] for i in range(0, len(jobs), batch)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(teachers) as executor:
+        results = executor.map(lambda jobs: verifier.submit(jobs).result(), batches)
+        assert all(ok for result in results for ok in result)
+    return len(jobs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checkins", type=int, default=4000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--teachers", type=int, default=8)
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.checkins, args.students)
+    print(
+        f"{args.checkins} check-ins in batches of {args.batch}, "
+        f"{args.teachers} teachers, {os.cpu_count()} cores"
+    )
+
+    inline = crypt.Verifier(1, inline_below=args.batch + 1)
+    print(f"   inline: {run(inline, jobs, args.batch, args.teachers):8.0f} /s")
+    for workers in args.workers:
+        verifier = crypt.Verifier(workers, inline_below=0)
+        verifier.submit(jobs[: workers * 2]).result()  # start the workers
+        rate = run(verifier, jobs, args.batch, args.teachers)
+        verifier.shutdown()
+        print(f"{workers:>2} workers: {rate:8.0f} /s")
+
+
+if __name__ == "__main__":
+    main()
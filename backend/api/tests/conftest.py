@@ -0,0 +1,43 @@
+import pytest
+from api.main import app
+from database import engine, get_db
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from tools import query_budget
+
+
+@pytest.fixture(autouse=True)
+def budgets(monkeypatch):
+    """Requests over their query budget fail the tests"""
+    monkeypatch.setattr(query_budget, "MODE", query_budget.RAISE)
+
+
+@pytest.fixture
+def db():
+    """Session in a transaction rolled back at the end, used by the api"""
+    try:
+        connection = engine.connect()
+    except OperationalError:
+        pytest.skip("database not available")
+    transaction = connection.begin()
+    session = Session(bind=connection)
+    app.dependency_overrides[get_db] = lambda: session
+    yield session
+    app.dependency_overrides.clear()
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def queries():
+    """Statements executed while the fixture is active"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
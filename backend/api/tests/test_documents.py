@@ -0,0 +1,143 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from api.main import app
+from db.alunos import Alunos
+from db.aulas import Aulas, Presencas
+from db.docentes import Docentes
+from db.ucs import UC, Cursos, InscricoesUC, Periodos, UCDocentes
+from fastapi import status
+from fastapi.testclient import TestClient
+from models import documents, pagination
+from oauth2 import get_active_user, get_current_user
+from sqlalchemy import func
+from tests.test_loading import _user
+
+client = TestClient(app)
+
+# text needing escapes, outside ascii and with control characters
+TEXT = 'Ação "rápida" \\ 1/2\n\tfim ✓'
+
+
+def _seed(db):
+    """A teacher with two ucs, one without classes today, and two students
+    present at the classes of the day, confirmed with and without microseconds
+    """
+    run = uuid.uuid4().hex[:8]
+    nr = int(run, 16) % 1_000_000 * 1000
+    course = Cursos(nome_curso=f"test-{run} {TEXT}", descricao_curso=TEXT)
+    db.add(course)
+    db.flush()
+    teacher_user = _user(db, f"{run}-t")
+    teacher = Docentes(id_utilizador=teacher_user, nome=TEXT, nr_docente=nr)
+    students = [
+        Alunos(id_utilizador=_user(db, f"{run}-s{i}"), nome=TEXT, nr_aluno=nr + i)
+        for i in range(2)
+    ]
+    ucs = [
+        UC(id_curso=course.id_curso, nome_uc=f"test-{run}-{i}", descricao=TEXT)
+        for i in range(2)
+    ]
+    db.add_all([teacher, *students, *ucs])
+    db.flush()
+    # the schedule created last starts first
+    schedules = [
+        Periodos(
+            id_uc=ucs[0].id_uc,
+            dia_semana=1,
+            hora_inicio=time(14, 30),
+            hora_fim=time(16),
+        ),
+        Periodos(
+            id_uc=ucs[0].id_uc,
+            dia_semana=1,
+            hora_inicio=time(9, 0, 0, 500),
+            hora_fim=time(11),
+        ),
+        Periodos(
+            id_uc=ucs[1].id_uc, dia_semana=2, hora_inicio=time(9), hora_fim=time(11)
+        ),
+    ]
+    db.add_all(schedules)
+    db.flush()
+    aulas = [
+        Aulas(
+            id_uc=schedule.id_uc,
+            id_docente=teacher.id_docente,
+            id_periodo=schedule.id_periodo,
+            data=day,
+            resumo=TEXT,
+            sumario=TEXT,
+            sala="0.0",
+        )
+        for schedule, day in (
+            (schedules[0], date.today()),
+            (schedules[1], date.today()),
+            (schedules[1], date.today()),
+            (schedules[2], date.today() - timedelta(days=1)),
+        )
+    ]
+    db.add_all(aulas)
+    db.add_all(UCDocentes(id_uc=uc.id_uc, id_docente=teacher.id_docente) for uc in ucs)
+    db.add_all(
+        InscricoesUC(
+            id_aluno=student.id_aluno, id_uc=uc.id_uc, data_inscricao=date.today()
+        )
+        for student in reversed(students)
+        for uc in ucs
+    )
+    db.flush()
+    db.add_all(
+        Presencas(
+            id_aula=aula.id_aula,
+            id_aluno=student.id_aluno,
+            confirmacao=datetime(2026, 1, 2, 3, 4, 5, 120000 * i),
+        )
+        for aula in aulas[:2]
+        for i, student in enumerate(students)
+    )
+    db.flush()
+    db.expunge_all()
+    return teacher_user, students[-1].id_utilizador, ucs[0].id_uc
+
+
+def _get(monkeypatch, path, user_id=None, params=None):
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[get_active_user] = lambda: user_id
+    responses = []
+    for enabled in (False, True):
+        monkeypatch.setattr(documents, "ENABLED", enabled)
+        responses.append(client.get(path, params=params))
+    return responses
+
+
+@pytest.mark.parametrize("path", ["/uc/{uc}", "/teacher/today", "/student/today"])
+def test_documents_match_response_models(db, monkeypatch, path):
+    teacher, student, uc = _seed(db)
+    user = student if path.startswith("/student") else teacher
+    response, document = _get(monkeypatch, path.format(uc=uc), user)
+    assert response.status_code == status.HTTP_200_OK
+    assert document.status_code == status.HTTP_200_OK
+    assert document.headers["content-type"] == response.headers["content-type"]
+    assert document.content == response.content
+
+
+def test_documents_match_course_pages(db, monkeypatch):
+    last = db.query(func.max(Cursos.id_curso)).scalar() or 0
+    for _ in range(3):
+        _seed(db)
+    params = {"cursor": pagination.encode_cursor(last), "limit": 2, "estimate": True}
+    response, document = _get(monkeypatch, "/courses/list", params=params)
+    assert response.status_code == status.HTTP_200_OK
+    assert document.content == response.content
+    for header in (pagination.NEXT_CURSOR_HEADER, pagination.TOTAL_ESTIMATE_HEADER):
+        assert document.headers[header] == response.headers[header]
+
+
+@pytest.mark.parametrize("path", ["/teacher/today", "/student/today"])
+def test_documents_not_found(db, monkeypatch, path):
+    response, document = _get(monkeypatch, path, 0)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert document.status_code == status.HTTP_404_NOT_FOUND
+    assert document.json() == response.json()
@@ -0,0 +1,61 @@
+from api.main import app
+from db.user import User
+from fastapi import status
+from fastapi.testclient import TestClient
+from models import pagination
+from models import uc as uc_model
+from oauth2 import get_current_user
+from sqlalchemy import func
+from tests.test_loading import _seed
+
+client = TestClient(app)
+
+
+def _get(path, params=None):
+    app.dependency_overrides[get_current_user] = lambda: None
+    return client.get(path, params=params)
+
+
+def test_fields_select_columns(db, queries):
+    _, uc = _seed(db, 3)
+    full = _get(f"/uc/{uc}").json()
+    queries.clear()
+    response = _get(f"/uc/{uc}", {"fields": "id_uc,nome_uc"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"id_uc": uc, "nome_uc": full["nome_uc"]}
+    assert len(queries) == 1
+    assert "descricao" not in queries[0] and "cursos" not in queries[0]
+
+
+def test_expand_matches_full_response(db):
+    _, uc = _seed(db, 3)
+    full = _get(f"/uc/{uc}").json()
+    response = _get(f"/uc/{uc}", {"expand": "inscricoes"})
+    assert response.json() == {
+        name: value for name, value in full.items() if name not in ("curso", "docentes")
+    }
+
+
+def test_list_fields_keep_pagination(db):
+    last = db.query(func.max(uc_model.UC.id_uc)).scalar() or 0
+    _seed(db, 3)
+    params = {"cursor": pagination.encode_cursor(last), "limit": 2}
+    response = _get("/uc/list", {**params, "fields": "nome_uc"})
+    assert response.status_code == status.HTTP_200_OK
+    assert all(row.keys() == {"nome_uc"} for row in response.json())
+    assert len(response.json()) == 2
+    assert pagination.NEXT_CURSOR_HEADER in response.headers
+
+
+def test_user_without_public_key(db, queries):
+    _seed(db, 1)
+    user_id = db.query(func.max(User.id_utilizador)).scalar()
+    queries.clear()
+    response = _get(f"/user/{user_id}", {"fields": "id_utilizador,nome_utilizador"})
+    assert response.json().keys() == {"id_utilizador", "nome_utilizador"}
+    assert "public_key" not in queries[0]
+
+
+def test_unknown_field(db):
+    response = _get("/uc/1", {"fields": "nome_uc,password", "expand": "aulas"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,134 @@
+import uuid
+from datetime import date, time
+
+import pytest
+from api.main import app
+from db.alunos import Alunos
+from db.aulas import Aulas
+from db.docentes import Docentes
+from db.ucs import UC, Cursos, InscricoesUC, Periodos, UCDocentes
+from db.user import User
+from fastapi import status
+from fastapi.testclient import TestClient
+from models import pagination
+from oauth2 import get_current_user
+from sqlalchemy import func
+
+client = TestClient(app)
+
+# list endpoints and the key of their pages
+LISTS = {
+    "/uc/list": UC.id_uc,
+    "/student/list": Alunos.id_aluno,
+    "/teacher/list": Docentes.id_docente,
+    "/courses/list": Cursos.id_curso,
+}
+
+
+def _user(db, tag):
+    user = User(
+        nome_utilizador=f"test-{tag}",
+        email=f"test-{tag}@sirpa.test",
+        password="x",
+        private_key="x",
+        public_key="x",
+    )
+    db.add(user)
+    db.flush()
+    return user.id_utilizador
+
+
+def _seed(db, size):
+    """A course with size ucs, each with size students and size teachers"""
+    run = uuid.uuid4().hex[:8]
+    nr = int(run, 16) % 1_000_000 * 1000
+    course = Cursos(nome_curso=f"test-{run}", descricao_curso="test")
+    db.add(course)
+    db.flush()
+    teachers = [
+        Docentes(id_utilizador=_user(db, f"{run}-t{i}"), nome="t", nr_docente=nr + i)
+        for i in range(size)
+    ]
+    students = [
+        Alunos(id_utilizador=_user(db, f"{run}-s{i}"), nome="s", nr_aluno=nr + i)
+        for i in range(size)
+    ]
+    ucs = [
+        UC(id_curso=course.id_curso, nome_uc=f"test-{run}-{i}", descricao="test")
+        for i in range(size)
+    ]
+    db.add_all(teachers + students + ucs)
+    db.flush()
+    for uc in ucs:
+        schedule = Periodos(
+            id_uc=uc.id_uc, dia_semana=1, hora_inicio=time(9), hora_fim=time(11)
+        )
+        db.add(schedule)
+        db.flush()
+        db.add(
+            Aulas(
+                id_uc=uc.id_uc,
+                id_docente=teachers[0].id_docente,
+                id_periodo=schedule.id_periodo,
+                data=date.today(),
+                resumo="test",
+                sumario="test",
+                sala="0.0",
+            )
+        )
+        db.add_all(
+            UCDocentes(id_uc=uc.id_uc, id_docente=teacher.id_docente)
+            for teacher in teachers
+        )
+        db.add_all(
+            InscricoesUC(
+                id_aluno=student.id_aluno, id_uc=uc.id_uc, data_inscricao=date.today()
+            )
+            for student in students
+        )
+    db.flush()
+    # a clean identity map, as in a new request
+    db.expunge_all()
+    return course.id_curso, ucs[0].id_uc
+
+
+def _count(queries, path, params=None):
+    app.dependency_overrides[get_current_user] = lambda: None
+    queries.clear()
+    response = client.get(path, params=params)
+    assert response.status_code == status.HTTP_200_OK
+    return len(queries), response.json()
+
+
+@pytest.mark.parametrize("path", LISTS)
+def test_list_queries_independent_of_rows(db, queries, path):
+    counts = []
+    for size in (1, 8):
+        last = db.query(func.max(LISTS[path])).scalar() or 0
+        _seed(db, size)
+        cursor = pagination.encode_cursor(last)
+        count, rows = _count(queries, path, {"cursor": cursor})
+        assert len(rows) == (1 if path == "/courses/list" else size)
+        counts.append(count)
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.parametrize("path", ["/uc/{uc}", "/courses/{course}"])
+def test_read_queries_independent_of_rows(db, queries, path):
+    counts = []
+    for size in (1, 8):
+        course, uc = _seed(db, size)
+        count, _ = _count(queries, path.format(uc=uc, course=course))
+        counts.append(count)
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.parametrize("path", ["/user/{user}", "/student/{student}", "/uc/list"])
+def test_reads_skip_key_material(db, queries, path):
+    _seed(db, 2)
+    student = db.query(func.max(Alunos.id_aluno)).scalar()
+    user = db.query(func.max(User.id_utilizador)).scalar()
+    _, rows = _count(queries, path.format(user=user, student=student))
+    statements = " ".join(queries)
+    assert "private_key" not in statements and "password" not in statements
+    assert ("public_key" in statements) == ("public_key" in str(rows))
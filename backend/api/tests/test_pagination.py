@@ -0,0 +1,58 @@
+import uuid
+
+from api.main import app
+from db.ucs import Cursos
+from fastapi import status
+from fastapi.testclient import TestClient
+from models import pagination
+from oauth2 import get_current_user
+from sqlalchemy import text
+
+client = TestClient(app)
+
+
+def _list(params):
+    app.dependency_overrides[get_current_user] = lambda: None
+    return client.get("/courses/list", params=params)
+
+
+def test_cursor_pages_follow_keys(db):
+    run = uuid.uuid4().hex[:8]
+    db.add_all(
+        Cursos(nome_curso=f"test-{run}-{i}", descricao_curso="test") for i in range(5)
+    )
+    db.flush()
+
+    expected = [course["id_curso"] for course in _list({"limit": 1000}).json()]
+    seen, cursor = [], None
+    while True:
+        response = _list({"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == status.HTTP_200_OK
+        seen += [course["id_curso"] for course in response.json()]
+        cursor = response.headers.get(pagination.NEXT_CURSOR_HEADER)
+        if not cursor:
+            break
+    assert seen == expected == sorted(expected)
+
+
+def test_total_estimate_header(db):
+    db.execute(text("ANALYZE cursos"))
+    response = _list({"limit": 1, "estimate": True})
+    assert response.status_code == status.HTTP_200_OK
+    assert int(response.headers[pagination.TOTAL_ESTIMATE_HEADER]) >= 0
+    assert _list({"limit": 1}).headers.get(pagination.TOTAL_ESTIMATE_HEADER) is None
+
+
+def test_invalid_cursor(db):
+    response = _list({"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_empty_page(db, queries):
+    for limit in (0, -1):
+        queries.clear()
+        response = _list({"limit": limit})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == []
+        assert pagination.NEXT_CURSOR_HEADER not in response.headers
+        assert not queries
@@ -0,0 +1,52 @@
+import pytest
+from api.main import app
+from fastapi.testclient import TestClient
+from models import pagination
+from models import uc as uc_model
+from oauth2 import get_current_user
+from sqlalchemy import func
+from tests.test_loading import _seed
+from tools import query_budget
+
+client = TestClient(app)
+
+
+def _seed_ucs(db):
+    """Cursor of a page of 8 new ucs, each with 8 students and teachers"""
+    last = db.query(func.max(uc_model.UC.id_uc)).scalar() or 0
+    _seed(db, 8)
+    return pagination.encode_cursor(last)
+
+
+def _list_ucs(cursor):
+    app.dependency_overrides[get_current_user] = lambda: None
+    return client.get("/uc/list", params={"cursor": cursor})
+
+
+def test_fingerprint_ignores_parameters_and_list_lengths():
+    assert query_budget.fingerprint(
+        "SELECT * FROM uc WHERE id_uc IN (%(id_1)s, %(id_2)s) AND nome = 'a'"
+    ) == query_budget.fingerprint(
+        "SELECT *\n  FROM uc WHERE id_uc IN (%(id_1)s) AND nome = 'b''c'"
+    )
+
+
+def test_query_count_header(db, queries, monkeypatch):
+    monkeypatch.setattr(query_budget, "DEBUG", True)
+    cursor = _seed_ucs(db)
+    queries.clear()
+    response = _list_ucs(cursor)
+    assert response.headers[query_budget.QUERY_COUNT_HEADER] == str(len(queries))
+
+
+def test_lazy_loads_raise(db, monkeypatch):
+    monkeypatch.setattr(uc_model, "SHOW_UC", ())
+    with pytest.raises(query_budget.QueryBudgetExceeded, match="same shape"):
+        _list_ucs(_seed_ucs(db))
+
+
+def test_lazy_loads_logged(db, monkeypatch, caplog):
+    monkeypatch.setattr(uc_model, "SHOW_UC", ())
+    monkeypatch.setattr(query_budget, "MODE", query_budget.LOG)
+    assert _list_ucs(_seed_ucs(db)).status_code == 200
+    assert "over a budget of 4" in caplog.text
@@ -0,0 +1,193 @@
+import uuid
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from api.main import app
+from db.alunos import Alunos
+from db.aulas import Aulas, Presencas
+from db.docentes import Docentes
+from db.ucs import UC, Cursos, InscricoesUC, Periodos, UCDocentes
+from db.user import User
+from fastapi import status
+from fastapi.testclient import TestClient
+from models import classes, course, student, teacher
+from oauth2 import get_active_user, get_current_user
+from schemas.class_schema import CreateClass
+from schemas.courses_schema import UpdateCourse
+from schemas.student_schema import UpdateStudent
+from schemas.teacher_schema import UpdateTeacher
+
+# queries of a /today request, whatever the size of the history, when the
+# timetable of the day is built and once it is stored
+TEACHER_TODAY_MAX_QUERIES = {"build": 6, "stored": 2}
+STUDENT_TODAY_MAX_QUERIES = {"build": 3, "stored": 1}
+
+client = TestClient(app)
+
+
+def _user(db, tag):
+    user = User(
+        nome_utilizador=f"test-{tag}",
+        email=f"test-{tag}@sirpa.test",
+        password="x",
+        private_key="x",
+        public_key="x",
+    )
+    db.add(user)
+    db.flush()
+    return user
+
+
+def _seed(db, *, students, history):
+    """A teacher with a class today, past classes and students present"""
+    run = uuid.uuid4().hex[:8]
+    nr = int(run, 16) % 1_000_000 * 1000
+    course = Cursos(nome_curso=f"test-{run}")
+    db.add(course)
+    db.flush()
+    uc = UC(id_curso=course.id_curso, nome_uc=f"test-{run}")
+    db.add(uc)
+    db.flush()
+    teacher_user = _user(db, f"{run}-t")
+    teacher = Docentes(
+        id_utilizador=teacher_user.id_utilizador, nome="test", nr_docente=nr
+    )
+    db.add(teacher)
+    db.flush()
+    db.add(UCDocentes(id_uc=uc.id_uc, id_docente=teacher.id_docente))
+    schedule = Periodos(
+        id_uc=uc.id_uc, dia_semana=1, hora_inicio=time(9), hora_fim=time(11)
+    )
+    db.add(schedule)
+    db.flush()
+
+    aulas = [
+        Aulas(
+            id_uc=uc.id_uc,
+            id_docente=teacher.id_docente,
+            id_periodo=schedule.id_periodo,
+            data=date.today() - timedelta(days=7 * i),
+            resumo="test",
+            sumario="test",
+            sala="0.0",
+        )
+        for i in range(history + 1)
+    ]
+    db.add_all(aulas)
+    db.flush()
+
+    student_user = None
+    for i in range(students):
+        student_user = _user(db, f"{run}-s{i}")
+        student = Alunos(
+            id_utilizador=student_user.id_utilizador, nome="test", nr_aluno=nr + i
+        )
+        db.add(student)
+        db.flush()
+        db.add(
+            InscricoesUC(
+                id_aluno=student.id_aluno, id_uc=uc.id_uc, data_inscricao=date.today()
+            )
+        )
+        db.add_all(
+            Presencas(
+                id_aula=aula.id_aula,
+                id_aluno=student.id_aluno,
+                confirmacao=datetime.now(),
+            )
+            for aula in aulas
+        )
+    db.flush()
+    return teacher_user.id_utilizador, student_user.id_utilizador, aulas[0]
+
+
+def _get_today(path, user_id):
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[get_active_user] = lambda: user_id
+    return client.get(path)
+
+
+def test_teacher_today_only_today(db):
+    teacher, _, today = _seed(db, students=3, history=4)
+    response = _get_today("/teacher/today", teacher)
+    assert response.status_code == status.HTTP_200_OK
+    aulas = response.json()["aulas"]
+    assert [aula["id_aula"] for aula in aulas] == [today.id_aula]
+    assert len(aulas[0]["presencas"]) == 3
+
+
+@pytest.mark.parametrize("students,history", [(1, 0), (20, 10)])
+def test_teacher_today_query_cap(db, queries, students, history):
+    teacher, _, _ = _seed(db, students=students, history=history)
+    for stage in ("build", "stored"):
+        queries.clear()
+        response = _get_today("/teacher/today", teacher)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) <= TEACHER_TODAY_MAX_QUERIES[stage]
+
+
+def test_student_today_query_cap(db, queries):
+    _, student, today = _seed(db, students=2, history=10)
+    for stage in ("build", "stored"):
+        queries.clear()
+        response = _get_today("/student/today", student)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(queries) <= STUDENT_TODAY_MAX_QUERIES[stage]
+    periodos = response.json()["inscricoes_ucs"][0]["uc"]["periodos"]
+    assert [aula["id_aula"] for aula in periodos[0]["aulas"]] == [today.id_aula]
+
+
+def test_today_invalidated_by_new_class(db):
+    teacher, student, today = _seed(db, students=1, history=0)
+    assert len(_get_today("/teacher/today", teacher).json()["aulas"]) == 1
+    _get_today("/student/today", student)
+
+    new_class = classes.create_class(
+        db,
+        CreateClass(
+            id_uc=today.id_uc,
+            id_docente=today.id_docente,
+            id_periodo=today.id_periodo,
+            data=date.today(),
+            resumo="test",
+            sumario="test",
+            sala="1.0",
+        ),
+    )
+
+    aulas = _get_today("/teacher/today", teacher).json()["aulas"]
+    assert [aula["id_aula"] for aula in aulas] == [today.id_aula, new_class.id_aula]
+    periodos = _get_today("/student/today", student).json()["inscricoes_ucs"][0]
+    assert len(periodos["uc"]["periodos"][0]["aulas"]) == 2
+
+
+def test_today_invalidated_by_new_names(db):
+    teacher_user, student_user, today = _seed(db, students=1, history=0)
+    _get_today("/teacher/today", teacher_user)
+    _get_today("/student/today", student_user)
+
+    aluno = db.query(Alunos).filter(Alunos.id_utilizador == student_user).one()
+    docente = db.query(Docentes).filter(Docentes.id_docente == today.id_docente).one()
+    curso = db.query(UC).get(today.id_uc).curso
+    student.update_student(
+        db,
+        student_id=aluno.id_aluno,
+        request=UpdateStudent(nome="renamed", nr_aluno=aluno.nr_aluno),
+    )
+    teacher.update_teacher(
+        db,
+        teacher_id=docente.id_docente,
+        request=UpdateTeacher(nome="renamed", nr_docente=docente.nr_docente),
+    )
+    course.update_course_by_id(
+        db,
+        course_id=curso.id_curso,
+        course_data=UpdateCourse(
+            nome_curso=f"{curso.nome_curso}-renamed", descricao_curso=""
+        ),
+    )
+
+    assert _get_today("/student/today", student_user).json()["nome"] == "renamed"
+    day = _get_today("/teacher/today", teacher_user).json()
+    assert day["nome"] == "renamed"
+    assert day["aulas"][0]["uc"]["curso"]["nome_curso"].endswith("-renamed")
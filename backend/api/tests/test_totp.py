@@ -0,0 +1,68 @@
+import time
+from datetime import datetime
+
+import pytest
+from models.classes import _check_token
+from pydantic import ValidationError
+from schemas.class_schema import ReadQRCodeClass
+from tools import totp
+
+SECRET = totp.class_secret(1, 2)
+# the middle of a step, away from the step edges
+AT = 1_000_000 * totp.STEP + totp.STEP / 2
+
+
+@pytest.mark.parametrize("steps", range(-totp.WINDOW, totp.WINDOW + 1))
+def test_verify_window(steps):
+    token = totp.token(SECRET, at=AT + steps * totp.STEP)
+    assert totp.verify(SECRET, token, at=AT)
+
+
+@pytest.mark.parametrize("steps", [-totp.WINDOW - 1, totp.WINDOW + 1])
+def test_verify_outside_window(steps):
+    token = totp.token(SECRET, at=AT + steps * totp.STEP)
+    assert not totp.verify(SECRET, token, at=AT)
+
+
+def test_verify_other_secret():
+    token = totp.token(totp.class_secret(1, 3), at=AT)
+    assert not totp.verify(SECRET, token, at=AT)
+
+
+def test_scan_time():
+    now = time.time()
+    assert totp.scan_time(None) == pytest.approx(now, abs=5)
+    scanned_at = datetime.fromtimestamp(now - totp.MAX_AGE + 60)
+    assert totp.scan_time(scanned_at) == scanned_at.timestamp()
+
+
+@pytest.mark.parametrize(
+    "offset", [totp.STEP * totp.WINDOW + 60, -totp.MAX_AGE - 60], ids=["future", "old"]
+)
+def test_scan_time_rejected(offset):
+    assert totp.scan_time(datetime.fromtimestamp(time.time() + offset)) is None
+
+
+def test_check_token_queued_scan():
+    scanned_at = datetime.fromtimestamp(time.time() - 3600)
+    token = totp.token(SECRET, at=scanned_at.timestamp())
+    check = {"class_id": 1, "student_id": 2, "token": token}
+    assert _check_token("totp", **check, scanned_at=scanned_at)
+    assert not _check_token("totp", **check)
+    assert not _check_token("rsa", **check, scanned_at=scanned_at)
+
+
+def test_read_token():
+    scan = ReadQRCodeClass.parse_obj(
+        {"msg": {"id_aluno": 2, "id_aula": 1}, "token": "01234567"}
+    )
+    assert scan.token == "01234567"
+    assert scan.signature is None
+
+
+@pytest.mark.parametrize("token", ["12345", "12345678901", "1234567a", " 1234567"])
+def test_read_malformed_token(token):
+    with pytest.raises(ValidationError):
+        ReadQRCodeClass.parse_obj(
+            {"msg": {"id_aluno": 2, "id_aula": 1}, "token": token}
+        )
@@ -0,0 +1,104 @@
+console.log("checkinService loaded");
+
+const { REACT_APP_API_URL } = process.env;
+
+const QUEUE_KEY = "checkinQueue";
+const BATCH_SIZE = 100;
+
+// scans waiting to be sent, by class id and then by student id
+const loadQueue = () => JSON.parse(localStorage.getItem(QUEUE_KEY)) || {};
+
+const saveQueue = (queue) => {
+  localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+};
+
+const enqueue = (scan) => {
+  const queue = loadQueue();
+  const { id_aula, id_aluno } = scan.msg;
+  queue[id_aula] = queue[id_aula] || {};
+  if (queue[id_aula][id_aluno]) {
+    return false;
+  }
+  // the rotating tokens are checked at the time they were scanned
+  queue[id_aula][id_aluno] = { ...scan, scanned_at: new Date().toISOString() };
+  saveQueue(queue);
+  return true;
+};
+
+let syncing = null;
+
+// sends the queued scans in batches, a scan is dropped from the queue once the
+// api answered with its result, on network errors or a failed batch the scans
+// stay for the next sync
+const sync = (authCtx) => {
+  if (!syncing) {
+    syncing = syncQueue(authCtx).finally(() => {
+      syncing = null;
+    });
+  }
+  return syncing;
+};
+
+// message of a failed batch, the api errors have a detail.error.msg
+const batchError = async (response) => {
+  try {
+    const obj = await response.json();
+    return obj.detail.error.msg;
+  } catch (e) {
+    return `Erro ${response.status}`;
+  }
+};
+
+const syncQueue = async (authCtx) => {
+  const results = [];
+  const errors = [];
+  for (const id_aula of Object.keys(loadQueue())) {
+    const checkins = Object.values(loadQueue()[id_aula] || {});
+    for (let i = 0; i < checkins.length; i += BATCH_SIZE) {
+      const batch = checkins.slice(i, i + BATCH_SIZE);
+      let response;
+      try {
+        response = await fetch(`${REACT_APP_API_URL}/class/checkin/batch`, {
+          method: "POST",
+          body: JSON.stringify({ id_aula: Number(id_aula), checkins: batch }),
+          headers: {
+            "Content-Type": "application/json",
+            Accept: "application/json",
+            Authorization: "Bearer " + authCtx.token,
+          },
+          mode: "cors",
+        });
+      } catch (e) {
+        return { results, errors };
+      }
+      if (!response.ok) {
+        errors.push({
+          id_aula,
+          pending: checkins.length - i,
+          msg: await batchError(response),
+        });
+        return { results, errors };
+      }
+
+      const answered = await response.json();
+      const queue = loadQueue();
+      const scans = queue[id_aula] || {};
+      answered.forEach((result) => {
+        delete scans[result.id_aluno];
+      });
+      if (Object.keys(scans).length === 0) {
+        delete queue[id_aula];
+      }
+      saveQueue(queue);
+      results.push(...answered);
+    }
+  }
+  return { results, errors };
+};
+
+const checkinService = {
+  enqueue,
+  sync,
+};
+
+export default checkinService;
@@ -0,0 +1,56 @@
+console.log("tokenService loaded");
+
+const { REACT_APP_API_URL } = process.env;
+
+const secretKey = (idAula) => `checkinSecret:${idAula}`;
+
+// the secret of a class is issued once and kept on the device
+const getSecret = async (authCtx, idAula) => {
+  const stored = JSON.parse(localStorage.getItem(secretKey(idAula)));
+  if (stored) {
+    return stored;
+  }
+  const response = await fetch(`${REACT_APP_API_URL}/class/secret`, {
+    method: "POST",
+    body: JSON.stringify({ id_aula: idAula }),
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "application/json",
+      Authorization: "Bearer " + authCtx.token,
+    },
+    mode: "cors",
+  });
+  if (!response.ok) {
+    return Promise.reject(response);
+  }
+  const secret = await response.json();
+  localStorage.setItem(secretKey(idAula), JSON.stringify(secret));
+  return secret;
+};
+
+// RFC 6238 token with HMAC-SHA256, like the api tools/totp.py
+const currentToken = async (secret) => {
+  const raw = Uint8Array.from(atob(secret.secret), (c) => c.charCodeAt(0));
+  const key = await crypto.subtle.importKey(
+    "raw",
+    raw,
+    { name: "HMAC", hash: "SHA-256" },
+    false,
+    ["sign"]
+  );
+  const counter = new DataView(new ArrayBuffer(8));
+  counter.setBigUint64(0, BigInt(Math.floor(Date.now() / 1000 / secret.step)));
+  const digest = new DataView(
+    await crypto.subtle.sign("HMAC", key, counter.buffer)
+  );
+  const offset = digest.getUint8(digest.byteLength - 1) & 0x0f;
+  const code = (digest.getUint32(offset) & 0x7fffffff) % 10 ** secret.digits;
+  return code.toString().padStart(secret.digits, "0");
+};
+
+const tokenService = {
+  getSecret,
+  currentToken,
+};
+
+export default tokenService;
@@ -25,6 +25,8 @@ const user_login = async (body, setIsLoading, authCtx) => {
         Accept: "Set-Cookie",
       },
       mode: "cors",
+      // keeps the access_token cookie, used by the presences stream
+      credentials: "include",
     });
     if (response.ok) {
       setIsLoading(false);
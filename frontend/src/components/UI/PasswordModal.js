@@ -1,9 +1,10 @@
 import { Dialog, Transition } from "@headlessui/react";
-import { Fragment, useState, useRef, useContext } from "react";
+import { Fragment, useState, useRef, useContext, useEffect } from "react";
 import Button from "./Button/Button";
 import { QRCode } from "react-qr-svg";
 import AuthContext from "../../store/auth-context";
 import crudService from "../../_services/crudServices";
+import tokenService from "../../_services/tokenService";
 
 export default function PasswordModal(props) {
   const authCtx = useContext(AuthContext);
@@ -26,6 +27,32 @@ export default function PasswordModal(props) {
     );
   };
 
+  const useToken = props.modoPresenca === "totp";
+
+  useEffect(() => {
+    // token mode, no password, the QRCode shows a token that changes every step
+    if (!props.open || !useToken) {
+      return;
+    }
+    let interval;
+    tokenService
+      .getSecret(authCtx, props.idAula)
+      .then((secret) => {
+        const refresh = async () => {
+          const token = await tokenService.currentToken(secret);
+          setQrcode({
+            msg: { id_aluno: secret.id_aluno, id_aula: secret.id_aula },
+            token,
+          });
+        };
+        refresh();
+        interval = setInterval(refresh, 1000);
+        setShowQRCode(true);
+      })
+      .catch(() => {});
+    return () => clearInterval(interval);
+  }, [props.open, props.idAula, useToken]);
+
   const submitHandler = () => {
     requestQRCode({
       id_aula: props.idAula,
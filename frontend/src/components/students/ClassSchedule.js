@@ -22,6 +22,7 @@ const ClassSchedule = (props) => {
   const [idAluno, setIdAluno] = useState("");
   const [askPassword, setAskPassword] = useState(false);
   const [idAula, setIdAula] = useState("");
+  const [modoPresenca, setModoPresenca] = useState("rsa");
 
   useEffect(() => {
     // TODO: order by hour
@@ -77,6 +78,7 @@ const ClassSchedule = (props) => {
                   <QrcodeIcon
                     onClick={() => {
                       setIdAula(uc.id_aula);
+                      setModoPresenca(uc.modo_presenca);
                       setAskPassword(!askPassword);
                     }}
                     className="w-12 h-12 hover:stroke-red-500 hover:cursor-pointer"
@@ -91,6 +93,7 @@ const ClassSchedule = (props) => {
         open={askPassword}
         onClose={closeAskPassword}
         idAula={idAula}
+        modoPresenca={modoPresenca}
       />
     </>
   );
@@ -3,8 +3,9 @@ import moment from "moment";
 import "moment/locale/pt";
 import AuthContext from "../../store/auth-context";
 import { CameraIcon } from "@heroicons/react/outline";
-import crudService from "../../_services/crudServices";
+import checkinService from "../../_services/checkinService";
 import Html5QrcodeReader from "../UI/Html5QrcodeReader";
+import PresenceCounter from "./PresenceCounter";
 import { toast, Toaster } from "react-hot-toast";
 
 const ClassSchedule = (props) => {
@@ -22,6 +23,7 @@ const ClassSchedule = (props) => {
       data: "",
       nome_uc: "",
       nome_curso: "",
+      presencas: 0,
     },
   ]);
   const [showReader, setShowReader] = useState(false);
@@ -46,22 +48,38 @@ const ClassSchedule = (props) => {
     }
   }, [erro]);
 
-  const registerPresence = (data) => {
-    const result = crudService.postAPI(
-      authCtx,
-      "/class/checkin",
-      { ...data },
-      () => {},
-      setErro
-    );
-    return result;
+  const syncPresences = async () => {
+    const { results, errors } = await checkinService.sync(authCtx);
+    results
+      .filter((result) => result.code >= 400)
+      .forEach((result) => {
+        toast.error(`Aluno ${result.id_aluno}: ${result.msg}`);
+      });
+    errors.forEach((error) => {
+      toast.error(
+        `Aula ${error.id_aula}: ${error.msg}, ${error.pending} leituras por enviar`
+      );
+    });
   };
 
+  useEffect(() => {
+    // scans are queued locally and sent in batches whenever there is network
+    syncPresences();
+    window.addEventListener("online", syncPresences);
+    const interval = setInterval(syncPresences, 10000);
+    return () => {
+      window.removeEventListener("online", syncPresences);
+      clearInterval(interval);
+    };
+  }, []);
+
   const handleQRCodeScan = (decodedText, decodedResult) => {
     const obj = JSON.parse(decodedText);
-    const data = registerPresence(obj);
-    if (data) {
+    if (checkinService.enqueue(obj)) {
       toast.success("Registado");
+      syncPresences();
+    } else {
+      toast("Já registado");
     }
     setShowReader(false);
   };
@@ -100,6 +118,12 @@ const ClassSchedule = (props) => {
                 <span className="text-sm block font-normal">
                   Sala {uc.sala}
                 </span>
+                {uc.id_aula && (
+                  <PresenceCounter
+                    idAula={uc.id_aula}
+                    presencas={uc.presencas}
+                  />
+                )}
               </div>
               <div className="w-1/12 mr-2">
                 <CameraIcon
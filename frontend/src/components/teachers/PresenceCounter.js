@@ -0,0 +1,38 @@
+import React, { useState, useEffect, useContext } from "react";
+import AuthContext from "../../store/auth-context";
+import { UserGroupIcon } from "@heroicons/react/outline";
+
+const { REACT_APP_API_URL } = process.env;
+
+// live count of the students checked in a class, pushed by the api
+const PresenceCounter = (props) => {
+  const authCtx = useContext(AuthContext);
+  const [alunos, setAlunos] = useState(null);
+
+  useEffect(() => {
+    // EventSource can't send headers, the api reads the access_token cookie
+    const source = new EventSource(
+      `${REACT_APP_API_URL}/class/${props.idAula}/presences/stream`,
+      { withCredentials: true }
+    );
+    source.addEventListener("snapshot", (event) => {
+      setAlunos(new Set(JSON.parse(event.data).alunos));
+    });
+    source.addEventListener("presence", (event) => {
+      const presenca = JSON.parse(event.data);
+      setAlunos((previous) => new Set(previous).add(presenca.id_aluno));
+    });
+    return () => {
+      source.close();
+    };
+  }, [props.idAula, authCtx.token]);
+
+  return (
+    <span className="text-sm font-semibold flex flex-row items-center">
+      <UserGroupIcon className="w-4 h-4 mr-1" />
+      {alunos === null ? props.presencas : alunos.size}
+    </span>
+  );
+};
+
+export default PresenceCounter;
@@ -36,6 +36,7 @@ const TodayStudent = () => {
               hora_fim: periodo.hora_fim,
               data: periodo.aulas[0].data,
               nome_uc: uc.uc.nome_uc,
+              modo_presenca: uc.uc.modo_presenca,
             });
           });
         }
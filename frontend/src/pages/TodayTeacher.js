@@ -53,7 +53,8 @@ const TodayStudent = () => {
     () => {
       return crudService.fetchAPI(authCtx, "/teacher/today");
     },
-    { onSuccess, onError }
+    // the presences are pushed by the api, no need to refetch
+    { onSuccess, onError, refetchOnWindowFocus: false }
   );
 
   return (